@@ -0,0 +1,158 @@
+"""Audit_Log writes, retention and partition upkeep.
+
+Procedures write their own audit row through ``log_audit``. With ``AUDIT_MODE=async``
+they hand the row back instead and ``AuditBuffer`` writes rows in batches from a
+background thread, trading a short window of possible loss on a crash for one
+multi-row insert per batch instead of one per mutation.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from sqlalchemy import text
+
+AUDIT_MODE = os.getenv("AUDIT_MODE", "sync")
+AUDIT_BATCH = int(os.getenv("AUDIT_BATCH", "200"))
+AUDIT_FLUSH_S = float(os.getenv("AUDIT_FLUSH_S", "1.0"))
+AUDIT_MAX_PENDING = 100000
+AUDIT_RETENTION_DAYS = int(os.getenv("AUDIT_RETENTION_DAYS", "365"))
+
+INSERT_SQL = """
+    INSERT INTO Audit_Log(table_name, record_id, action, actor, created_at)
+    VALUES (:table_name, :record_id, :action, :actor, :created_at)
+"""
+
+log = logging.getLogger("sports_analytics.audit")
+
+
+class AuditBuffer:
+    """Collects audit rows and writes them with ``executemany`` every ``flush_s`` or ``batch`` rows."""
+
+    def __init__(self, engine, batch: int = AUDIT_BATCH, flush_s: float = AUDIT_FLUSH_S, on_flush=None):
+        self.engine = engine
+        self.batch = batch
+        self.flush_s = flush_s
+        self.on_flush = on_flush
+        self._rows = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._closed = False
+
+    def __len__(self):
+        return len(self._rows)
+
+    def add(self, table: str, record_id, action: str, actor: str):
+        row = {"table_name": table, "record_id": record_id, "action": action,
+               "actor": actor, "created_at": datetime.now()}
+        with self._lock:
+            self._rows.append(row)
+            if len(self._rows) > AUDIT_MAX_PENDING:
+                del self._rows[:len(self._rows) - AUDIT_MAX_PENDING]
+                log.warning("audit buffer full; dropped oldest rows")
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, name="audit-flush", daemon=True)
+                self._thread.start()
+            if len(self._rows) >= self.batch:
+                self._wake.set()
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+            if not rows:
+                return 0
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(text(INSERT_SQL), rows)
+            except Exception:
+                log.exception("audit flush of %d rows failed; will retry", len(rows))
+                with self._lock:
+                    self._rows[:0] = rows
+                return 0
+        if self.on_flush is not None:
+            self.on_flush(len(rows))
+        return len(rows)
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_s)
+            self._wake.clear()
+            self.flush()
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        self.flush()
+
+
+def _month(d: date) -> date:
+    return date(d.year, d.month, 1)
+
+
+def _next_month(d: date) -> date:
+    return date(d.year + d.month // 12, d.month % 12 + 1, 1)
+
+
+def partitions(conn) -> list:
+    """``[(name, upper bound as unix time or None for MAXVALUE)]`` in order; empty if unpartitioned."""
+    rows = conn.execute(text("""
+        SELECT PARTITION_NAME, PARTITION_DESCRIPTION
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'Audit_Log' AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+    """)).fetchall()
+    return [(name, None if desc == "MAXVALUE" else int(desc)) for name, desc in rows]
+
+
+def maintain_partitions(conn, keep_days: int = AUDIT_RETENTION_DAYS, months_ahead: int = 2) -> dict:
+    """Split ``pmax`` into monthly partitions up to ``months_ahead`` and drop those wholly past retention."""
+    parts = partitions(conn)
+    if not parts:
+        return {"added": [], "dropped": []}
+
+    def ts(d: date) -> int:
+        return conn.execute(text("SELECT UNIX_TIMESTAMP(:d)"), {"d": f"{d} 00:00:00"}).scalar()
+
+    highest = max((b for _, b in parts if b is not None), default=0)
+    month, added = _month(date.today()), []
+    for _ in range(months_ahead + 1):
+        bound = _next_month(month)
+        if ts(bound) > highest:
+            added.append((f"p{month:%Y%m}", bound))
+        month = bound
+    if added:
+        defs = ", ".join(f"PARTITION {name} VALUES LESS THAN (UNIX_TIMESTAMP('{bound} 00:00:00'))"
+                         for name, bound in added)
+        conn.execute(text(f"ALTER TABLE Audit_Log REORGANIZE PARTITION pmax INTO "
+                          f"({defs}, PARTITION pmax VALUES LESS THAN MAXVALUE)"))
+
+    cutoff = ts(date.today() - timedelta(days=keep_days))
+    dropped = [name for name, b in parts if b is not None and b <= cutoff]
+    if dropped:
+        conn.execute(text(f"ALTER TABLE Audit_Log DROP PARTITION {', '.join(dropped)}"))
+    return {"added": [name for name, _ in added], "dropped": dropped}
+
+
+def purge(engine, keep_days: int = AUDIT_RETENTION_DAYS, batch: int = 10000) -> int:
+    """Delete rows older than ``keep_days`` in small transactions; returns rows deleted."""
+    cutoff = datetime.now() - timedelta(days=keep_days)
+    total = 0
+    while True:
+        with engine.begin() as conn:
+            n = conn.execute(text("DELETE FROM Audit_Log WHERE created_at < :c LIMIT :n"),
+                             {"c": cutoff, "n": batch}).rowcount
+        total += n
+        if n < batch:
+            return total
+        time.sleep(0.05)
+
+
+def run_retention(engine, keep_days: int = AUDIT_RETENTION_DAYS, months_ahead: int = 2) -> dict:
+    """Partition upkeep, then a batched purge of whatever old rows remain in live partitions."""
+    with engine.begin() as conn:
+        out = maintain_partitions(conn, keep_days, months_ahead)
+    out["purged"] = purge(engine, keep_days)
+    return out
@@ -0,0 +1,68 @@
+"""Audit_Log browsing with SQL-side filters and keyset pagination on id (newest first)."""
+from common import sql_df
+
+TABLES = ["Players", "Teams", "Matches", "Scores", "Injuries"]
+ACTIONS = ["INSERT", "UPDATE", "DELETE"]
+# Row budget: no page reads more than max(PAGE_SIZES) + 1 rows.
+PAGE_SIZES = [50, 100, 200, 500]
+
+AUDIT_SQL = """
+    SELECT id, table_name, record_id, action, actor, created_at
+    FROM Audit_Log
+    WHERE {where}
+    ORDER BY id {order}
+    LIMIT :lim
+"""
+
+
+def build_search(table=None, action=None, record_id=None, date_from=None, date_to=None,
+                 page_size=100, after=None, before=None):
+    """``(sql, params)`` for one page of ``search_audit``, one row past the page."""
+    page_size = min(int(page_size), max(PAGE_SIZES))
+    where = ["1=1"]
+    params = {"lim": page_size + 1}
+
+    if table is not None:
+        where.append("table_name = :t")
+        params["t"] = table
+    if action is not None:
+        where.append("action = :a")
+        params["a"] = action
+    if record_id is not None:
+        where.append("record_id = :r")
+        params["r"] = int(record_id)
+    if date_from is not None:
+        where.append("created_at >= :d0")
+        params["d0"] = str(date_from)
+    if date_to is not None:
+        where.append("created_at < :d1 + INTERVAL 1 DAY")
+        params["d1"] = str(date_to)
+
+    if before is not None:
+        where.append("id > :cur")
+        params["cur"] = int(before)
+        order = "ASC"
+    else:
+        if after is not None:
+            where.append("id < :cur")
+            params["cur"] = int(after)
+        order = "DESC"
+    return AUDIT_SQL.format(where=" AND ".join(where), order=order), params
+
+
+def search_audit(table=None, action=None, record_id=None, date_from=None, date_to=None,
+                 page_size=100, after=None, before=None):
+    """Return ``(page_df, has_prev, has_next)``.
+
+    ``after`` is the id of the last row of the current page (walk to older rows),
+    ``before`` the id of its first row (walk to newer rows); pass neither for the newest page.
+    ``date_to`` is inclusive.
+    """
+    page_size = min(int(page_size), max(PAGE_SIZES))
+    df = sql_df(*build_search(table, action, record_id, date_from, date_to, page_size, after, before))
+    more = len(df) > page_size
+    df = df.head(page_size)
+    if before is not None:
+        df = df.iloc[::-1].reset_index(drop=True)
+        return df, more, True
+    return df, after is not None, more
@@ -0,0 +1,559 @@
+"""Latency benchmarks for the queries behind the app pages.
+
+Queries go straight to the engine, bypassing the query cache, so the numbers
+reflect database work only.
+"""
+import math
+import re
+import statistics
+import threading
+import time
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from common import db_begin, engine, pool_metrics, read_engine
+from dashboard_snapshot import SNAPSHOT_QUERIES
+import match_analytics as ma
+from match_analytics import MATCH_BUNDLE_SQL
+from match_search import build_search as match_search_sql
+from player_search import HYDRATE_SQL
+from audit_search import build_search as audit_search_sql
+from pickers import PICKERS, TOP_K, _ALIAS
+from season_store import MATCHES_SQL, SCORES_SQL
+from player_cards import player_cards_html
+
+DASHBOARD_QUERIES = SNAPSHOT_QUERIES
+
+MATCH_DETAIL_VIEWS = {
+    "score_flow": """
+        SELECT match_id, minute_scored, home_cum, away_cum
+        FROM v_match_score_flow WHERE match_id = :m ORDER BY minute_scored
+    """,
+    "player_xg": """
+        SELECT match_id, player_id, player_name, team_name, shots, goals, xg
+        FROM v_match_player_xg WHERE match_id = :m ORDER BY xg DESC
+    """,
+    "key_moments": """
+        SELECT match_id, minute_scored, player_name, team_name, points, moment_type
+        FROM v_match_key_moments WHERE match_id = :m ORDER BY minute_scored
+    """,
+    "mvp": """
+        SELECT match_id, player_id, player_name, team_name, goals, xg, key_moments, mvp_score
+        FROM v_match_mvp WHERE match_id = :m ORDER BY mvp_score DESC LIMIT 3
+    """,
+}
+
+def summarize(samples_ms) -> dict:
+    ordered = sorted(samples_ms)
+    return {
+        "n": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p50_ms": round(ordered[len(ordered) // 2], 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def time_query(conn, sql: str, params: dict) -> float:
+    t0 = time.perf_counter()
+    conn.execute(text(sql), params).fetchall()
+    return (time.perf_counter() - t0) * 1000
+
+
+def sample_match_ids(conn, n: int):
+    rows = conn.execute(text("""
+        SELECT match_id FROM Scores GROUP BY match_id ORDER BY match_id DESC LIMIT :n
+    """), {"n": n}).fetchall()
+    return [r[0] for r in rows]
+
+
+def table_counts(conn, tables=("Teams", "Players", "Matches", "Scores", "Injuries")) -> dict:
+    return {t: conn.execute(text(f"SELECT COUNT(*) FROM {t}")).scalar() for t in tables}
+
+
+def bench_match_detail(n_matches: int = 20, repeat: int = 3) -> dict:
+    """Time the match-detail analytics as the v_match_* views and as the one-query bundle."""
+    with engine.connect() as conn:
+        match_ids = sample_match_ids(conn, n_matches)
+        result = {"counts": table_counts(conn), "matches_sampled": len(match_ids)}
+        if not match_ids:
+            return result
+
+        paths = {
+            "views": MATCH_DETAIL_VIEWS,
+            "bundle": {"bundle": MATCH_BUNDLE_SQL},
+        }
+        for path, queries in paths.items():
+            per_query = {name: [] for name in queries}
+            detail = []
+            for _ in range(repeat):
+                for mid in match_ids:
+                    total = 0.0
+                    for name, sql in queries.items():
+                        ms = time_query(conn, sql, {"m": mid})
+                        per_query[name].append(ms)
+                        total += ms
+                    detail.append(total)
+            result[path] = {
+                "detail_view": summarize(detail),
+                "queries": {name: summarize(v) for name, v in per_query.items()},
+            }
+    return result
+
+
+def bench_match_scales(scales, seed: int = 0, n_matches: int = 20, repeat: int = 3) -> dict:
+    """Regenerate the league at each scale (replacing the current data) and run ``bench_match_detail``.
+
+    The views scan all of Scores while the bundle reads one match, so the gap
+    between them should grow with the number of matches in the league.
+    """
+    import datagen
+    runs = []
+    for scale in scales:
+        report = datagen.generate_and_load(scale, seed=seed, reset=True)
+        run = {"scale": scale, "spec": report["spec"], "load_s": report["seconds"]}
+        run.update(bench_match_detail(n_matches, repeat))
+        if "views" in run:
+            views, bundle = run["views"]["detail_view"]["p50_ms"], run["bundle"]["detail_view"]["p50_ms"]
+            run["views_over_bundle"] = round(views / bundle, 2) if bundle else None
+        runs.append(run)
+    return {"seed": seed, "repeat": repeat, "runs": runs}
+
+
+def _legacy_flow_figure(events, info):
+    """The match page's original score flow: pandas merge/ffill plus one add_vline per event."""
+    import plotly.graph_objects as go
+    sf = ma.score_flow(events, info)
+    max_min = int(max(90, int(sf["minute_scored"].max())))
+    minutes = pd.DataFrame({"minute": list(range(0, max_min + 1))})
+    evt = sf[["minute_scored", "home_cum", "away_cum"]].rename(columns={"minute_scored": "minute"})
+    evt = evt.groupby("minute").agg({"home_cum": "max", "away_cum": "max"}).reset_index()
+    minute_df = minutes.merge(evt, on="minute", how="left").sort_values("minute")
+    minute_df[["home_cum", "away_cum"]] = minute_df[["home_cum", "away_cum"]].ffill().fillna(0).astype(int)
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=minute_df["minute"], y=minute_df["home_cum"], mode="lines+markers"))
+    fig.add_trace(go.Scatter(x=minute_df["minute"], y=minute_df["away_cum"], mode="lines+markers"))
+    for _, r in sf.iterrows():
+        fig.add_vline(x=int(r["minute_scored"]), line_width=1, line_dash="dot", line_color="rgba(200,200,200,0.12)")
+    minute_df["lead"] = minute_df["home_cum"] - minute_df["away_cum"]
+    minute_df["lead_diff"] = minute_df["lead"].diff().fillna(0)
+    minute_df["lead_diff2"] = minute_df["lead_diff"].diff().fillna(0).abs()
+    return int(minute_df.loc[minute_df["lead_diff2"].idxmax(), "minute"])
+
+
+def _numpy_flow_figure(events, info):
+    import plotly.graph_objects as go
+    flow = ma.minute_flow(events["minute_scored"].to_numpy(), events["team_id"].to_numpy(),
+                          events["points"].to_numpy(), int(info["home_team_id"]), int(info["away_team_id"]))
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=flow["minute"], y=flow["home_cum"], mode="lines+markers"))
+    fig.add_trace(go.Scatter(x=flow["minute"], y=flow["away_cum"], mode="lines+markers"))
+    fig.update_layout(shapes=[
+        dict(type="line", x0=m, x1=m, yref="paper", y0=0, y1=1,
+             line=dict(width=1, dash="dot", color="rgba(200,200,200,0.12)"))
+        for m in np.unique(events["minute_scored"].to_numpy()).tolist()
+    ])
+    return flow["turning_minute"] or 0
+
+
+def bench_score_flow(n_matches: int = 20, repeat: int = 3) -> dict:
+    """Time the score-flow chart and turning point: legacy pandas/add_vline vs NumPy/shapes batch."""
+    with engine.connect() as conn:
+        match_ids = sample_match_ids(conn, n_matches)
+        bundles = []
+        for mid in match_ids:
+            res = conn.execute(text(MATCH_BUNDLE_SQL), {"m": mid})
+            bundles.append(ma.bundle_from_frame(pd.DataFrame(res.fetchall(), columns=list(res.keys()))))
+    bundles = [b for b in bundles if b is not None and not b["events"].empty]
+    result = {"matches_sampled": len(bundles),
+              "events_per_match": summarize([len(b["events"]) for b in bundles]) if bundles else None}
+    if not bundles:
+        return result
+
+    mismatches = 0
+    for name, fn in (("legacy", _legacy_flow_figure), ("numpy", _numpy_flow_figure)):
+        samples = []
+        for _ in range(repeat):
+            for b in bundles:
+                t0 = time.perf_counter()
+                fn(b["events"], b["info"])
+                samples.append((time.perf_counter() - t0) * 1000)
+        result[name] = summarize(samples)
+    for b in bundles:
+        if _legacy_flow_figure(b["events"], b["info"]) != _numpy_flow_figure(b["events"], b["info"]):
+            mismatches += 1
+    result["turning_point_mismatches"] = mismatches
+    result["speedup"] = round(result["legacy"]["mean_ms"] / result["numpy"]["mean_ms"], 2) if result["numpy"]["mean_ms"] else None
+    return result
+
+
+def synthetic_season_store(n_events: int, n_teams: int = 20, n_players: int = 500, seasons: int = 5, seed: int = 0):
+    """A SeasonStore over random arrays, for timing queries at sizes the database may not hold."""
+    from season_store import SeasonStore
+    rng = np.random.default_rng(seed)
+    n_matches = max(1, n_events // 3)
+    home = rng.integers(1, n_teams + 1, n_matches)
+    away = (home + rng.integers(1, n_teams, n_matches) - 1) % n_teams + 1
+    start = np.datetime64(f"{2024 - seasons}-01-01")
+    matches = {
+        "match_id": np.arange(1, n_matches + 1),
+        "date": start + np.sort(rng.integers(0, 365 * seasons, n_matches)).astype("timedelta64[D]"),
+        "home_team_id": home,
+        "away_team_id": away,
+    }
+    mids = rng.integers(1, n_matches + 1, n_events)
+    side = rng.random(n_events) < 0.5
+    scores = {
+        "score_id": np.arange(1, n_events + 1),
+        "match_id": mids,
+        "team_id": np.where(side, home[mids - 1], away[mids - 1]),
+        "player_id": rng.integers(1, n_players + 1, n_events),
+        "points": np.ones(n_events, dtype=np.int64),
+        "minute_scored": rng.integers(0, 96, n_events),
+    }
+    return SeasonStore(matches, scores, {t: f"Team {t}" for t in range(1, n_teams + 1)})
+
+
+def bench_season(synthetic_events: int = 0, repeat: int = 5) -> dict:
+    """Time the season store's queries, on the live database or on ``synthetic_events`` random events."""
+    from season_store import SeasonStore
+    t0 = time.perf_counter()
+    store = synthetic_season_store(synthetic_events) if synthetic_events else SeasonStore.load()
+    result = {"events": len(store), "build_ms": round((time.perf_counter() - t0) * 1000, 1)}
+    seasons = store.seasons()
+    if not seasons:
+        return result
+    season = seasons[-1]
+    teams = store.league_table(season)["team_id"].tolist()
+    queries = {
+        "league_table": lambda: store.league_table(season),
+        "rolling_form": lambda: store.rolling_form(season),
+        "minute_buckets_team": lambda: store.minute_buckets(season, by="team_id"),
+        "minute_buckets_player": lambda: store.minute_buckets(season, by="player_id"),
+        "group_sum_all_seasons": lambda: store.group_sum(("season", "team_id")),
+    }
+    if len(teams) >= 2:
+        queries["head_to_head"] = lambda: store.head_to_head(teams[0], teams[1])
+    result["queries"] = {}
+    for name, fn in queries.items():
+        samples = []
+        for _ in range(repeat):
+            t1 = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - t1) * 1000)
+        result["queries"][name] = summarize(samples)
+    return result
+
+
+PLAYER_SEARCH_CALL = "CALL search_players(:q, :minpts, :team, :pos, :nat, :lim, :off)"
+PLAYER_COUNT_CALL = "CALL count_players(:q, :minpts, :team, :pos, :nat)"
+TEAMS_LOOKUP = "SELECT team_id, team_name FROM Teams ORDER BY team_name"
+
+
+def _player_search(s, **kw):
+    return PLAYER_SEARCH_CALL, dict({"q": "", "minpts": 0, "team": None, "pos": None, "nat": None,
+                                     "lim": 25, "off": 0}, **kw)
+
+
+def _player_count(s, **kw):
+    return PLAYER_COUNT_CALL, dict({"q": "", "minpts": 0, "team": None, "pos": None, "nat": None}, **kw)
+
+
+def _picker(kind, where, params):
+    id_col, sql, _, _ = PICKERS[kind]
+    return sql.format(where=where, order=f"{_ALIAS[kind]}.{id_col} DESC"), dict(params, k=TOP_K)
+
+
+def _hydrate(s):
+    binds = {f"id{i}": pid for i, pid in enumerate(s["players"])}
+    return (HYDRATE_SQL.format(ids=", ".join(":" + b for b in binds), where="total_points >= :minpts"),
+            dict(binds, minpts=0, lim=25, off=0))
+
+
+# Page -> query name -> fn(sample) -> (sql, params): every query a page issues on a
+# typical render, with the defaults and filters a user would hit first.
+PAGE_QUERIES = {
+    "dashboard": dict(
+        {name: (lambda s, sql=sql: (sql, {})) for name, sql in SNAPSHOT_QUERIES.items()},
+        season_matches=lambda s: (MATCHES_SQL, {}),
+        season_scores=lambda s: (SCORES_SQL.format(where=""), {}),
+    ),
+    "players": {
+        "lookup_teams": lambda s: (TEAMS_LOOKUP, {}),
+        "lookup_positions": lambda s: ("SELECT DISTINCT position FROM Players WHERE position IS NOT NULL ORDER BY position", {}),
+        "lookup_nationalities": lambda s: ("SELECT DISTINCT nationality FROM Players WHERE nationality IS NOT NULL ORDER BY nationality", {}),
+        "search_first_page": lambda s: _player_search(s),
+        "search_count": lambda s: _player_count(s),
+        "search_page_10": lambda s: _player_search(s, off=9 * 24),
+        "search_team": lambda s: _player_search(s, team=s["team"]),
+        "search_team_position": lambda s: _player_search(s, team=s["team"], pos=s["position"]),
+        "search_nationality_minpts": lambda s: _player_search(s, nat=s["nationality"], minpts=1),
+        "search_text_hydrate": _hydrate,
+    },
+    "matches": {
+        "lookup_teams": lambda s: (TEAMS_LOOKUP, {}),
+        "newest": lambda s: match_search_sql(sort_by="Newest"),
+        "newest_page_2": lambda s: match_search_sql(sort_by="Newest", after=(s["match_date"], s["match"])),
+        "most_goals": lambda s: match_search_sql(sort_by="Most Goals"),
+        "team_filter": lambda s: match_search_sql(team_id=s["team"]),
+        "team_vs_opponent": lambda s: match_search_sql(team_id=s["team"], opponent_id=s["opponent"]),
+        "match_bundle": lambda s: (MATCH_BUNDLE_SQL, {"m": s["match"]}),
+    },
+    "admin": {
+        "lookup_teams": lambda s: (TEAMS_LOOKUP, {}),
+        "picker_player": lambda s: _picker("player", "1=1", {}),
+        "picker_match": lambda s: _picker("match", "1=1", {}),
+        "picker_match_text": lambda s: _picker("match", PICKERS["match"][3], {"p": s["team_prefix"]}),
+        "picker_score": lambda s: _picker("score", "1=1", {}),
+        "picker_score_by_match": lambda s: _picker("score", PICKERS["score"][2], {"n": s["match"]}),
+        "picker_injury": lambda s: _picker("injury", "1=1", {}),
+        "audit_newest": lambda s: audit_search_sql(),
+        "audit_table_action": lambda s: audit_search_sql(table="Scores", action="INSERT"),
+        "audit_record": lambda s: audit_search_sql(table="Matches", record_id=s["match"]),
+    },
+}
+
+
+def sample_params(conn):
+    """Realistic filter values from the current data, or None when there are no scored matches."""
+    row = conn.execute(text("""
+        SELECT m.match_id, m.date, m.home_team_id, m.away_team_id, t.team_name
+        FROM Matches m JOIN Teams t ON t.team_id = m.home_team_id
+        WHERE m.match_id = (SELECT MAX(match_id) FROM Scores)
+    """)).fetchone()
+    if row is None:
+        return None
+    players = [r[0] for r in conn.execute(text(
+        "SELECT player_id FROM Player_Summary ORDER BY total_points DESC, name LIMIT 50")).fetchall()]
+    position, nationality = conn.execute(text("""
+        SELECT (SELECT position FROM Players WHERE position IS NOT NULL
+                GROUP BY position ORDER BY COUNT(*) DESC LIMIT 1),
+               (SELECT nationality FROM Players WHERE nationality IS NOT NULL
+                GROUP BY nationality ORDER BY COUNT(*) DESC LIMIT 1)
+    """)).fetchone()
+    return {
+        "match": row[0], "match_date": str(row[1]), "team": row[2], "opponent": row[3],
+        "team_prefix": str(row[4])[:3] + "%", "players": players or [0],
+        "position": position, "nationality": nationality,
+    }
+
+
+def bench_pages(repeat: int = 5, pages=None) -> dict:
+    """Time every PAGE_QUERIES entry ``repeat`` times after one warm-up run.
+
+    Each page also gets ``render_p50_ms``, the sum of its queries' medians.
+    """
+    with engine.connect() as conn:
+        result = {"counts": table_counts(conn)}
+        sample = sample_params(conn)
+        if sample is None:
+            return result
+        result["pages"] = {}
+        for page, queries in PAGE_QUERIES.items():
+            if pages and page not in pages:
+                continue
+            timings = {}
+            for name, build in queries.items():
+                sql, params = build(sample)
+                time_query(conn, sql, params)
+                timings[name] = summarize([time_query(conn, sql, params) for _ in range(repeat)])
+            result["pages"][page] = {
+                "render_p50_ms": round(sum(t["p50_ms"] for t in timings.values()), 3),
+                "queries": timings,
+            }
+    return result
+
+
+def bench_scales(scales, seed: int = 0, repeat: int = 5, pages=None) -> dict:
+    """Regenerate the league at each scale (replacing the current data) and run ``bench_pages``."""
+    import datagen
+    runs = []
+    for scale in scales:
+        report = datagen.generate_and_load(scale, seed=seed, reset=True)
+        run = {"scale": scale, "spec": report["spec"],
+               "load_s": report["seconds"], "generate_s": report["generate_s"]}
+        run.update(bench_pages(repeat, pages))
+        runs.append(run)
+    return {"seed": seed, "repeat": repeat, "runs": runs}
+
+
+def diff_results(old: dict, new: dict) -> list:
+    """``(scale, page, query, old p50, new p50, ratio)`` for queries present in both runs."""
+    def index(res):
+        runs = res.get("runs") or [dict(res, scale=None)]
+        return {(r["scale"], page, q): t["p50_ms"]
+                for r in runs for page, p in r.get("pages", {}).items() for q, t in p["queries"].items()}
+
+    a, b = index(old), index(new)
+    return [(*key, a[key], b[key], round(b[key] / a[key], 2) if a[key] else None)
+            for key in a if key in b]
+
+
+def _legacy_player_cards(df):
+    """The Players page's original grid: a 3-column row per 3 cards, one markdown element per card.
+
+    Returns ``(element count, markdown bytes)``.
+    """
+    n_cols, elements, nbytes = 3, 0, 0
+    for r in range(math.ceil(len(df) / n_cols)):
+        elements += 1 + n_cols  # st.columns: the row plus its column containers
+        for idx in range(r * n_cols, min(len(df), (r + 1) * n_cols)):
+            row = df.iloc[idx]
+            status = "Injured" if row["injured"] else "Fit"
+            status_class = "bad" if row["injured"] else "ok"
+            body = f"""
+                    <div class="app-card">
+                        <div class="title-20">{row['name']}</div>
+                        <span class="app-badge">{row['team_name'] or 'No Team'}</span>
+                        <span class="app-badge">{row['position'] or '-'}</span>
+                        <span class="app-badge">{row['nationality'] or '-'}</span>
+                        <div class="muted" style="margin-top:8px;">Points: <b>{int(row['total_points'])}</b></div>
+                        <div class="{status_class}" style="margin-top:6px;">{status}</div>
+                    </div>
+                    """
+            elements += 1
+            nbytes += len(body.encode())
+    return elements, nbytes
+
+
+def bench_player_grid(n_players: int = 500, repeat: int = 5) -> dict:
+    """Build time, element count and markdown payload of the Players grid: per-card vs single pass."""
+    with engine.connect() as conn:
+        res = conn.execute(text("""
+            SELECT name, team_name, position, nationality, total_points, injured
+            FROM Player_Summary ORDER BY total_points DESC, name LIMIT :n
+        """), {"n": n_players})
+        df = pd.DataFrame(res.fetchall(), columns=list(res.keys()))
+    if df.empty:
+        return {"players": 0}
+    if len(df) < n_players:
+        df = pd.concat([df] * math.ceil(n_players / len(df)), ignore_index=True).head(n_players)
+
+    result = {"players": len(df)}
+    for name, fn in (("per_card", _legacy_player_cards),
+                     ("single_pass", lambda d: (1, len(player_cards_html(d).encode())))):
+        samples = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            elements, nbytes = fn(df)
+            samples.append((time.perf_counter() - t0) * 1000)
+        result[name] = {"elements": elements, "markdown_bytes": nbytes, "build": summarize(samples)}
+    return result
+
+
+# EXPLAIN-based index checks: (name, page, PAGE_QUERIES entry, table alias, acceptable
+# keys). Each check EXPLAINs the statement the page really runs, bound to values from
+# sample_params; a CALL is replaced by the SELECT in the deployed procedure body. A
+# dropped index or a rewrite that defeats it then shows up as a failure rather than
+# as a slow page.
+PLAN_CHECKS = [
+    ("search_players team filter", "players", "search_team", "ps", {"idx_player_summary_team"}),
+    ("match search newest", "matches", "newest", "r", {"idx_match_results_date"}),
+    ("audit log table/action filter", "admin", "audit_table_action", "Audit_Log", {"idx_audit_table_action"}),
+]
+
+_CALL_ARGS = re.compile(r"^\s*CALL\s+(\w+)\s*\((.*)\)\s*$", re.IGNORECASE | re.DOTALL)
+_DECLARE = re.compile(r"\bDECLARE\s+(\w+)\s+[^;]*?\bDEFAULT\s+([^;]+);", re.IGNORECASE)
+_FIRST_SELECT = re.compile(r"\bSELECT\b[^;]*", re.IGNORECASE)
+
+
+def _bind_identifier(sql: str, name: str) -> str:
+    return re.sub(rf"(?<![\w.:@'`]){re.escape(name)}(?![\w'`])", f":{name}", sql)
+
+
+def proc_statement(conn, call: str, params: dict):
+    """``(sql, params)``: the first SELECT of the procedure ``call`` invokes, as deployed.
+
+    Procedure parameters become binds with the values ``call`` would pass, and
+    DECLARE ... DEFAULT variables are evaluated against them, so EXPLAIN sees the
+    same constants the procedure's own statement does.
+    """
+    m = _CALL_ARGS.match(call)
+    proc, args = m.group(1), [a.strip().lstrip(":") for a in m.group(2).split(",") if a.strip()]
+    body = conn.execute(text("""
+        SELECT ROUTINE_DEFINITION FROM information_schema.ROUTINES
+        WHERE ROUTINE_SCHEMA = DATABASE() AND ROUTINE_NAME = :p AND ROUTINE_TYPE = 'PROCEDURE'
+    """), {"p": proc}).scalar()
+    if body is None:
+        raise LookupError(f"procedure {proc!r} is not deployed (or its body is not visible to this user)")
+    names = [r[0] for r in conn.execute(text("""
+        SELECT PARAMETER_NAME FROM information_schema.PARAMETERS
+        WHERE SPECIFIC_SCHEMA = DATABASE() AND SPECIFIC_NAME = :p AND ROUTINE_TYPE = 'PROCEDURE'
+        ORDER BY ORDINAL_POSITION
+    """), {"p": proc})]
+    binds = {name: params[arg] for name, arg in zip(names, args)}
+    for var, default in _DECLARE.findall(body):
+        expr = default
+        for name in binds:
+            expr = _bind_identifier(expr, name)
+        binds[var] = conn.execute(text(f"SELECT {expr}"), binds).scalar()
+    sql = _FIRST_SELECT.search(_DECLARE.sub("", body)).group(0)
+    for name in binds:
+        sql = _bind_identifier(sql, name)
+    return sql, binds
+
+
+def check_plans() -> list:
+    """Run every PLAN_CHECKS entry; return ``(name, alias, key, expected)`` for each failure."""
+    failures = []
+    with engine.connect() as conn:
+        sample = sample_params(conn)
+        if sample is None:
+            raise RuntimeError("plan checks need at least one scored match; run `manage.py generate` first")
+        for name, page, query, alias, expected in PLAN_CHECKS:
+            sql, params = PAGE_QUERIES[page][query](sample)
+            if _CALL_ARGS.match(sql):
+                sql, params = proc_statement(conn, sql, params)
+            rows = conn.execute(text("EXPLAIN " + sql), params).mappings().all()
+            keys = [r["key"] for r in rows if r["table"] == alias]
+            key = keys[0] if keys else None
+            if key not in expected:
+                failures.append((name, alias, key, expected))
+    return failures
+
+
+def load_test(sessions: int = 20, iterations: int = 10, think_ms: float = 0.0) -> dict:
+    """Simulate ``sessions`` concurrent Dashboard viewers, each rendering ``iterations`` times.
+
+    Every render checks a connection out of the read pool per query, as sql_df does
+    with the cache disabled. Reports render latency, errors and the pool's metrics.
+    """
+    renders, errors = [], []
+    lock = threading.Lock()
+    start = threading.Barrier(sessions)
+
+    def session():
+        start.wait()
+        for _ in range(iterations):
+            t0 = time.perf_counter()
+            try:
+                for sql in DASHBOARD_QUERIES.values():
+                    with db_begin(read_engine) as conn:
+                        conn.execute(text(sql)).fetchall()
+            except Exception as e:
+                with lock:
+                    errors.append(repr(e))
+                continue
+            with lock:
+                renders.append((time.perf_counter() - t0) * 1000)
+            if think_ms:
+                time.sleep(think_ms / 1000)
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=session) for _ in range(sessions)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    return {
+        "sessions": sessions,
+        "iterations": iterations,
+        "elapsed_s": round(elapsed, 3),
+        "renders_per_s": round(len(renders) / elapsed, 2) if elapsed else 0.0,
+        "render": summarize(renders) if renders else None,
+        "errors": len(errors),
+        "first_errors": errors[:5],
+        "pool": pool_metrics(),
+    }
@@ -0,0 +1,277 @@
+"""Bulk CSV/Parquet import for players, matches and scores.
+
+Files are read in chunks, validated with vectorized checks, resolved against
+in-memory team/player name maps and inserted with multi-row INSERTs inside large
+transactions. Audit rows are written with INSERT ... SELECT over the exact id
+ranges those INSERTs were given, and Player_Summary is refreshed once at the end
+instead of per row.
+
+Columns per kind (names or ids may be given for teams/players):
+
+    players: name, dob, position, nationality, team | team_id
+    matches: date, home_team | home_team_id, away_team | away_team_id, stadium, status
+    scores:  match_id, team | team_id, player | player_id, points, minute_scored
+"""
+import os
+import time
+import pandas as pd
+from functools import lru_cache
+from sqlalchemy import text
+from common import current_actor, db_begin, invalidate_tables, publish_change
+
+CHUNK_ROWS = 5000
+TXN_ROWS = 50000
+# Rows per multi-row INSERT; each statement's ids are read back with LAST_INSERT_ID().
+INSERT_ROWS = 1000
+# Above this many touched players a full rebuild beats per-player refreshes.
+REBUILD_THRESHOLD = 2000
+INT_MAX = 2**31 - 1
+
+KINDS = {
+    "players": {
+        "table": "Players",
+        "id_col": "player_id",
+        "columns": ["name", "dob", "position", "nationality", "team_id"],
+        "lengths": {"name": 50, "position": 30, "nationality": 40},
+    },
+    "matches": {
+        "table": "Matches",
+        "id_col": "match_id",
+        "columns": ["date", "home_team_id", "away_team_id", "stadium", "status"],
+        "lengths": {"stadium": 50, "status": 30},
+    },
+    "scores": {
+        "table": "Scores",
+        "id_col": "score_id",
+        "columns": ["match_id", "team_id", "player_id", "points", "minute_scored"],
+        "lengths": {},
+    },
+}
+
+def _norm(s: pd.Series) -> pd.Series:
+    return s.astype("string").str.strip().str.lower()
+
+
+def read_chunks(source, fmt=None, chunk_rows: int = CHUNK_ROWS):
+    """Yield DataFrames of at most ``chunk_rows`` rows from a CSV or Parquet path or file object."""
+    if fmt is None:
+        name = source if isinstance(source, (str, os.PathLike)) else getattr(source, "name", "")
+        fmt = "parquet" if str(name).lower().endswith((".parquet", ".pq")) else "csv"
+    if fmt == "csv":
+        yield from pd.read_csv(source, chunksize=chunk_rows, dtype=str, keep_default_na=False, na_values=[""])
+        return
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet import needs pyarrow: pip install pyarrow") from e
+    for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_rows):
+        yield batch.to_pandas()
+
+
+class NameMaps:
+    """Lower-cased team/player name -> id, plus the sets of existing ids.
+
+    Names shared by several players are ambiguous. Match ids are loaded only when
+    ``matches`` is set, since only scores reference them.
+    """
+
+    def __init__(self, conn, matches: bool = False):
+        teams = conn.execute(text("SELECT team_id, team_name FROM Teams")).fetchall()
+        self.teams = {str(n).strip().lower(): int(i) for i, n in teams if n is not None}
+        self.team_ids = {int(i) for i, _ in teams}
+        players = pd.DataFrame(conn.execute(text("SELECT player_id, name FROM Players")).fetchall(),
+                               columns=["player_id", "name"])
+        self.player_ids = set(players["player_id"].astype(int))
+        self.match_ids = ({r[0] for r in conn.execute(text("SELECT match_id FROM Matches"))}
+                          if matches else set())
+        players["key"] = _norm(players["name"])
+        dup = players["key"].duplicated(keep=False)
+        self.players = dict(zip(players.loc[~dup, "key"], players.loc[~dup, "player_id"].astype(int)))
+        self.ambiguous_players = set(players.loc[dup, "key"])
+
+
+def _resolve(df, errors, id_col, name_col, mapping, required, valid, ambiguous=()):
+    """Fill ``id_col`` from ``name_col`` where only the name is given; ids not in ``valid`` are rejected."""
+    ids = pd.to_numeric(df[id_col], errors="coerce") if id_col in df else pd.Series(pd.NA, index=df.index)
+    if name_col in df:
+        keys = _norm(df[name_col])
+        named = ids.isna() & keys.notna()
+        ids = pd.to_numeric(ids.where(~named, keys.map(mapping)), errors="coerce")
+        _flag(errors, named & keys.isin(list(ambiguous)), f"ambiguous {name_col}")
+        _flag(errors, named & ids.isna() & ~keys.isin(list(ambiguous)), f"unknown {name_col}")
+    if required:
+        _flag(errors, ids.isna(), f"missing {id_col}")
+    known = ids.isin(list(valid))
+    _flag(errors, ids.notna() & ~known, f"unknown {id_col}")
+    df[id_col] = ids.where(known).astype("Int64")
+
+
+def _flag(errors: pd.Series, mask, reason: str):
+    mask = pd.Series(mask, index=errors.index).fillna(False).astype(bool)
+    errors[mask & errors.isna()] = reason
+
+
+def _dates(df, errors, col, required=False):
+    raw = df[col] if col in df else pd.Series(pd.NA, index=df.index)
+    parsed = pd.to_datetime(raw, errors="coerce")
+    _flag(errors, raw.notna() & parsed.isna(), f"bad {col}")
+    if required:
+        _flag(errors, raw.isna(), f"missing {col}")
+    df[col] = parsed.dt.date.astype(object).where(parsed.notna(), None)
+
+
+def _ints(df, errors, col, required=False, minimum=None, valid=None):
+    raw = df[col] if col in df else pd.Series(pd.NA, index=df.index)
+    vals = pd.to_numeric(raw, errors="coerce")
+    _flag(errors, raw.notna() & (vals.isna() | (vals != vals.round())), f"bad {col}")
+    if required:
+        _flag(errors, raw.isna(), f"missing {col}")
+    if minimum is not None:
+        _flag(errors, vals < minimum, f"{col} below {minimum}")
+    _flag(errors, vals > INT_MAX, f"{col} too large")
+    if valid is not None:
+        _flag(errors, vals.notna() & ~vals.isin(list(valid)), f"unknown {col}")
+    df[col] = vals.where(vals == vals.round()).astype("Int64")
+
+
+def _strings(df, errors, col, max_len, required=False):
+    raw = df[col].astype("string").str.strip() if col in df else pd.Series(pd.NA, index=df.index, dtype="string")
+    raw = raw.where(raw != "")
+    if required:
+        _flag(errors, raw.isna(), f"missing {col}")
+    _flag(errors, raw.str.len() > max_len, f"{col} longer than {max_len}")
+    df[col] = raw
+
+
+def validate(kind: str, chunk: pd.DataFrame, maps: NameMaps):
+    """Return ``(rows, rejects)``: insert-ready rows and rejected rows with a ``reason`` column."""
+    if kind not in KINDS:
+        raise ValueError(f"unknown import kind {kind!r}; expected one of {sorted(KINDS)}")
+    df = chunk.rename(columns=lambda c: str(c).strip().lower()).copy()
+    errors = pd.Series(pd.NA, index=df.index, dtype="object")
+
+    for col, max_len in KINDS[kind]["lengths"].items():
+        _strings(df, errors, col, max_len, required=col == "name")
+    if kind == "players":
+        _dates(df, errors, "dob")
+        _resolve(df, errors, "team_id", "team", maps.teams, required=False, valid=maps.team_ids)
+    elif kind == "matches":
+        _dates(df, errors, "date", required=True)
+        _resolve(df, errors, "home_team_id", "home_team", maps.teams, required=True, valid=maps.team_ids)
+        _resolve(df, errors, "away_team_id", "away_team", maps.teams, required=True, valid=maps.team_ids)
+        _flag(errors, df["home_team_id"] == df["away_team_id"], "home and away team are the same")
+    else:
+        _ints(df, errors, "match_id", required=True, valid=maps.match_ids)
+        _resolve(df, errors, "team_id", "team", maps.teams, required=True, valid=maps.team_ids)
+        _resolve(df, errors, "player_id", "player", maps.players, required=True, valid=maps.player_ids,
+                 ambiguous=maps.ambiguous_players)
+        _ints(df, errors, "points", required=True, minimum=0)
+        _ints(df, errors, "minute_scored", required=True, minimum=0)
+
+    cols = KINDS[kind]["columns"]
+    for col in cols:
+        if col not in df:
+            df[col] = None
+    ok = errors.isna()
+    rows = df.loc[ok, cols].astype(object).where(df.loc[ok, cols].notna(), None)
+    rejects = chunk.loc[~ok].assign(reason=errors[~ok])
+    return rows.to_dict("records"), rejects
+
+
+@lru_cache(maxsize=16)
+def _insert_sql(table: str, cols: tuple, n: int):
+    values = ", ".join("(" + ", ".join(f":{c}_{i}" for c in cols) + ")" for i in range(n))
+    return text(f"INSERT INTO {table}({', '.join(cols)}) VALUES {values}")
+
+
+def _flush(conn, spec: dict, rows: list) -> list:
+    """Insert ``rows`` and audit exactly the ids they were given; returns ``(first, last)`` id ranges.
+
+    A multi-row INSERT is a "simple insert", so InnoDB gives it consecutive ids from
+    LAST_INSERT_ID(); rows other sessions insert meanwhile are never audited here.
+    """
+    table, id_col, cols = spec["table"], spec["id_col"], tuple(spec["columns"])
+    ranges = []
+    for start in range(0, len(rows), INSERT_ROWS):
+        batch = rows[start:start + INSERT_ROWS]
+        params = {f"{c}_{i}": r[c] for i, r in enumerate(batch) for c in cols}
+        n = conn.execute(_insert_sql(table, cols, len(batch)), params).rowcount
+        first = conn.execute(text("SELECT LAST_INSERT_ID()")).scalar()
+        ranges.append((first, first + n - 1))
+    actor = f"{current_actor()} (import)"[:64]
+    conn.execute(text(f"""
+        INSERT INTO Audit_Log(table_name, record_id, action, actor)
+        SELECT '{table}', {id_col}, 'INSERT', :actor FROM {table} WHERE {id_col} BETWEEN :first AND :last
+    """), [{"actor": actor, "first": a, "last": b} for a, b in ranges])
+    return ranges
+
+
+def _refresh_summary(player_ids: set):
+    if not player_ids:
+        return
+    with db_begin() as conn:
+        if len(player_ids) > REBUILD_THRESHOLD:
+            conn.execute(text("CALL rebuild_player_summary()"))
+        else:
+            for pid in sorted(player_ids):
+                conn.execute(text("CALL refresh_player_summary(:p)"), {"p": pid})
+
+
+def import_file(kind: str, source, fmt=None, chunk_rows: int = CHUNK_ROWS, txn_rows: int = TXN_ROWS,
+                dry_run: bool = False) -> dict:
+    """Import one file; returns counts, timing and a DataFrame of rejected rows.
+
+    Rows are committed every ``txn_rows`` rows, so a failure part-way keeps earlier batches.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"unknown import kind {kind!r}; expected one of {sorted(KINDS)}")
+    spec = KINDS[kind]
+    t0 = time.perf_counter()
+    read = valid = inserted = 0
+    rejects, touched, pending, ranges = [], set(), [], []
+
+    with db_begin() as conn:
+        maps = NameMaps(conn, matches=kind == "scores")
+
+    def commit(batch):
+        with db_begin() as conn:
+            ranges.extend(_flush(conn, spec, batch))
+
+    for chunk in read_chunks(source, fmt, chunk_rows):
+        read += len(chunk)
+        rows, bad = validate(kind, chunk, maps)
+        if not bad.empty:
+            rejects.append(bad)
+        valid += len(rows)
+        if dry_run:
+            continue
+        if kind == "scores":
+            touched.update(r["player_id"] for r in rows)
+        pending.extend(rows)
+        if len(pending) >= txn_rows:
+            commit(pending)
+            inserted += len(pending)
+            pending = []
+    if pending:
+        commit(pending)
+        inserted += len(pending)
+
+    if inserted:
+        if kind == "players":
+            touched.update(i for first, last in ranges for i in range(first, last + 1))
+        _refresh_summary(touched)
+        invalidate_tables(spec["table"], "Audit_Log", "Player_Summary", "Match_Results")
+        publish_change(spec["table"], None, "INSERT")
+
+    seconds = time.perf_counter() - t0
+    rejected = pd.concat(rejects, ignore_index=True) if rejects else pd.DataFrame(columns=["reason"])
+    return {
+        "kind": kind,
+        "rows_read": read,
+        "valid": valid,
+        "inserted": inserted,
+        "rejected": len(rejected),
+        "seconds": round(seconds, 3),
+        "rows_per_s": round(inserted / seconds, 1) if seconds else 0.0,
+        "rejects": rejected,
+    }
@@ -0,0 +1,186 @@
+"""Audit_Log change feed, so writes made on one replica reach the others.
+
+Every write procedure appends an Audit_Log row with an increasing id. ``ChangeFeed``
+polls for ids above its high-water mark and hands each row to ``on_change(table,
+record_id, action)``; a replica therefore sees another replica's write within about
+``interval`` seconds (plus ``AUDIT_FLUSH_S`` with ``AUDIT_MODE=async``). Writes made by
+this process come back through the feed as well, so subscribers must be idempotent.
+
+AUTO_INCREMENT ids are assigned at insert but become visible at commit, so a lower
+id can appear after a higher one was read. Skipped ids are re-checked for
+``gap_wait`` seconds (``GapTracker``, also used by the live match poller); a
+rolled-back insert leaves a gap that never fills.
+"""
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from sqlalchemy import text
+
+CHANGE_FEED_INTERVAL = float(os.getenv("CHANGE_FEED_INTERVAL", "0"))  # seconds; 0 disables the feed
+CHANGE_FEED_BATCH = int(os.getenv("CHANGE_FEED_BATCH", "1000"))
+CHANGE_FEED_GAP_WAIT = float(os.getenv("CHANGE_FEED_GAP_WAIT", "30"))
+# More rows than this for one table in one poll (a bulk import, a purge) become a
+# single (table, None, "UPDATE") event: subscribers rebuild instead of patching.
+CHANGE_FEED_COALESCE = int(os.getenv("CHANGE_FEED_COALESCE", "200"))
+MAX_GAPS = 10000
+
+FEED_SQL = """
+    SELECT id, table_name, record_id, action FROM Audit_Log
+    WHERE id > :hw
+    ORDER BY id
+    LIMIT :n
+"""
+GAP_SQL = "SELECT id, table_name, record_id, action FROM Audit_Log WHERE id IN ({ids}) ORDER BY id"
+
+log = logging.getLogger("sports_analytics.change_feed")
+
+
+def bind_ids(ids, prefix: str = "id"):
+    """``(placeholders, binds)`` for an ``IN (...)`` list of ``ids``."""
+    binds = {f"{prefix}{n}": i for n, i in enumerate(ids)}
+    return ", ".join(":" + b for b in binds), binds
+
+
+class GapTracker:
+    """Ids skipped below a reader's high-water mark, re-checked until filled or ``wait`` seconds pass."""
+
+    def __init__(self, wait: float = CHANGE_FEED_GAP_WAIT, limit: int = MAX_GAPS, what: str = "ids"):
+        self.wait = wait
+        self.limit = limit
+        self.what = what
+        self._pending = {}  # missing id -> monotonic deadline
+        self.filled = 0
+        self.expired = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def track(self, high_water: int, ids):
+        """Record ids missing between ``high_water`` and ``ids`` (ascending, all above it)."""
+        expected = high_water + 1
+        deadline = time.monotonic() + self.wait
+        for i in ids:
+            if i > expected:
+                missing = range(expected, i)
+                if len(self._pending) + len(missing) > self.limit:
+                    log.warning("skipping %d missing %s from %d", len(missing), self.what, expected)
+                else:
+                    self._pending.update(dict.fromkeys(missing, deadline))
+            expected = i + 1
+
+    def pending(self) -> list:
+        """Ids still worth re-checking; expired ones are dropped."""
+        now = time.monotonic()
+        expired = [i for i, deadline in self._pending.items() if deadline < now]
+        for i in expired:
+            del self._pending[i]
+        self.expired += len(expired)
+        return sorted(self._pending)
+
+    def fill(self, ids):
+        for i in ids:
+            if self._pending.pop(i, None) is not None:
+                self.filled += 1
+
+
+class ChangeFeed:
+    """Tails Audit_Log from a background thread; ``poll`` may also be called directly."""
+
+    def __init__(self, engine, on_change, on_tables=None, interval: float = CHANGE_FEED_INTERVAL,
+                 batch: int = CHANGE_FEED_BATCH, gap_wait: float = CHANGE_FEED_GAP_WAIT,
+                 coalesce: int = CHANGE_FEED_COALESCE):
+        self.engine = engine
+        self.on_change = on_change
+        self.on_tables = on_tables
+        self.interval = interval
+        self.batch = batch
+        self.gap_wait = gap_wait
+        self.coalesce = coalesce
+        self.high_water = None
+        self._gaps = GapTracker(gap_wait, what="audit ids")
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.polls = 0
+        self.delivered = 0
+        self.errors = 0
+        self.last_poll = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="change-feed", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                full = self.poll() >= self.batch
+            except Exception:
+                self.errors += 1
+                log.exception("change feed poll failed")
+                full = False
+            if not full:
+                self._stop.wait(self.interval)
+
+    def poll(self) -> int:
+        """Deliver rows above the high-water mark plus any late gap rows; returns rows read past it."""
+        with self._lock:
+            with self.engine.connect() as conn:
+                if self.high_water is None:
+                    # Start at the tail: state built after this point already reflects older writes.
+                    self.high_water = conn.execute(text("SELECT COALESCE(MAX(id), 0) FROM Audit_Log")).scalar()
+                    return 0
+                late = self._check_gaps(conn)
+                rows = conn.execute(text(FEED_SQL), {"hw": self.high_water, "n": self.batch}).fetchall()
+            self.polls += 1
+            self.last_poll = time.time()
+            self._gaps.track(self.high_water, [r[0] for r in rows])
+            if rows:
+                self.high_water = rows[-1][0]
+            self._deliver(late + list(rows))
+            return len(rows)
+
+    def _check_gaps(self, conn) -> list:
+        ids = self._gaps.pending()
+        if not ids:
+            return []
+        placeholders, binds = bind_ids(ids)
+        rows = conn.execute(text(GAP_SQL.format(ids=placeholders)), binds).fetchall()
+        self._gaps.fill(r[0] for r in rows)
+        return list(rows)
+
+    def _deliver(self, rows):
+        if not rows:
+            return
+        counts = Counter(r[1] for r in rows)
+        if self.on_tables is not None:
+            self.on_tables(set(counts))
+        bulk = {t for t, n in counts.items() if n > self.coalesce}
+        for _, table, record_id, action in rows:
+            if table not in bulk:
+                self.on_change(table, record_id, action)
+        for table in sorted(bulk):
+            self.on_change(table, None, "UPDATE")
+        self.delivered += len(rows)
+
+    def stats(self) -> dict:
+        return {
+            "running": self._thread is not None,
+            "high_water": self.high_water,
+            "polls": self.polls,
+            "delivered": self.delivered,
+            "pending_gaps": len(self._gaps),
+            "gaps_filled": self._gaps.filled,
+            "gaps_expired": self._gaps.expired,
+            "errors": self.errors,
+            "seconds_since_poll": round(time.time() - self.last_poll, 3) if self.last_poll else None,
+        }
@@ -1,9 +1,23 @@
+import atexit
+import functools
+import logging
 import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import date
 import bcrypt
 import pandas as pd
 import streamlit as st
-from sqlalchemy import create_engine, text
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from sqlalchemy import create_engine, event, exc, text
+import audit
+import change_feed
+import metrics
 
 
 # Secret
@@ -12,10 +26,500 @@ DB_PASS = os.getenv("DB_PASS", "")
 DB_HOST = os.getenv("DB_HOST", "")
 DB_NAME = os.getenv("DB_NAME", "")
 
-engine = create_engine(
-    f"mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}/{DB_NAME}",
-    pool_pre_ping=True
-)
+# Optional read replica: sql_df reads go here (except just after a write, see
+# REPLICA_PIN_S), call_proc writes always go to DB_HOST.
+DB_READ_HOST = os.getenv("DB_READ_HOST", "")
+
+# Connection pool
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# "always": ping on every checkout; "idle": only connections unused for DB_PING_IDLE
+# seconds; "never": rely on DB_POOL_RECYCLE alone.
+DB_PRE_PING = os.getenv("DB_PRE_PING", "idle").strip().lower()
+if DB_PRE_PING not in ("always", "idle", "never"):
+    raise ValueError(f"DB_PRE_PING must be 'always', 'idle' or 'never', not {DB_PRE_PING!r}")
+DB_PING_IDLE = float(os.getenv("DB_PING_IDLE", "30"))
+
+
+class PoolStats:
+    """Checkout counts and time spent waiting for a pooled connection."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+
+def _mark_checkin(dbapi_conn, record):
+    record.info["last_used"] = time.monotonic()
+
+
+def _ping_if_idle(dbapi_conn, record, proxy):
+    last = record.info.get("last_used")
+    if last is None or time.monotonic() - last < DB_PING_IDLE:
+        return
+    try:
+        cur = dbapi_conn.cursor()
+        cur.execute("SELECT 1")
+        cur.close()
+    except Exception as e:
+        # The pool discards this connection and retries the checkout with a fresh one.
+        raise exc.DisconnectionError() from e
+
+
+pool_stats = {}
+
+
+def make_engine(host: str):
+    eng = create_engine(
+        f"mysql+pymysql://{DB_USER}:{DB_PASS}@{host}/{DB_NAME}",
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_PRE_PING == "always",
+    )
+    if DB_PRE_PING == "idle":
+        event.listen(eng, "checkin", _mark_checkin)
+        event.listen(eng, "checkout", _ping_if_idle)
+    pool_stats[eng] = PoolStats()
+    return eng
+
+
+engine = make_engine(DB_HOST)
+read_engine = make_engine(DB_READ_HOST) if DB_READ_HOST else engine
+
+
+@atexit.register
+def _dispose_engines():
+    engine.dispose()
+    if read_engine is not engine:
+        read_engine.dispose()
+
+
+# Deferred audit rows (AUDIT_MODE=async); flushed before the engines are disposed.
+audit_buffer = audit.AuditBuffer(engine, on_flush=lambda n: invalidate_tables("Audit_Log"))
+atexit.register(audit_buffer.close)
+
+
+def default_actor() -> str:
+    return os.getenv("APP_ACTOR", "app-user")[:64]
+
+
+def current_actor() -> str:
+    """Username recorded in Audit_Log: the signed-in user (as stored by login_form), else APP_ACTOR."""
+    try:
+        user = st.session_state.get("user") or {}
+    except Exception:
+        user = {}
+    return str(user.get("name") or user.get("email") or default_actor())[:64]
+
+
+@contextmanager
+def db_begin(eng=None):
+    """``eng.begin()`` that records how long the pool checkout took."""
+    eng = eng or engine
+    t0 = time.perf_counter()
+    with eng.connect() as conn:
+        pool_stats[eng].record_wait(time.perf_counter() - t0)
+        with conn.begin():
+            yield conn
+
+
+def pool_metrics() -> dict:
+    engines = {"primary": engine}
+    if read_engine is not engine:
+        engines["replica"] = read_engine
+    out = {}
+    for name, eng in engines.items():
+        pool, stats = eng.pool, pool_stats[eng]
+        out[name] = {
+            "pool_size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "checkouts": stats.checkouts,
+            "wait_avg_ms": round(stats.wait_total / stats.checkouts * 1000, 3) if stats.checkouts else 0.0,
+            "wait_max_ms": round(stats.wait_max * 1000, 3),
+        }
+    return out
+
+
+# Query cache
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "60"))
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "512"))
+QUERY_CACHE_MAX_BYTES = int(os.getenv("QUERY_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Lookup lists (teams, positions, ...) change rarely and are invalidated on write anyway.
+LOOKUP_TTL = 600
+
+# Base tables each view reads, so a write to a table evicts the views built on it.
+VIEW_TABLES = {
+    "v_player_summary": ("Player_Summary",),
+    "v_player_summary_live": ("Players", "Scores", "Matches", "Teams", "Injuries"),
+    "v_team_totals": ("Teams", "Scores"),
+    "v_match_play_by_play": ("Scores", "Matches", "Teams", "Players"),
+    "v_injury_summary": ("Injuries", "Players", "Teams"),
+    "v_injury_active": ("Injuries", "Players", "Teams"),
+    "v_match_score_flow": ("Scores", "Matches"),
+    "v_match_player_xg": ("Scores", "Players", "Teams"),
+    "v_match_team_stats": ("Matches", "Scores", "Teams"),
+    "v_match_key_moments": ("Scores", "Players", "Teams"),
+    "v_match_mvp": ("Scores", "Players", "Teams"),
+}
+
+# Tables read by procedures that return result sets.
+PROC_READS = {
+    "search_players": ("Player_Summary", "Players"),
+    "count_players": ("Player_Summary", "Players"),
+    "login_user": ("Users",),
+}
+
+# Tables written by each procedure; a successful call evicts every cached query tagged with them.
+PROC_WRITES = {
+    "signup_user": ("Users",),
+    "add_team": ("Teams",),
+    "update_team": ("Teams", "Player_Summary"),
+    "delete_team": ("Teams",),
+    "add_player": ("Players", "Player_Summary"),
+    "update_player": ("Players", "Player_Summary"),
+    "delete_player": ("Players", "Player_Summary"),
+    "add_match": ("Matches", "Match_Results"),
+    "update_match": ("Matches", "Player_Summary", "Match_Results"),
+    "delete_match": ("Matches", "Match_Results"),
+    "add_score": ("Scores", "Player_Summary", "Match_Results"),
+    "update_score": ("Scores", "Player_Summary", "Match_Results"),
+    "delete_score": ("Scores", "Player_Summary", "Match_Results"),
+    "add_injury": ("Injuries", "Player_Summary"),
+    "update_injury": ("Injuries", "Player_Summary"),
+    "delete_injury": ("Injuries", "Player_Summary"),
+    "rebuild_player_summary": ("Player_Summary",),
+    "rebuild_match_results": ("Match_Results",),
+}
+
+_TABLE_REF = re.compile(r"\b(?:FROM|JOIN)\s+`?([A-Za-z_][A-Za-z0-9_]*)", re.IGNORECASE)
+_CALL_REF = re.compile(r"^\s*CALL\s+`?([A-Za-z_][A-Za-z0-9_]*)", re.IGNORECASE)
+
+
+def _normalize_sql(q: str) -> str:
+    return " ".join(q.split())
+
+
+def query_tables(q: str) -> set:
+    """Lower-cased base tables a query depends on, with views and procedures expanded."""
+    names = set(_TABLE_REF.findall(q))
+    call = _CALL_REF.match(q)
+    if call:
+        names.update(PROC_READS.get(call.group(1).lower(), ()))
+    tables = set()
+    for name in names:
+        tables.update(VIEW_TABLES.get(name.lower(), (name,)))
+    return {t.lower() for t in tables}
+
+
+class QueryCache:
+    """Process-wide LRU cache of query results with per-entry TTLs and table-tag invalidation."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (expires_at, df, nbytes, tables)
+        self._by_table = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] < time.monotonic():
+                self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, df: pd.DataFrame, ttl: float, tables: set, generation: int, nbytes: int):
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            # An invalidation ran while this result was being fetched; it may already be stale.
+            if generation != self.generation:
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + ttl, df, nbytes, tables)
+            self._bytes += nbytes
+            for t in tables:
+                self._by_table.setdefault(t, set()).add(key)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, tables) -> int:
+        with self._lock:
+            self.generation += 1
+            keys = set()
+            for t in tables:
+                keys.update(self._by_table.get(t.lower(), ()))
+            for key in keys:
+                self._drop(key)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._by_table.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _drop(self, key):
+        _, _, nbytes, tables = self._entries.pop(key)
+        self._bytes -= nbytes
+        for t in tables:
+            keys = self._by_table.get(t)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[t]
+
+
+query_cache = QueryCache(QUERY_CACHE_MAX_ENTRIES, QUERY_CACHE_MAX_BYTES)
+
+
+# After a write, reads of the tables it touched go to the primary for REPLICA_PIN_S
+# seconds, so a lagging replica cannot serve (and the cache keep) pre-write rows.
+REPLICA_PIN_S = float(os.getenv("REPLICA_PIN_S", "5"))
+_pinned = {}  # lower-cased table, or "*" for every table -> monotonic expiry
+_pinned_lock = threading.Lock()
+
+
+def pin_to_primary(*tables):
+    if read_engine is engine or REPLICA_PIN_S <= 0:
+        return
+    until = time.monotonic() + REPLICA_PIN_S
+    with _pinned_lock:
+        for t in tables:
+            _pinned[t.lower()] = until
+
+
+def read_engine_for(q: str):
+    """``read_engine``, or the primary while a table ``q`` reads was written in the last REPLICA_PIN_S."""
+    if not _pinned:
+        return read_engine
+    tables = query_tables(q)
+    now = time.monotonic()
+    with _pinned_lock:
+        for t in [t for t, until in _pinned.items() if until < now]:
+            del _pinned[t]
+        if "*" in _pinned or not tables.isdisjoint(_pinned):
+            return engine
+    return read_engine
+
+
+def invalidate_tables(*tables) -> int:
+    pin_to_primary(*tables)
+    return query_cache.invalidate(tables)
+
+
+# Query instrumentation
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+log = logging.getLogger("sports_analytics")
+query_metrics = metrics.QueryMetrics()
+
+# Per-thread context: Streamlit runs each script rerun on its own thread.
+_ctx = threading.local()
+
+
+def query_signature(q: str) -> str:
+    call = _CALL_REF.match(q)
+    if call:
+        return f"CALL {call.group(1)}"
+    sig = _normalize_sql(q)
+    return sig if len(sig) <= 160 else sig[:157] + "..."
+
+
+def current_page() -> str:
+    return getattr(_ctx, "page", "-")
+
+
+def begin_rerun(page: str):
+    """Start per-rerun accounting for ``page``; returns (and logs) the previous rerun's summary.
+
+    The running totals live on the script thread and in session state, so the next
+    rerun of the same session can report them.
+    """
+    prev = st.session_state.get("_rerun_stats")
+    if prev and (prev["queries"] or prev["cache_hits"]):
+        log.info("rerun summary: %s", prev)
+    _ctx.page = page
+    _ctx.rerun = {"page": page, "queries": 0, "cache_hits": 0, "db_ms": 0.0, "rows": 0, "bytes": 0}
+    st.session_state["_rerun_stats"] = _ctx.rerun
+    return prev
+
+
+def fragment(name: str, run_every=None):
+    """``st.fragment`` whose own reruns are accounted as page ``<page>:<name>``.
+
+    A widget inside the fragment reruns just that function: auth_guard, the page's
+    lookups and the other fragments are skipped. In a full rerun the fragment's
+    queries count towards the page as usual.
+    """
+    def wrap(fn):
+        page = current_page().split(":")[0]
+
+        @functools.wraps(fn)
+        def body(*args, **kwargs):
+            ctx = get_script_run_ctx()
+            if ctx is not None and getattr(ctx, "fragment_ids_this_run", None):
+                begin_rerun(f"{page}:{name}")
+            return fn(*args, **kwargs)
+
+        return st.fragment(body, run_every=run_every)
+    return wrap
+
+
+def rerun_summary() -> dict:
+    return dict(getattr(_ctx, "rerun", None) or {})
+
+
+def frame_bytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+_rerun_lock = threading.Lock()
+
+
+def _record_query(sig: str, seconds: float, rows: int = 0, nbytes: int = 0, ok: bool = True,
+                  page=None, rerun=None):
+    page = page or current_page()
+    query_metrics.record(sig, page, seconds, rows, nbytes, ok)
+    ms = seconds * 1000
+    if ms >= SLOW_QUERY_MS:
+        log.warning("slow query %.1f ms page=%s rows=%d bytes=%d: %s", ms, page, rows, nbytes, sig)
+    rerun = rerun if rerun is not None else getattr(_ctx, "rerun", None)
+    if rerun is not None:
+        with _rerun_lock:
+            rerun["queries"] += 1
+            rerun["db_ms"] = round(rerun["db_ms"] + ms, 2)
+            rerun["rows"] += rows
+            rerun["bytes"] += nbytes
+
+
+def _record_hit(sig: str, page=None, rerun=None):
+    query_metrics.record_hit(sig, page or current_page())
+    rerun = rerun if rerun is not None else getattr(_ctx, "rerun", None)
+    if rerun is not None:
+        with _rerun_lock:
+            rerun["cache_hits"] += 1
+
+
+def prometheus_metrics() -> str:
+    parts = [query_metrics.prometheus()]
+    pools = pool_metrics()
+    for field, help_text in [
+        ("checked_out", "Connections currently checked out of the pool."),
+        ("overflow", "Overflow connections currently open."),
+        ("checkouts", "Pool checkouts since start."),
+        ("wait_avg_ms", "Average pool checkout wait in milliseconds."),
+        ("wait_max_ms", "Longest pool checkout wait in milliseconds."),
+    ]:
+        parts.append(metrics.gauges(f"sa_pool_{field}", help_text,
+                                    {f'engine="{name}"': m[field] for name, m in pools.items()}))
+    for field, value in query_cache.stats().items():
+        parts.append(metrics.gauges(f"sa_query_cache_{field}", f"Query cache {field}.", {"": value}))
+    feed = audit_feed.stats()
+    for field in ("delivered", "pending_gaps", "gaps_expired", "errors", "seconds_since_poll"):
+        value = feed[field]
+        if value is not None:
+            parts.append(metrics.gauges(f"sa_change_feed_{field}", f"Change feed {field}.", {"": value}))
+    return "".join(parts)
+
+
+if METRICS_PORT:
+    metrics.start_metrics_server(METRICS_PORT, prometheus_metrics)
+
+
+# Change notifications for in-process derived state (search index, snapshots, ...).
+PROC_ACTIONS = {"add": "INSERT", "update": "UPDATE", "delete": "DELETE"}
+ID_PARAMS = {
+    "Teams": "p_team_id",
+    "Players": "p_player_id",
+    "Matches": "p_match_id",
+    "Scores": "p_score_id",
+    "Injuries": "p_injury_id",
+}
+
+_change_listeners = []
+
+
+def subscribe_changes(fn):
+    """Call ``fn(table, record_id, action)`` after every successful write.
+
+    ``record_id`` is None when it is not known (e.g. the id assigned by an INSERT).
+    """
+    _change_listeners.append(fn)
+    return fn
+
+
+def publish_change(table: str, record_id, action: str):
+    for fn in list(_change_listeners):
+        try:
+            fn(table, record_id, action)
+        except Exception:
+            logging.exception("change listener %r failed for %s/%s", fn, table, action)
+
+
+def _proc_change(proc_name: str, kwargs: dict):
+    action = PROC_ACTIONS.get(proc_name.split("_", 1)[0])
+    tables = PROC_WRITES.get(proc_name)
+    if action is None or not tables:
+        return None
+    table = tables[0]
+    record_id = None if action == "INSERT" else kwargs.get(ID_PARAMS.get(table))
+    return table, record_id, action
+
+
+# Cache tags a write to each base table can touch, from the procedures that write it.
+CHANGE_TABLES = {}
+for _tables in PROC_WRITES.values():
+    CHANGE_TABLES.setdefault(_tables[0], set()).update(_tables)
+
+
+def _feed_tables(tables: set):
+    invalidate_tables("Audit_Log", *(t for table in tables for t in CHANGE_TABLES.get(table, (table,))))
+
+
+# Writes made by other replicas, read back from Audit_Log (CHANGE_FEED_INTERVAL > 0).
+audit_feed = change_feed.ChangeFeed(engine, publish_change, on_tables=_feed_tables)
+if change_feed.CHANGE_FEED_INTERVAL > 0:
+    audit_feed.start()
+    atexit.register(audit_feed.stop)
 
 
 def inject_dark_theme():
@@ -43,6 +547,7 @@ def inject_dark_theme():
       border-radius: 16px; padding: 16px 18px;
       box-shadow: 0 10px 30px rgba(0,0,0,.18); color: #e5e7eb;
     }
+    .card-grid { display:grid; grid-template-columns:repeat(auto-fill, minmax(280px, 1fr)); gap:16px; margin-bottom:16px; }
     .title-20 { font-size:20px; font-weight:700; margin: 0 0 6px 0; }
     .muted { color: #a3a3a3; font-size: 13px; }
     .app-badge {
@@ -66,24 +571,115 @@ def inject_dark_theme():
     """, unsafe_allow_html=True)
 
 
-def sql_df(q: str, params=None) -> pd.DataFrame:
+def _read(q: str, params, ttl, page, rerun) -> pd.DataFrame:
+    """Cache-aware read shared by sql_df and sql_many; raises on database errors."""
+    params = params or {}
+    ttl = QUERY_CACHE_TTL if ttl is None else ttl
+    sig = query_signature(q)
+    key = None
+    if ttl > 0:
+        key = (_normalize_sql(q), repr(sorted(params.items())))
+        cached = query_cache.get(key)
+        if cached is not None:
+            _record_hit(sig, page, rerun)
+            return cached.copy()
+        generation = query_cache.generation
+    t0 = time.perf_counter()
     try:
-        with engine.begin() as conn:
-            return pd.read_sql(text(q), conn, params=params or {})
+        with db_begin(read_engine_for(q)) as conn:
+            df = pd.read_sql(text(q), conn, params=params)
+    except Exception:
+        _record_query(sig, time.perf_counter() - t0, ok=False, page=page, rerun=rerun)
+        raise
+    nbytes = frame_bytes(df)
+    _record_query(sig, time.perf_counter() - t0, len(df), nbytes, page=page, rerun=rerun)
+    if key is not None:
+        query_cache.put(key, df, ttl, query_tables(q), generation, nbytes)
+        return df.copy()
+    return df
+
+
+def sql_df(q: str, params=None, ttl=None) -> pd.DataFrame:
+    """Run a read query, serving repeated calls from the shared query cache.
+
+    ``ttl`` overrides ``QUERY_CACHE_TTL`` in seconds; ``ttl=0`` bypasses the cache.
+    Callers get a copy of the cached frame, so they are free to mutate it.
+    """
+    try:
+        return _read(q, params, ttl, current_page(), getattr(_ctx, "rerun", None))
     except Exception as e:
         st.error(f"Database error: {e}")
         return pd.DataFrame()
 
 
+# Concurrent reads: sized to the pool so fan-out never queues on checkout.
+QUERY_WORKERS = int(os.getenv("QUERY_WORKERS", str(min(8, DB_POOL_SIZE))))
+_executor = ThreadPoolExecutor(max_workers=max(1, QUERY_WORKERS), thread_name_prefix="sql")
+
+
+def read_many(queries: dict, ttl=None):
+    """``sql_many`` without Streamlit calls, for background threads: returns ``(frames, errors)`` by name."""
+    page, rerun = current_page(), getattr(_ctx, "rerun", None)
+    futures = {}
+    for name, spec in queries.items():
+        spec = (spec,) if isinstance(spec, str) else tuple(spec)
+        q, params, q_ttl = spec + (None, ttl)[len(spec) - 1:]
+        futures[name] = _executor.submit(_read, q, params, q_ttl, page, rerun)
+    results, errors = {}, {}
+    for name, fut in futures.items():
+        try:
+            results[name] = fut.result()
+        except Exception as e:
+            errors[name] = e
+    return results, errors
+
+
+def sql_many(queries: dict, ttl=None) -> dict:
+    """Run independent read queries concurrently, each on its own pooled connection.
+
+    ``queries`` maps a name to SQL text, ``(sql, params)`` or ``(sql, params, ttl)``;
+    returns name -> DataFrame. Page latency approaches the slowest query instead of
+    the sum of all of them.
+    """
+    results, errors = read_many(queries, ttl)
+    for name, e in errors.items():
+        st.error(f"Database error: {e}")
+        results[name] = pd.DataFrame()
+    return results
+
+
 def call_proc(proc_name: str, **kwargs) -> bool:
     placeholders = ", ".join([f":{k}" for k in kwargs])
+    sig = f"CALL {proc_name}"
+    actor = current_actor()
+    defer = audit.AUDIT_MODE == "async"
+    deferred = None
+    t0 = time.perf_counter()
     try:
-        with engine.begin() as conn:
+        with db_begin(engine) as conn:
+            # Session variables outlive the call on pooled connections, so set all of them every time.
+            conn.execute(text("SET @app_actor = :actor, @app_audit_defer = :defer, @audit_table = NULL"),
+                         {"actor": actor, "defer": int(defer)})
             conn.execute(text(f"CALL {proc_name}({placeholders})"), kwargs)
-        return True
+            if defer:
+                deferred = conn.execute(text("SELECT @audit_table, @audit_record_id, @audit_action")).first()
     except Exception as e:
+        _record_query(sig, time.perf_counter() - t0, ok=False)
         st.error(f"Procedure `{proc_name}` failed: {e}")
         return False
+    _record_query(sig, time.perf_counter() - t0)
+    if deferred is not None and deferred[0] is not None:
+        audit_buffer.add(deferred[0], deferred[1], deferred[2], actor)
+    written = PROC_WRITES.get(proc_name)
+    change = _proc_change(proc_name, kwargs)
+    if written is None:
+        pin_to_primary("*")
+        query_cache.clear()
+    else:
+        invalidate_tables(*written, *(("Audit_Log",) if change is not None else ()))
+    if change is not None:
+        publish_change(*change)
+    return True
 
 
 def null_or(val):
@@ -109,7 +705,7 @@ def login_form():
         submit = st.form_submit_button("Login")
 
         if submit:
-            df = sql_df("CALL login_user(:email)", {"email": email})
+            df = sql_df("CALL login_user(:email)", {"email": email}, ttl=0)
             if df.empty:
                 st.error("No user with that email.")
             else:
@@ -154,6 +750,7 @@ def signup_form():
 
 
 def auth_guard():
+    last_rerun = begin_rerun(os.path.splitext(os.path.basename(sys._getframe(1).f_code.co_filename))[0])
     inject_dark_theme()
     if "user" not in st.session_state:
         st.session_state.user = None
@@ -168,6 +765,9 @@ def auth_guard():
         st.stop()
 
     user = st.session_state.user
+    if current_actor() == default_actor():
+        log.error("signed-in session %r has no name or email; its writes would be audited as %r",
+                  user.get("id"), default_actor())
     with st.sidebar:
         st.markdown("")
         st.markdown(
@@ -187,6 +787,12 @@ def auth_guard():
             unsafe_allow_html=True
         )
 
+    if user["role"] == "admin" and last_rerun:
+        st.sidebar.caption(
+            f"Last rerun ({last_rerun['page']}): {last_rerun['queries']} queries · "
+            f"{last_rerun['cache_hits']} cached · {last_rerun['db_ms']:.0f} ms in DB"
+        )
+
     st.sidebar.markdown("---")
     if st.sidebar.button("🚪 Sign Out"):
         st.session_state.user = None
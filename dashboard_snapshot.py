@@ -0,0 +1,138 @@
+"""In-memory Dashboard snapshot, refreshed in the background after writes.
+
+Viewers read the current snapshot without touching the database. Writes mark
+the affected parts dirty; a debounced timer re-queries only those parts. A part
+whose query fails keeps its previous frame and is retried after SNAPSHOT_RETRY.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+import pandas as pd
+from common import read_many, subscribe_changes
+
+TOP_N = 10
+SNAPSHOT_DEBOUNCE = float(os.getenv("SNAPSHOT_DEBOUNCE", "2"))
+# Upper bound on how long a steady stream of writes can postpone a refresh.
+SNAPSHOT_MAX_DELAY = float(os.getenv("SNAPSHOT_MAX_DELAY", "10"))
+# Safety net for writes that bypass call_proc (manual SQL, rebuild procedures).
+SNAPSHOT_MAX_AGE = float(os.getenv("SNAPSHOT_MAX_AGE", "300"))
+SNAPSHOT_RETRY = float(os.getenv("SNAPSHOT_RETRY", "5"))
+
+SNAPSHOT_QUERIES = {
+    "team_totals": "SELECT team_name, total_points, points_rank FROM v_team_totals",
+    "top_players": f"""
+        SELECT name, team_name, total_points
+        FROM v_player_summary
+        ORDER BY total_points DESC, name
+        LIMIT {TOP_N}
+    """,
+    "injuries": "SELECT status, COUNT(*) AS cnt FROM Injuries GROUP BY status",
+}
+
+# Snapshot parts affected by a write to each table.
+TABLE_PARTS = {
+    "Teams": {"team_totals", "top_players"},
+    "Players": {"top_players"},
+    "Scores": {"team_totals", "top_players"},
+    "Injuries": {"injuries"},
+}
+
+log = logging.getLogger("sports_analytics.dashboard")
+
+
+class DashboardSnapshotStore:
+    def __init__(self, debounce: float = SNAPSHOT_DEBOUNCE, max_delay: float = SNAPSHOT_MAX_DELAY):
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._parts = {}
+        self._refreshed_at = None
+        self._refreshed_mono = 0.0
+        self._dirty = set()
+        self._dirty_since = None
+        self._timer = None
+        self._retry_at = {}  # part that failed to load -> monotonic time of the next synchronous try
+        self.error = None
+
+    def get(self) -> dict:
+        """Current snapshot: the three frames plus ``refreshed_at`` and ``error``.
+
+        Parts that have never loaded are queried synchronously; a part that failed
+        to load is an empty frame until a retry succeeds, and is not queried
+        synchronously again for ``SNAPSHOT_RETRY`` seconds.
+        """
+        now = time.monotonic()
+        with self._lock:
+            unloaded = set(SNAPSHOT_QUERIES) - set(self._parts)
+            due = {name for name in unloaded if self._retry_at.get(name, 0.0) <= now}
+        if unloaded:
+            if due:
+                self.refresh(due)
+        elif now - self._refreshed_mono > SNAPSHOT_MAX_AGE:
+            self.mark_dirty(set(SNAPSHOT_QUERIES))
+        with self._lock:
+            parts = {name: self._parts.get(name, pd.DataFrame()) for name in SNAPSHOT_QUERIES}
+            return dict(parts, refreshed_at=self._refreshed_at, error=self.error)
+
+    def refresh(self, parts=None):
+        with self._refresh_lock:
+            with self._lock:
+                parts = set(parts or self._dirty) or set(SNAPSHOT_QUERIES)
+                self._dirty -= parts
+                if not self._dirty:
+                    self._dirty_since = None
+            dfs, errors = read_many({name: (SNAPSHOT_QUERIES[name], None, 0) for name in parts})
+            with self._lock:
+                self._parts.update(dfs)
+                for name in dfs:
+                    self._retry_at.pop(name, None)
+                retry_at = time.monotonic() + SNAPSHOT_RETRY
+                self._retry_at.update(dict.fromkeys(errors, retry_at))
+                if errors:
+                    self.error = "; ".join(f"{name}: {e}" for name, e in sorted(errors.items()))
+                else:
+                    self.error = None
+                    self._refreshed_at = datetime.now()
+                    self._refreshed_mono = time.monotonic()
+        if errors:
+            log.warning("dashboard snapshot refresh failed, retrying in %ss: %s", SNAPSHOT_RETRY, self.error)
+            self.mark_dirty(set(errors), delay=SNAPSHOT_RETRY)
+
+    def mark_dirty(self, parts: set, delay: float = None):
+        """Schedule a refresh of ``parts`` once writes have been quiet for ``debounce`` seconds."""
+        if not parts:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._dirty |= parts
+            if self._dirty_since is None:
+                self._dirty_since = now
+            if delay is None:
+                delay = min(self.debounce, max(0.0, self._dirty_since + self.max_delay - now))
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(delay, self._run_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _run_timer(self):
+        with self._lock:
+            self._timer = None
+            if not self._dirty:
+                return
+        self.refresh()
+
+
+snapshot_store = DashboardSnapshotStore()
+
+
+@subscribe_changes
+def _on_change(table, record_id, action):
+    snapshot_store.mark_dirty(TABLE_PARTS.get(table, set()))
+
+
+def get_dashboard_snapshot() -> dict:
+    return snapshot_store.get()
@@ -0,0 +1,223 @@
+"""Deterministic synthetic league data for benchmarks.
+
+``generate`` builds every table as NumPy columns from a seed, so the same seed and
+sizes always produce the same rows. ``load`` bulk-inserts them with explicit ids
+into empty league tables and then rebuilds Player_Summary; Match_Results follows
+through its Matches/Scores triggers. Generated rows are not audited.
+"""
+import time
+import numpy as np
+from sqlalchemy import text
+from common import engine, invalidate_tables, publish_change
+
+CHUNK_ROWS = 10000
+
+# Named league sizes. Each season is a double round robin, so matches per season
+# are teams * (teams - 1); score events are shots, of which GOAL_RATE score a point.
+SCALES = {
+    "tiny": dict(teams=6, players_per_team=15, seasons=1, events_per_match=6, injury_rate=0.05),
+    "small": dict(teams=12, players_per_team=20, seasons=2, events_per_match=10, injury_rate=0.05),
+    "medium": dict(teams=20, players_per_team=25, seasons=4, events_per_match=16, injury_rate=0.08),
+    "large": dict(teams=30, players_per_team=28, seasons=8, events_per_match=24, injury_rate=0.10),
+    "xlarge": dict(teams=40, players_per_team=30, seasons=10, events_per_match=64, injury_rate=0.10),
+}
+FIRST_SEASON = 2015
+GOAL_RATE = 0.3
+HOME_SHARE = 0.55
+
+CITIES = ["Ashford", "Brookvale", "Carrow", "Dunmore", "Eastwick", "Fairhaven", "Glenrock", "Harlow",
+          "Ironbridge", "Kingsport", "Lakeside", "Marston", "Northam", "Oakridge", "Portsea", "Queensbury",
+          "Riverton", "Southgate", "Thornbury", "Umberley", "Valemont", "Westfield", "Yarrow", "Zennor"]
+SUFFIXES = ["United", "City", "Rovers", "Athletic", "Wanderers", "Albion", "Town", "Rangers"]
+FIRST_NAMES = ["Alex", "Ben", "Carlos", "Daniel", "Eric", "Felix", "Gabriel", "Hugo", "Ivan", "James",
+               "Karim", "Luca", "Marco", "Nico", "Oscar", "Pablo", "Rafael", "Sami", "Tomas", "Victor",
+               "Yusuf", "Zane", "Leon", "Mateo", "Jonas", "Kai", "Diego", "Emil", "Finn", "Omar"]
+LAST_NAMES = ["Silva", "Müller", "Rossi", "García", "Smith", "Dubois", "Novak", "Jensen", "Kowalski",
+              "Okafor", "Tanaka", "Fernandes", "Larsen", "Moreau", "Schmidt", "Costa", "Ibrahim",
+              "Petrov", "Walker", "Berg", "Romero", "Hughes", "Nakamura", "Kim", "Mensah", "Laine"]
+NATIONALITIES = ["England", "Spain", "Germany", "France", "Italy", "Brazil", "Argentina", "Portugal",
+                 "Netherlands", "Nigeria", "Japan", "USA", "Norway", "Poland", "Ghana", "Korea"]
+# Position -> (share of the squad, relative chance of taking a shot)
+POSITIONS = {"Goalkeeper": (0.1, 0.02), "Defender": (0.35, 0.4), "Midfielder": (0.35, 1.0),
+             "Forward": (0.2, 2.5)}
+INJURY_TYPES = ["Hamstring", "Ankle Sprain", "Knee Ligament", "Groin Strain", "Concussion",
+                "Calf Strain", "Back Spasm", "Fracture"]
+INJURY_STATUSES = ["Fit", "Injured", "Recovering", "Doubtful"]
+
+# Insert order respects foreign keys; clearing runs in reverse.
+TABLES = ["Teams", "Players", "Matches", "Team_Match", "Scores", "Injuries"]
+DERIVED_TABLES = ["Player_Summary", "Match_Results"]
+
+
+def spec_for(scale: str = "small", **overrides) -> dict:
+    """League sizes for a named scale, with any ``None`` override ignored."""
+    if scale not in SCALES:
+        raise ValueError(f"unknown scale {scale!r}; expected one of {list(SCALES)}")
+    return dict(SCALES[scale], **{k: v for k, v in overrides.items() if v is not None})
+
+
+def generate(spec: dict, seed: int = 0) -> dict:
+    """Table name -> column name -> NumPy array, for one league."""
+    if spec["teams"] < 2:
+        raise ValueError("a league needs at least two teams")
+    rng = np.random.default_rng(seed)
+    n_teams, per_team = spec["teams"], spec["players_per_team"]
+
+    # Teams
+    team_id = np.arange(1, n_teams + 1)
+    city = np.array([CITIES[i % len(CITIES)] for i in range(n_teams)], dtype=object)
+    team_name = np.array([f"{CITIES[i % len(CITIES)]} {SUFFIXES[(i // len(CITIES) + i) % len(SUFFIXES)]}"
+                          for i in range(n_teams)], dtype=object)
+    teams = {
+        "team_id": team_id,
+        "team_name": team_name,
+        "coach_name": rng.choice(FIRST_NAMES, n_teams).astype(object) + " " + rng.choice(LAST_NAMES, n_teams).astype(object),
+        "founded_year": rng.integers(1870, 1990, n_teams),
+        "home_city": city,
+    }
+
+    # Players: squads of per_team, positions by squad share.
+    n_players = n_teams * per_team
+    shares = np.array([s for s, _ in POSITIONS.values()])
+    squad = np.repeat(np.arange(len(POSITIONS)), np.round(shares * per_team).astype(int))
+    squad = np.resize(squad, per_team) if len(squad) else np.zeros(per_team, dtype=int)
+    pos_idx = np.tile(squad, n_teams)
+    names = rng.choice(FIRST_NAMES, n_players).astype(object) + " " + rng.choice(LAST_NAMES, n_players).astype(object)
+    players = {
+        "player_id": np.arange(1, n_players + 1),
+        "name": names,
+        "dob": np.datetime64(f"{FIRST_SEASON - 35}-01-01") + rng.integers(0, 365 * 18, n_players).astype("timedelta64[D]"),
+        "position": np.array(list(POSITIONS), dtype=object)[pos_idx],
+        "nationality": rng.choice(NATIONALITIES, n_players).astype(object),
+        "team_id": np.repeat(team_id, per_team),
+    }
+
+    # Matches: every ordered pair once per season, spread over the calendar year.
+    home, away = np.meshgrid(team_id, team_id, indexing="ij")
+    pairs = np.column_stack([home.ravel(), away.ravel()])
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+    per_season = len(pairs)
+    m_home, m_away, m_date = [], [], []
+    for s in range(spec["seasons"]):
+        order = rng.permutation(per_season)
+        m_home.append(pairs[order, 0])
+        m_away.append(pairs[order, 1])
+        day = (np.arange(per_season) * 364) // per_season
+        m_date.append(np.datetime64(f"{FIRST_SEASON + s}-01-01") + day.astype("timedelta64[D]"))
+    m_home, m_away, m_date = np.concatenate(m_home), np.concatenate(m_away), np.concatenate(m_date)
+    n_matches = len(m_home)
+    match_id = np.arange(1, n_matches + 1)
+    matches = {
+        "match_id": match_id,
+        "date": m_date,
+        "home_team_id": m_home,
+        "away_team_id": m_away,
+        "stadium": np.array([f"{c} Stadium" for c in city], dtype=object)[m_home - 1],
+        "status": np.full(n_matches, "Completed", dtype=object),
+    }
+    team_match = {
+        "team_id": np.concatenate([m_home, m_away]),
+        "match_id": np.concatenate([match_id, match_id]),
+    }
+
+    # Scores: a Poisson number of shots per match, shooters weighted by position.
+    per_match = rng.poisson(spec["events_per_match"], n_matches)
+    s_row = np.repeat(np.arange(n_matches), per_match)
+    n_events = len(s_row)
+    s_team = np.where(rng.random(n_events) < HOME_SHARE, m_home[s_row], m_away[s_row])
+    weight = np.array([w for _, w in POSITIONS.values()])[squad]
+    cdf = np.cumsum(weight) / weight.sum()
+    slot = np.minimum(np.searchsorted(cdf, rng.random(n_events), side="right"), per_team - 1)
+    minute = rng.integers(1, 96, n_events)
+    order = np.lexsort((minute, s_row))
+    scores = {
+        "score_id": np.arange(1, n_events + 1),
+        "match_id": match_id[s_row][order],
+        "team_id": s_team[order],
+        "player_id": ((s_team - 1) * per_team + slot + 1)[order],
+        "points": (rng.random(n_events) < GOAL_RATE).astype(np.int64)[order],
+        "minute_scored": minute[order],
+    }
+
+    # Injuries
+    n_inj = int(round(n_players * spec["injury_rate"] * spec["seasons"]))
+    first = np.datetime64(f"{FIRST_SEASON}-01-01")
+    inj_date = first + rng.integers(0, 365 * spec["seasons"], n_inj).astype("timedelta64[D]")
+    inj_return = inj_date + rng.integers(7, 120, n_inj).astype("timedelta64[D]")
+    injuries = {
+        "injury_id": np.arange(1, n_inj + 1),
+        "player_id": rng.integers(1, n_players + 1, n_inj),
+        "injury_type": rng.choice(INJURY_TYPES, n_inj).astype(object),
+        "injury_date": inj_date,
+        "expected_return": inj_return,
+        "status": rng.choice(INJURY_STATUSES, n_inj, p=[0.7, 0.15, 0.1, 0.05]).astype(object),
+    }
+
+    return {"Teams": teams, "Players": players, "Matches": matches, "Team_Match": team_match,
+            "Scores": scores, "Injuries": injuries}
+
+
+def _records(cols: dict, start: int, stop: int) -> list:
+    values = {c: v[start:stop].tolist() for c, v in cols.items()}
+    return [dict(zip(values, row)) for row in zip(*values.values())]
+
+
+def league_counts(conn) -> dict:
+    return {t: conn.execute(text(f"SELECT COUNT(*) FROM {t}")).scalar() for t in TABLES}
+
+
+def clear(conn):
+    """Empty the league and derived tables. Users and Audit_Log are left alone."""
+    conn.execute(text("SET FOREIGN_KEY_CHECKS = 0"))
+    try:
+        for t in DERIVED_TABLES + TABLES[::-1]:
+            conn.execute(text(f"TRUNCATE TABLE {t}"))
+    finally:
+        conn.execute(text("SET FOREIGN_KEY_CHECKS = 1"))
+
+
+def load(data: dict, reset: bool = False, chunk_rows: int = CHUNK_ROWS) -> dict:
+    """Bulk-insert ``generate`` output; returns row counts and timings per table.
+
+    The league tables must be empty unless ``reset`` is given, in which case they
+    are truncated first.
+    """
+    t0 = time.perf_counter()
+    with engine.begin() as conn:
+        existing = {t: n for t, n in league_counts(conn).items() if n}
+        if existing and not reset:
+            raise ValueError(f"league tables are not empty ({existing}); pass reset=True to replace them")
+        if existing:
+            clear(conn)
+
+    report = {"tables": {}}
+    for table in TABLES:
+        cols = data[table]
+        n = len(next(iter(cols.values())))
+        sql = f"INSERT INTO {table}({', '.join(cols)}) VALUES ({', '.join(':' + c for c in cols)})"
+        t1 = time.perf_counter()
+        for start in range(0, n, chunk_rows):
+            with engine.begin() as conn:
+                conn.execute(text(sql), _records(cols, start, start + chunk_rows))
+        report["tables"][table] = {"rows": n, "seconds": round(time.perf_counter() - t1, 3)}
+
+    t1 = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(text("CALL rebuild_player_summary()"))
+    report["rebuild_summary_s"] = round(time.perf_counter() - t1, 3)
+    report["seconds"] = round(time.perf_counter() - t0, 3)
+
+    invalidate_tables(*TABLES, *DERIVED_TABLES)
+    for table in TABLES:
+        publish_change(table, None, "UPDATE")
+    return report
+
+
+def generate_and_load(scale: str = "small", seed: int = 0, reset: bool = False, **overrides) -> dict:
+    spec = spec_for(scale, **overrides)
+    t0 = time.perf_counter()
+    data = generate(spec, seed)
+    report = {"scale": scale, "seed": seed, "spec": spec,
+              "generate_s": round(time.perf_counter() - t0, 3)}
+    report.update(load(data, reset=reset))
+    return report
@@ -0,0 +1,152 @@
+"""Streaming export of scores, matches and player summaries to CSV, Parquet or JSON Lines.
+
+Rows come from a server-side cursor (``stream_results``) in partitions of
+``chunk_rows``, and each partition is written out before the next is fetched, so
+memory stays flat however large the table is.
+
+The Admin page writes exports under ``EXPORT_DIR``; files older than
+``EXPORT_TTL_S`` are removed whenever a new export is started, so exports a
+session never downloaded do not pile up. Files larger than
+``EXPORT_MAX_INAPP_BYTES`` are not offered for download in the page, since the
+download button holds the whole file in memory; use ``manage.py export``.
+"""
+import os
+import tempfile
+import time
+import pandas as pd
+from sqlalchemy import text
+from common import read_engine
+
+CHUNK_ROWS = 20000
+FORMATS = {"csv": "text/csv", "parquet": "application/octet-stream", "jsonl": "application/x-ndjson"}
+EXPORT_DIR = os.getenv("EXPORT_DIR", os.path.join(tempfile.gettempdir(), "sports_analytics_exports"))
+EXPORT_TTL_S = float(os.getenv("EXPORT_TTL_S", "3600"))
+EXPORT_MAX_INAPP_BYTES = int(os.getenv("EXPORT_MAX_INAPP_BYTES", str(50 * 1024 * 1024)))
+
+# Export -> (SQL, column types). Types drive the Parquet schema, so a partition whose
+# column happens to be all NULL still matches the file.
+EXPORTS = {
+    "scores": ("""
+        SELECT s.score_id, s.match_id, m.date, s.team_id, t.team_name,
+               s.player_id, p.name AS player_name, s.points, s.minute_scored
+        FROM Scores s
+        JOIN Matches m ON m.match_id = s.match_id
+        LEFT JOIN Teams t ON t.team_id = s.team_id
+        LEFT JOIN Players p ON p.player_id = s.player_id
+        ORDER BY s.score_id
+    """, {"score_id": "int", "match_id": "int", "date": "date", "team_id": "int", "team_name": "str",
+          "player_id": "int", "player_name": "str", "points": "int", "minute_scored": "int"}),
+    "matches": ("""
+        SELECT m.match_id, m.date, m.stadium, m.status,
+               m.home_team_id, ht.team_name AS home_team, m.away_team_id, at.team_name AS away_team,
+               r.home_points, r.away_points
+        FROM Matches m
+        LEFT JOIN Match_Results r ON r.match_id = m.match_id
+        LEFT JOIN Teams ht ON ht.team_id = m.home_team_id
+        LEFT JOIN Teams at ON at.team_id = m.away_team_id
+        ORDER BY m.match_id
+    """, {"match_id": "int", "date": "date", "stadium": "str", "status": "str",
+          "home_team_id": "int", "home_team": "str", "away_team_id": "int", "away_team": "str",
+          "home_points": "int", "away_points": "int"}),
+    "players": ("""
+        SELECT player_id, name, dob, position, nationality, team_id, team_name,
+               total_points, last_match_date, injured
+        FROM Player_Summary
+        ORDER BY player_id
+    """, {"player_id": "int", "name": "str", "dob": "date", "position": "str", "nationality": "str",
+          "team_id": "int", "team_name": "str", "total_points": "int", "last_match_date": "date",
+          "injured": "int"}),
+}
+
+
+def stream_frames(name: str, chunk_rows: int = CHUNK_ROWS):
+    """Yield the export as DataFrames of at most ``chunk_rows`` rows."""
+    sql, types = EXPORTS[name]
+    cols = list(types)
+    with read_engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=chunk_rows).execute(text(sql))
+        for rows in result.partitions():
+            df = pd.DataFrame(rows, columns=cols)
+            for col, kind in types.items():
+                if kind == "int":
+                    df[col] = df[col].astype("Int64")
+            yield df
+
+
+def purge_exports(ttl: float = EXPORT_TTL_S) -> int:
+    """Delete export files older than ``ttl`` seconds; returns how many were removed."""
+    if not os.path.isdir(EXPORT_DIR):
+        return 0
+    cutoff = time.time() - ttl
+    removed = 0
+    for entry in os.scandir(EXPORT_DIR):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except OSError:
+            pass  # already removed by another session
+    return removed
+
+
+def new_export_path(fmt: str) -> str:
+    """An empty file in ``EXPORT_DIR`` for a new export, after purging expired ones."""
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    purge_exports()
+    fd, path = tempfile.mkstemp(suffix=f".{fmt}", dir=EXPORT_DIR)
+    os.close(fd)
+    return path
+
+
+def _parquet_schema(types: dict):
+    import pyarrow as pa
+    arrow = {"int": pa.int64(), "str": pa.string(), "date": pa.date32()}
+    return pa.schema([(col, arrow[kind]) for col, kind in types.items()])
+
+
+def write_export(name: str, fmt: str, out, chunk_rows: int = CHUNK_ROWS) -> dict:
+    """Write export ``name`` as ``fmt`` to a path or binary file object; returns rows and timing."""
+    if name not in EXPORTS:
+        raise ValueError(f"unknown export {name!r}; expected one of {sorted(EXPORTS)}")
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown format {fmt!r}; expected one of {sorted(FORMATS)}")
+    t0 = time.perf_counter()
+    rows = 0
+    frames = stream_frames(name, chunk_rows)
+
+    if fmt == "parquet":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Parquet export needs pyarrow: pip install pyarrow") from e
+        schema = _parquet_schema(EXPORTS[name][1])
+        with pq.ParquetWriter(out, schema) as writer:
+            for df in frames:
+                writer.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+                rows += len(df)
+    else:
+        date_cols = [col for col, kind in EXPORTS[name][1].items() if kind == "date"]
+        fh = open(out, "wb") if isinstance(out, str) else out
+        try:
+            header = True
+            for df in frames:
+                if fmt == "csv":
+                    chunk = df.to_csv(index=False, header=header)
+                else:
+                    for col in date_cols:
+                        df[col] = df[col].map(lambda d: None if pd.isna(d) else d.isoformat())
+                    chunk = df.to_json(orient="records", lines=True)
+                    chunk = chunk if chunk.endswith("\n") else chunk + "\n"
+                fh.write(chunk.encode("utf-8"))
+                header = False
+                rows += len(df)
+            if header and fmt == "csv":
+                fh.write((",".join(EXPORTS[name][1]) + "\n").encode("utf-8"))
+        finally:
+            if fh is not out:
+                fh.close()
+
+    seconds = time.perf_counter() - t0
+    return {"export": name, "format": fmt, "rows": rows, "seconds": round(seconds, 3),
+            "rows_per_s": round(rows / seconds, 1) if seconds else 0.0}
@@ -0,0 +1,241 @@
+"""Live mode for matches still in progress: one shared poller per match.
+
+A ``LiveMatch`` keeps the match header and its events in memory and polls the
+primary only for Scores ids above the highest one it has seen, so each tick
+costs a few indexed range reads per match however many sessions are watching.
+A lower id committed after a higher one was read is caught by re-checking the
+skipped ids, as the Audit_Log change feed does. Sessions hold a lease that they
+renew on every render; the poller stops when the last lease lapses or the match
+reaches a final status. The first poll, and edits and deletes of scores already
+shown, reload the whole match.
+"""
+import logging
+import os
+import threading
+import time
+import pandas as pd
+from sqlalchemy import text
+from change_feed import CHANGE_FEED_GAP_WAIT, GapTracker, bind_ids
+from common import engine, subscribe_changes
+from match_analytics import EVENT_COLS, MATCH_BUNDLE_SQL, bundle_from_frame, normalize_events
+
+LIVE_POLL_S = float(os.getenv("LIVE_POLL_S", "5"))
+LIVE_LEASE_S = max(15.0, 3 * LIVE_POLL_S)
+FINAL_STATUSES = {"completed", "final", "finished", "full time", "ft", "cancelled", "canceled",
+                  "abandoned", "postponed"}
+
+# Ids are read across all matches: a gap is only a gap if no match has that id yet.
+NEW_IDS_SQL = "SELECT score_id FROM Scores WHERE score_id > :after ORDER BY score_id"
+FILLED_SQL = "SELECT score_id FROM Scores WHERE score_id IN ({ids})"
+MAX_ID_SQL = "SELECT COALESCE(MAX(score_id), 0) FROM Scores"
+NEW_EVENTS_SQL = """
+    SELECT s.score_id, s.team_id, s.player_id, s.points, s.minute_scored,
+           p.name AS player_name, t.team_name
+    FROM Scores s
+    LEFT JOIN Players p ON p.player_id = s.player_id
+    LEFT JOIN Teams t ON t.team_id = s.team_id
+    WHERE s.match_id = :m AND ({ids})
+    ORDER BY s.score_id
+"""
+STATUS_SQL = "SELECT status FROM Matches WHERE match_id = :m"
+
+log = logging.getLogger("sports_analytics.live")
+
+
+def is_live(status) -> bool:
+    return status is not None and str(status).strip().lower() not in FINAL_STATUSES
+
+
+class LiveMatch:
+    """In-memory header and events of one match. ``snapshot`` frames are replaced, never mutated."""
+
+    def __init__(self, mid: int, bundle: dict, interval: float = LIVE_POLL_S):
+        self.mid = int(mid)
+        self.interval = interval
+        self.info = bundle["info"]
+        self.events = bundle["events"]
+        self.high_water = None  # highest Scores id read, across all matches; set by the first poll
+        self._gaps = GapTracker(CHANGE_FEED_GAP_WAIT, what=f"score ids (match {mid})")
+        self.version = 0
+        self.ended = not is_live(self.info["status"])
+        self.polls = 0
+        self.error = None
+        self._viewers = {}  # viewer id -> lease expiry (monotonic)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._reload = False
+        self._thread = None
+
+    def snapshot(self):
+        with self._lock:
+            return self.info, self.events, self.version
+
+    def attach(self, viewer: str):
+        with self._lock:
+            self._viewers[viewer] = time.monotonic() + LIVE_LEASE_S
+
+    def detach(self, viewer: str):
+        with self._lock:
+            self._viewers.pop(viewer, None)
+
+    def viewers(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            for v in [v for v, expiry in self._viewers.items() if expiry < now]:
+                del self._viewers[v]
+            return len(self._viewers)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        if self._thread is None and not self.ended:
+            self._thread = threading.Thread(target=self._run, name=f"live-match-{self.mid}", daemon=True)
+            self._thread.start()
+
+    def wake(self, reload: bool = False):
+        self._reload = self._reload or reload
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            with _live_lock:
+                if self.ended or not self.viewers():
+                    self._thread = None
+                    if not self.ended and _live.get(self.mid) is self:
+                        del _live[self.mid]
+                    return
+            try:
+                self.poll()
+                self.error = None
+            except Exception as e:
+                self.error = repr(e)
+                log.exception("live poll of match %s failed", self.mid)
+
+    def poll(self) -> int:
+        """Fetch new events (or reload after an edit); returns the number of events added.
+
+        Reads go to the primary: a replica may not have the rows yet.
+        """
+        reload, self._reload = self._reload, False
+        with engine.connect() as conn:
+            if self.high_water is None:
+                # The page's bundle may be cached or from a replica; start from the primary.
+                self.high_water = conn.execute(text(MAX_ID_SQL)).scalar()
+                reload = True
+            if reload:
+                res = conn.execute(text(MATCH_BUNDLE_SQL), {"m": self.mid})
+                bundle = bundle_from_frame(pd.DataFrame(res.fetchall(), columns=list(res.keys())))
+            else:
+                status = conn.execute(text(STATUS_SQL), {"m": self.mid}).scalar()
+                new = self._new_events(conn)
+        self.polls += 1
+
+        with self._lock:
+            if reload:
+                if bundle is None:  # the match was deleted
+                    self.ended = True
+                    return 0
+                added = len(bundle["events"]) - len(self.events)
+                self.info, self.events = bundle["info"], bundle["events"]
+            else:
+                # Skip events already held: a filled gap may have been read by a reload or earlier poll.
+                new = new[~new["score_id"].isin(self.events["score_id"])]
+                if new.empty and status == self.info["status"]:
+                    return 0
+                added = len(new)
+                self.info = dict(self.info, status=status)
+                if added:
+                    self.events = normalize_events(pd.concat([self.events, new], ignore_index=True))
+            self.ended = not is_live(self.info["status"])
+            self.version += 1
+            return added
+
+    def _new_events(self, conn) -> pd.DataFrame:
+        """This match's events among Scores ids above the high-water mark or in filled gaps."""
+        filled = []
+        gaps = self._gaps.pending()
+        if gaps:
+            placeholders, binds = bind_ids(gaps)
+            filled = [r[0] for r in conn.execute(text(FILLED_SQL.format(ids=placeholders)), binds)]
+            self._gaps.fill(filled)
+        ids = [r[0] for r in conn.execute(text(NEW_IDS_SQL), {"after": self.high_water})]
+        if not ids and not filled:
+            return pd.DataFrame(columns=EVENT_COLS)
+        where, binds = [], {"m": self.mid}
+        if ids:
+            # Bounded by what was just read, so an id committed meanwhile is left for the next poll.
+            where.append("s.score_id BETWEEN :lo AND :hi")
+            binds.update(lo=self.high_water + 1, hi=ids[-1])
+        if filled:
+            placeholders, fbinds = bind_ids(filled, "gap")
+            where.append(f"s.score_id IN ({placeholders})")
+            binds.update(fbinds)
+        res = conn.execute(text(NEW_EVENTS_SQL.format(ids=" OR ".join(where))), binds)
+        self._gaps.track(self.high_water, ids)
+        if ids:
+            self.high_water = ids[-1]
+        return pd.DataFrame(res.fetchall(), columns=EVENT_COLS)
+
+
+_live = {}
+_live_lock = threading.Lock()
+
+
+def watch(mid: int, viewer: str, bundle: dict) -> LiveMatch:
+    """Attach ``viewer`` to the shared ``LiveMatch`` for ``mid``, creating it from ``bundle`` if needed.
+
+    Call on every render to renew the lease. Ended matches stay registered while
+    someone is watching, so viewers see the final state instead of a new poller.
+    """
+    mid = int(mid)
+    with _live_lock:
+        for key in [k for k, lm in _live.items() if not lm.running and not lm.viewers()]:
+            del _live[key]
+        lm = _live.get(mid)
+        if lm is None:
+            lm = _live[mid] = LiveMatch(mid, bundle)
+        lm.attach(viewer)
+        lm.start()
+    return lm
+
+
+def unwatch(mid: int, viewer: str):
+    with _live_lock:
+        lm = _live.get(int(mid))
+    if lm is not None:
+        lm.detach(viewer)
+
+
+def live_stats() -> dict:
+    with _live_lock:
+        return {mid: {"viewers": lm.viewers(), "running": lm.running, "ended": lm.ended, "polls": lm.polls,
+                      "events": len(lm.events), "pending_gaps": len(lm._gaps), "error": lm.error}
+                for mid, lm in _live.items()}
+
+
+@subscribe_changes
+def _on_change(table, record_id, action):
+    if table not in ("Scores", "Matches"):
+        return
+    with _live_lock:
+        matches = list(_live.values())
+    for lm in matches:
+        if table == "Matches" and record_id is not None and int(record_id) != lm.mid:
+            continue
+        if table == "Scores" and action == "INSERT":
+            lm.wake()
+            continue
+        if (table == "Scores" and record_id is not None
+                and not (lm.events["score_id"] == int(record_id)).any()):
+            continue
+        if lm.running:
+            lm.wake(reload=True)
+        else:
+            # Not polling any more; drop it so the next render starts from fresh data.
+            with _live_lock:
+                if _live.get(lm.mid) is lm:
+                    del _live[lm.mid]
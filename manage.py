@@ -0,0 +1,219 @@
+"""Command-line maintenance tasks: python manage.py <command> [options]."""
+import argparse
+import json
+import sys
+from sqlalchemy import text
+from common import engine
+
+
+def cmd_rebuild_summary(args):
+    with engine.begin() as conn:
+        conn.execute(text("CALL rebuild_player_summary()"))
+        n = conn.execute(text("SELECT COUNT(*) FROM Player_Summary")).scalar()
+    print(f"Player_Summary rebuilt: {n} players.")
+
+
+def cmd_rebuild_results(args):
+    with engine.begin() as conn:
+        conn.execute(text("CALL rebuild_match_results()"))
+        n = conn.execute(text("SELECT COUNT(*) FROM Match_Results")).scalar()
+    print(f"Match_Results rebuilt: {n} matches.")
+
+
+def cmd_bench_match(args):
+    import bench
+    if args.scales:
+        if not args.reset:
+            print("--scales replaces the league data at each scale; pass --reset to confirm.", file=sys.stderr)
+            return 2
+        result = bench.bench_match_scales(args.scales.split(","), seed=args.seed, n_matches=args.matches,
+                                          repeat=args.repeat)
+    else:
+        result = bench.bench_match_detail(args.matches, args.repeat)
+    print(json.dumps(result, indent=2, default=str))
+
+
+def cmd_bench_flow(args):
+    import bench
+    print(json.dumps(bench.bench_score_flow(args.matches, args.repeat), indent=2))
+
+
+def cmd_bench_season(args):
+    import bench
+    print(json.dumps(bench.bench_season(args.synthetic, args.repeat), indent=2))
+
+
+def cmd_bench_grid(args):
+    import bench
+    print(json.dumps(bench.bench_player_grid(args.players, args.repeat), indent=2))
+
+
+def cmd_generate(args):
+    import datagen
+    report = datagen.generate_and_load(args.scale, seed=args.seed, reset=args.reset, teams=args.teams,
+                                       players_per_team=args.players_per_team, seasons=args.seasons,
+                                       events_per_match=args.events_per_match, injury_rate=args.injury_rate)
+    print(json.dumps(report, indent=2))
+
+
+def cmd_bench_pages(args):
+    import bench
+    pages = args.pages.split(",") if args.pages else None
+    if args.scales:
+        if not args.reset:
+            print("--scales replaces the league data at each scale; pass --reset to confirm.", file=sys.stderr)
+            return 2
+        result = bench.bench_scales(args.scales.split(","), seed=args.seed, repeat=args.repeat, pages=pages)
+    else:
+        result = bench.bench_pages(args.repeat, pages)
+    out = json.dumps(result, indent=2, sort_keys=True, default=str)
+    if args.out:
+        with open(args.out, "w") as fh:
+            fh.write(out + "\n")
+    print(out)
+
+
+def cmd_bench_diff(args):
+    import bench
+    with open(args.old) as fh:
+        old = json.load(fh)
+    with open(args.new) as fh:
+        new = json.load(fh)
+    for scale, page, query, a, b, ratio in bench.diff_results(old, new):
+        flag = "  <-- slower" if ratio is not None and ratio >= args.threshold else ""
+        print(f"{scale or '-':8} {page:10} {query:28} {a:10.3f} -> {b:10.3f} ms  x{ratio}{flag}")
+
+
+def cmd_load_test(args):
+    import bench
+    print(json.dumps(bench.load_test(args.sessions, args.iterations, args.think_ms), indent=2))
+
+
+def cmd_check_plans(args):
+    import bench
+    failures = bench.check_plans()
+    for name, alias, key, expected in failures:
+        print(f"FAIL {name}: {alias} uses {key!r}, expected one of {sorted(expected)}")
+    if failures:
+        return 1
+    print(f"OK: {len(bench.PLAN_CHECKS)} query plans use their indexes.")
+    return 0
+
+
+def cmd_import(args):
+    import bulk_import
+    report = bulk_import.import_file(args.kind, args.path, fmt=args.format, chunk_rows=args.chunk_rows,
+                                     dry_run=args.dry_run)
+    rejects = report.pop("rejects")
+    if args.rejects and not rejects.empty:
+        rejects.to_csv(args.rejects, index=False)
+    print(json.dumps(report, indent=2))
+    return 1 if report["rejected"] and not report["valid"] else 0
+
+
+def cmd_export(args):
+    import export
+    out = args.out or f"{args.export}.{args.format}"
+    print(json.dumps(export.write_export(args.export, args.format, out, chunk_rows=args.chunk_rows), indent=2))
+
+
+def cmd_audit_retention(args):
+    import audit
+    print(json.dumps(audit.run_retention(engine, args.keep_days, args.months_ahead), indent=2))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sports Analytics maintenance commands")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("rebuild-summary", help="Rebuild the materialized Player_Summary table")
+    p.set_defaults(func=cmd_rebuild_summary)
+
+    p = sub.add_parser("rebuild-results", help="Rebuild the Match_Results table")
+    p.set_defaults(func=cmd_rebuild_results)
+
+    p = sub.add_parser("bench-match", help="Time match-detail analytics: v_match_* views vs the bundle query")
+    p.add_argument("--matches", type=int, default=20, help="number of matches to sample")
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--scales", help="comma-separated datagen scales to sweep, e.g. tiny,small,medium,large")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--reset", action="store_true", help="allow --scales to replace the current league data")
+    p.set_defaults(func=cmd_bench_match)
+
+    p = sub.add_parser("bench-flow", help="Time the score-flow chart: legacy pandas vs NumPy implementation")
+    p.add_argument("--matches", type=int, default=20, help="number of matches to sample")
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=cmd_bench_flow)
+
+    p = sub.add_parser("bench-season", help="Time season-store queries (league table, form, buckets)")
+    p.add_argument("--synthetic", type=int, default=0, help="use N random score events instead of the database")
+    p.add_argument("--repeat", type=int, default=5)
+    p.set_defaults(func=cmd_bench_season)
+
+    p = sub.add_parser("bench-grid", help="Compare the Players card grid: per-card elements vs one HTML grid")
+    p.add_argument("--players", type=int, default=500)
+    p.add_argument("--repeat", type=int, default=5)
+    p.set_defaults(func=cmd_bench_grid)
+
+    p = sub.add_parser("generate", help="Load a deterministic synthetic league into empty tables")
+    p.add_argument("--scale", choices=["tiny", "small", "medium", "large", "xlarge"], default="small")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--teams", type=int)
+    p.add_argument("--players-per-team", type=int)
+    p.add_argument("--seasons", type=int)
+    p.add_argument("--events-per-match", type=float)
+    p.add_argument("--injury-rate", type=float)
+    p.add_argument("--reset", action="store_true", help="truncate existing league data first")
+    p.set_defaults(func=cmd_generate)
+
+    p = sub.add_parser("bench-pages", help="Time every query each page issues, optionally at several generated scales")
+    p.add_argument("--scales", help="comma-separated datagen scales, e.g. tiny,small,medium (replaces data)")
+    p.add_argument("--pages", help="comma-separated subset of dashboard,players,matches,admin")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--reset", action="store_true", help="required with --scales")
+    p.add_argument("--out", help="also write the JSON result to this file")
+    p.set_defaults(func=cmd_bench_pages)
+
+    p = sub.add_parser("bench-diff", help="Compare two bench-pages JSON results query by query")
+    p.add_argument("old")
+    p.add_argument("new")
+    p.add_argument("--threshold", type=float, default=1.2, help="flag queries at least this many times slower")
+    p.set_defaults(func=cmd_bench_diff)
+
+    p = sub.add_parser("load-test", help="Simulate concurrent Dashboard sessions against the pool")
+    p.add_argument("--sessions", type=int, default=20)
+    p.add_argument("--iterations", type=int, default=10)
+    p.add_argument("--think-ms", type=float, default=0.0, help="pause between renders per session")
+    p.set_defaults(func=cmd_load_test)
+
+    p = sub.add_parser("check-plans", help="EXPLAIN hot queries and fail if they stop using their indexes")
+    p.set_defaults(func=cmd_check_plans)
+
+    p = sub.add_parser("import", help="Bulk-load players, matches or scores from CSV/Parquet")
+    p.add_argument("kind", choices=["players", "matches", "scores"])
+    p.add_argument("path")
+    p.add_argument("--format", choices=["csv", "parquet"], help="default: from the file extension")
+    p.add_argument("--chunk-rows", type=int, default=5000)
+    p.add_argument("--dry-run", action="store_true", help="validate only, insert nothing")
+    p.add_argument("--rejects", help="write rejected rows with their reason to this CSV")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser("export", help="Stream scores, matches or player summaries to CSV/Parquet/JSON Lines")
+    p.add_argument("export", choices=["scores", "matches", "players"])
+    p.add_argument("--format", choices=["csv", "parquet", "jsonl"], default="csv")
+    p.add_argument("--out", help="output path (default: <export>.<format>)")
+    p.add_argument("--chunk-rows", type=int, default=20000)
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("audit-retention", help="Add upcoming Audit_Log partitions and drop/purge expired rows")
+    p.add_argument("--keep-days", type=int, default=365)
+    p.add_argument("--months-ahead", type=int, default=2)
+    p.set_defaults(func=cmd_audit_retention)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
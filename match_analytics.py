@@ -0,0 +1,229 @@
+"""Match detail analytics derived in pandas/NumPy from a single per-match result set.
+
+``load_match_bundle`` fetches the match header and every Scores row of one match in
+one round trip; the remaining functions reproduce the ``v_match_*`` views on that frame.
+"""
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from common import sql_df, subscribe_changes
+
+MATCH_BUNDLE_SQL = """
+    SELECT m.match_id, m.date, m.stadium, m.status,
+           m.home_team_id, m.away_team_id,
+           ht.team_name AS home_team, at.team_name AS away_team,
+           s.score_id, s.team_id, s.player_id, s.points, s.minute_scored,
+           p.name AS player_name, t.team_name
+    FROM Matches m
+    JOIN Teams ht ON ht.team_id = m.home_team_id
+    JOIN Teams at ON at.team_id = m.away_team_id
+    LEFT JOIN Scores s ON s.match_id = m.match_id
+    LEFT JOIN Players p ON p.player_id = s.player_id
+    LEFT JOIN Teams t ON t.team_id = s.team_id
+    WHERE m.match_id = :m
+    ORDER BY s.minute_scored, s.score_id
+"""
+
+HEADER_COLS = ["match_id", "date", "stadium", "status", "home_team_id", "away_team_id", "home_team", "away_team"]
+EVENT_COLS = ["score_id", "team_id", "player_id", "points", "minute_scored", "player_name", "team_name"]
+
+MINUTE_BINS = list(range(0, 91, 10))
+MINUTE_LABELS = [f"{i}-{i+9}" for i in MINUTE_BINS[:-1]] + ["90+"]
+
+
+def load_match_bundle(mid: int):
+    """Return ``{"info": dict, "events": DataFrame}`` for a match, or None if it does not exist."""
+    return bundle_from_frame(sql_df(MATCH_BUNDLE_SQL, {"m": mid}))
+
+
+def bundle_from_frame(df: pd.DataFrame):
+    if df.empty:
+        return None
+    info = df.iloc[0][HEADER_COLS].to_dict()
+    return {"info": info, "events": normalize_events(df.loc[df["score_id"].notna(), EVENT_COLS])}
+
+
+def normalize_events(events: pd.DataFrame) -> pd.DataFrame:
+    """Integer id/point/minute columns, ordered by minute then score_id."""
+    events = events.copy()
+    for col in ["score_id", "team_id", "player_id", "points", "minute_scored"]:
+        events[col] = pd.to_numeric(events[col], errors="coerce").fillna(0).astype(int)
+    return events.sort_values(["minute_scored", "score_id"], kind="stable").reset_index(drop=True)
+
+
+def score_totals(events: pd.DataFrame, info: dict):
+    home = int(events.loc[events["team_id"] == info["home_team_id"], "points"].sum())
+    away = int(events.loc[events["team_id"] == info["away_team_id"], "points"].sum())
+    return home, away
+
+
+def score_flow(events: pd.DataFrame, info: dict) -> pd.DataFrame:
+    """Cumulative home/away points at each scoring minute (as ``v_match_score_flow``)."""
+    if events.empty:
+        return pd.DataFrame(columns=["minute_scored", "home_cum", "away_cum"])
+    home = np.where(events["team_id"] == info["home_team_id"], events["points"], 0)
+    away = np.where(events["team_id"] == info["away_team_id"], events["points"], 0)
+    per_min = (
+        pd.DataFrame({"minute_scored": events["minute_scored"], "home": home, "away": away})
+        .groupby("minute_scored", sort=True)
+        .sum()
+    )
+    return pd.DataFrame({
+        "minute_scored": per_min.index.to_numpy(),
+        "home_cum": per_min["home"].cumsum().to_numpy(),
+        "away_cum": per_min["away"].cumsum().to_numpy(),
+    })
+
+
+def minute_flow(minutes, teams, points, home_id, away_id, min_minutes: int = 90,
+                momentum_window: int = 10) -> dict:
+    """Per-minute cumulative score, lead, momentum and turning point from event arrays.
+
+    ``lead`` is home minus away. ``momentum`` is the net lead gained over the last
+    ``momentum_window`` minutes. The turning point is the minute with the largest
+    change in per-minute lead change, or None when the lead never moves.
+    ``lead_changes`` are the minutes at which a different side goes ahead.
+    """
+    minutes = np.asarray(minutes, dtype=np.int64)
+    teams = np.asarray(teams)
+    points = np.asarray(points, dtype=np.float64)
+    n = max(min_minutes, int(minutes.max()) if minutes.size else 0) + 1
+
+    home = np.bincount(minutes, weights=points * (teams == home_id), minlength=n).cumsum().astype(np.int64)
+    away = np.bincount(minutes, weights=points * (teams == away_id), minlength=n).cumsum().astype(np.int64)
+    lead = home - away
+    step = np.diff(lead, prepend=lead[:1])
+    swing = np.abs(np.diff(step, prepend=step[:1]))
+    shifted = np.concatenate([np.zeros(min(momentum_window, n), dtype=np.int64), lead[:-momentum_window]])
+    sign = np.sign(lead)
+    ahead = np.flatnonzero(sign != 0)
+    changes = ahead[1:][sign[ahead[1:]] != sign[ahead[:-1]]] if ahead.size else ahead
+
+    return {
+        "minute": np.arange(n),
+        "home_cum": home,
+        "away_cum": away,
+        "lead": lead,
+        "momentum": lead - shifted[:n],
+        "turning_minute": int(swing.argmax()) if swing.max() > 0 else None,
+        "turning_swing": float(swing.max()),
+        "lead_changes": changes,
+    }
+
+
+_flow_memo = OrderedDict()
+_flow_lock = threading.Lock()
+FLOW_MEMO_SIZE = 256
+
+
+def match_flow(events: pd.DataFrame, info: dict) -> dict:
+    """``minute_flow`` for one match, memoized per match and event set until Scores or Matches change."""
+    key = (int(info["match_id"]), len(events), int(events["score_id"].max()) if len(events) else 0)
+    with _flow_lock:
+        hit = _flow_memo.get(key)
+        if hit is not None:
+            _flow_memo.move_to_end(key)
+            return hit
+    flow = minute_flow(events["minute_scored"].to_numpy(), events["team_id"].to_numpy(),
+                       events["points"].to_numpy(), int(info["home_team_id"]), int(info["away_team_id"]))
+    with _flow_lock:
+        _flow_memo[key] = flow
+        while len(_flow_memo) > FLOW_MEMO_SIZE:
+            _flow_memo.popitem(last=False)
+    return flow
+
+
+@subscribe_changes
+def _on_change(table, record_id, action):
+    # Score changes carry a score_id, not a match_id, so drop every memoized flow.
+    if table in ("Scores", "Matches"):
+        with _flow_lock:
+            _flow_memo.clear()
+
+
+def xg_weights(minutes) -> np.ndarray:
+    minutes = np.asarray(minutes)
+    return np.select([minutes <= 20, minutes <= 45, minutes <= 70], [0.25, 0.18, 0.12], default=0.08)
+
+
+def player_xg(events: pd.DataFrame) -> pd.DataFrame:
+    """Shots, goals and xG per player (as ``v_match_player_xg``), highest xG first."""
+    cols = ["player_id", "player_name", "team_name", "shots", "goals", "xg"]
+    if events.empty:
+        return pd.DataFrame(columns=cols)
+    df = events.assign(w=xg_weights(events["minute_scored"]))
+    out = df.groupby("player_id", sort=False).agg(
+        player_name=("player_name", "first"),
+        team_name=("team_name", "first"),
+        shots=("score_id", "size"),
+        goals=("points", "sum"),
+        xg=("w", "sum"),
+    ).reset_index()
+    out["xg"] = out["xg"].round(3)
+    return out.sort_values("xg", ascending=False, kind="stable").reset_index(drop=True)[cols]
+
+
+def team_stats(events: pd.DataFrame) -> pd.DataFrame:
+    """Per-team shot/possession proxies (as ``v_match_team_stats``); empty unless both sides scored."""
+    cols = ["team_id", "team_name", "shots", "goals", "shots_on_target", "possession", "passes", "pass_accuracy"]
+    if events.empty:
+        return pd.DataFrame(columns=cols)
+    out = events.groupby("team_id", sort=False).agg(
+        team_name=("team_name", "first"),
+        shots=("score_id", "size"),
+        goals=("points", "sum"),
+        shots_on_target=("points", lambda p: int((p > 0).sum())),
+    ).reset_index()
+    if len(out) < 2:
+        return pd.DataFrame(columns=cols)
+    opp_shots = out["shots"].sum() - out["shots"]
+    out["possession"] = (out["shots"] / (out["shots"] + opp_shots) * 100).round(1)
+    out["passes"] = out["shots"] * 32
+    out["pass_accuracy"] = ((0.75 + out["shots_on_target"] * 0.04) * 100).round(1)
+    return out[cols]
+
+
+def key_moments(events: pd.DataFrame) -> pd.DataFrame:
+    """Every scoring event labelled with its moment type (as ``v_match_key_moments``)."""
+    cols = ["minute_scored", "player_name", "team_name", "points", "moment_type"]
+    if events.empty:
+        return pd.DataFrame(columns=cols)
+    prev = events["points"].shift()
+    out = events[["minute_scored", "player_name", "team_name", "points"]].copy()
+    out["moment_type"] = np.select(
+        [
+            events["minute_scored"] >= 90,
+            prev.isna(),
+            events["points"] > prev,
+            events["points"] == prev,
+        ],
+        ["Decisive (Injury-Time)", "Opening Goal", "Momentum Shift", "Equalizer"],
+        default="Key Moment",
+    )
+    return out[cols]
+
+
+def mvp_ranking(events: pd.DataFrame, top: int = 3) -> pd.DataFrame:
+    """Top MVP candidates by goals, xG and key moments (as ``v_match_mvp``)."""
+    cols = ["player_id", "player_name", "team_name", "goals", "xg", "key_moments", "mvp_score"]
+    xg = player_xg(events)
+    if xg.empty:
+        return pd.DataFrame(columns=cols)
+    km = key_moments(events).groupby("player_name").size().rename("key_moments")
+    out = xg.merge(km, left_on="player_name", right_index=True, how="left")
+    out["key_moments"] = out["key_moments"].fillna(0).astype(int)
+    out["mvp_score"] = (out["goals"] * 5 + out["xg"] * 3 + out["key_moments"] * 2).round(2)
+    return out.sort_values("mvp_score", ascending=False, kind="stable").head(top).reset_index(drop=True)[cols]
+
+
+def scoring_heatmap(events: pd.DataFrame) -> pd.DataFrame:
+    """Points per player per 10-minute bin, players as rows and bins as columns."""
+    binned = pd.cut(
+        events["minute_scored"],
+        bins=MINUTE_BINS + [1000],
+        right=False,
+        labels=MINUTE_LABELS,
+    )
+    heat = events.assign(minute_bin=binned).groupby(["player_name", "minute_bin"], observed=False)["points"].sum()
+    return heat.unstack(fill_value=0).reindex(columns=MINUTE_LABELS, fill_value=0)
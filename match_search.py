@@ -0,0 +1,115 @@
+"""Match search over Match_Results with SQL-side sorting and keyset pagination."""
+import pandas as pd
+from common import sql_df
+
+# Sort option -> (Match_Results column or None, direction). Ties break on match_id in
+# the same direction, so (column, match_id) is a unique, index-ordered key. Matches
+# without a date sort last whichever way dates are sorted.
+SORT_OPTIONS = {
+    "No Sorting": (None, "ASC"),
+    "Newest": ("date", "DESC"),
+    "Oldest": ("date", "ASC"),
+    "Most Goals": ("total_goals", "DESC"),
+    "Fewest Goals": ("total_goals", "ASC"),
+    "Largest Goal Difference": ("goal_diff", "DESC"),
+}
+
+PAGE_SIZES = [10, 25, 50, 100]
+NULLABLE_SORTS = {"date"}
+
+SEARCH_SQL = """
+    SELECT r.match_id, r.date, m.stadium,
+           ht.team_name AS home_team, at.team_name AS away_team,
+           r.home_points, r.away_points, r.total_goals, r.goal_diff
+    FROM Match_Results r
+    JOIN Matches m ON m.match_id = r.match_id
+    JOIN Teams ht ON ht.team_id = r.home_team_id
+    JOIN Teams at ON at.team_id = r.away_team_id
+    WHERE {where}
+    ORDER BY {order}
+    LIMIT :lim
+"""
+
+
+def _flip(direction: str) -> str:
+    return "ASC" if direction == "DESC" else "DESC"
+
+
+def _order_by(col, direction: str, walk: str) -> str:
+    """ORDER BY for walking a ``direction`` sort in ``walk`` (the reverse when paging back).
+
+    MySQL sorts NULL below every value, which already puts NULLs last for DESC; an
+    ASC sort on a nullable column needs ``col IS NULL`` first to do the same.
+    """
+    if col is None:
+        return f"r.match_id {walk}"
+    order = f"r.{col} {walk}, r.match_id {walk}"
+    if col in NULLABLE_SORTS and direction == "ASC":
+        order = f"r.{col} IS NULL {'ASC' if walk == direction else 'DESC'}, " + order
+    return order
+
+
+def _keyset_predicate(col, walk: str, cursor, nulls_last: bool) -> str:
+    """Rows strictly after ``cursor`` when walking (col, match_id) in ``walk``.
+
+    ``nulls_last`` says whether NULL values come after every other value in this walk.
+    """
+    cmp = ">" if walk == "ASC" else "<"
+    if col is None:
+        return f"r.match_id {cmp} :cur_id"
+    c = f"r.{col}"
+    if cursor[0] is None:
+        after_nulls = f"({c} IS NULL AND r.match_id {cmp} :cur_id)"
+        return after_nulls if nulls_last else f"({after_nulls} OR {c} IS NOT NULL)"
+    after = f"{c} {cmp} :cur_v OR ({c} = :cur_v AND r.match_id {cmp} :cur_id)"
+    return f"({after} OR {c} IS NULL)" if nulls_last else f"({after})"
+
+
+def cursor_of(row, sort_by: str):
+    """Keyset cursor ``(value, match_id)`` for a result row."""
+    col, _ = SORT_OPTIONS[sort_by]
+    value = None
+    if col is not None and pd.notna(row[col]):
+        value = str(pd.Timestamp(row[col]).date()) if col == "date" else int(row[col])
+    return value, int(row["match_id"])
+
+
+def build_search(team_id=None, opponent_id=None, sort_by="Newest", page_size=25, after=None, before=None):
+    """``(sql, params)`` for one page of ``search_matches``, one row past the page."""
+    col, direction = SORT_OPTIONS[sort_by]
+    where = ["1=1"]
+    params = {"lim": int(page_size) + 1}
+
+    if team_id is not None:
+        where.append("(r.home_team_id=:t OR r.away_team_id=:t)")
+        params["t"] = int(team_id)
+    if opponent_id is not None:
+        where.append("(r.home_team_id=:o OR r.away_team_id=:o)")
+        params["o"] = int(opponent_id)
+
+    walk = _flip(direction) if before is not None else direction
+    cursor = before if before is not None else after
+    if cursor is not None:
+        # Display order keeps NULLs last, so they come last in a forward walk and first going back.
+        where.append(_keyset_predicate(col, walk, cursor, nulls_last=walk == direction))
+        params["cur_id"] = cursor[1]
+        if col is not None and cursor[0] is not None:
+            params["cur_v"] = cursor[0]
+
+    return SEARCH_SQL.format(where=" AND ".join(where), order=_order_by(col, direction, walk)), params
+
+
+def search_matches(team_id=None, opponent_id=None, sort_by="Newest", page_size=25, after=None, before=None):
+    """Return ``(page_df, has_prev, has_next)`` for one page of matches.
+
+    ``after``/``before`` are cursors from ``cursor_of`` on the last/first row of the
+    neighbouring page; pass neither for the first page.
+    """
+    df = sql_df(*build_search(team_id, opponent_id, sort_by, page_size, after, before))
+
+    more = len(df) > page_size
+    df = df.head(page_size)
+    if before is not None:
+        df = df.iloc[::-1].reset_index(drop=True)
+        return df, more, True
+    return df, after is not None, more
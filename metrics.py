@@ -0,0 +1,157 @@
+"""Per-query latency metrics and Prometheus text exposition."""
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pandas as pd
+
+SAMPLE_WINDOW = 2048
+
+
+class _Series:
+    __slots__ = ("count", "errors", "cache_hits", "seconds", "rows", "bytes", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.samples = deque(maxlen=SAMPLE_WINDOW)
+
+
+class QueryMetrics:
+    """Latency, rows and bytes per (query signature, page).
+
+    Percentiles come from a sliding window of the most recent ``SAMPLE_WINDOW`` calls.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def _get(self, signature: str, page: str) -> _Series:
+        key = (signature, page)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _Series()
+        return series
+
+    def record(self, signature: str, page: str, seconds: float, rows: int = 0, nbytes: int = 0, ok: bool = True):
+        with self._lock:
+            s = self._get(signature, page)
+            s.count += 1
+            s.seconds += seconds
+            s.rows += rows
+            s.bytes += nbytes
+            s.samples.append(seconds)
+            if not ok:
+                s.errors += 1
+
+    def record_hit(self, signature: str, page: str):
+        with self._lock:
+            self._get(signature, page).cache_hits += 1
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def summary(self) -> pd.DataFrame:
+        """One row per (signature, page) with call counts and p50/p95/p99 latency in ms."""
+        with self._lock:
+            items = [(k, s.count, s.errors, s.cache_hits, s.seconds, s.rows, s.bytes, list(s.samples))
+                     for k, s in self._series.items()]
+        rows = []
+        for (signature, page), count, errors, hits, seconds, nrows, nbytes, samples in items:
+            p50 = p95 = p99 = 0.0
+            if samples:
+                p50, p95, p99 = np.percentile(np.asarray(samples) * 1000, [50, 95, 99])
+            rows.append({
+                "signature": signature,
+                "page": page,
+                "calls": count,
+                "cache_hits": hits,
+                "errors": errors,
+                "p50_ms": round(float(p50), 2),
+                "p95_ms": round(float(p95), 2),
+                "p99_ms": round(float(p99), 2),
+                "total_ms": round(seconds * 1000, 1),
+                "rows": nrows,
+                "bytes": nbytes,
+            })
+        df = pd.DataFrame(rows, columns=["signature", "page", "calls", "cache_hits", "errors", "p50_ms",
+                                         "p95_ms", "p99_ms", "total_ms", "rows", "bytes"])
+        return df.sort_values("total_ms", ascending=False).reset_index(drop=True)
+
+    def prometheus(self, prefix: str = "sa") -> str:
+        with self._lock:
+            items = [(k, s.count, s.errors, s.cache_hits, s.seconds, s.rows, s.bytes, list(s.samples))
+                     for k, s in self._series.items()]
+        out = [
+            f"# HELP {prefix}_query_duration_seconds Database time per query signature and page.",
+            f"# TYPE {prefix}_query_duration_seconds summary",
+        ]
+        counters = {"rows": [], "bytes": [], "errors": [], "cache_hits": []}
+        for (signature, page), count, errors, hits, seconds, nrows, nbytes, samples in items:
+            labels = f'signature="{escape_label(signature)}",page="{escape_label(page)}"'
+            if samples:
+                qs = np.percentile(samples, [50, 95, 99])
+                for q, v in zip(("0.5", "0.95", "0.99"), qs):
+                    out.append(f'{prefix}_query_duration_seconds{{{labels},quantile="{q}"}} {float(v):.6f}')
+            out.append(f"{prefix}_query_duration_seconds_sum{{{labels}}} {seconds:.6f}")
+            out.append(f"{prefix}_query_duration_seconds_count{{{labels}}} {count}")
+            counters["rows"].append(f"{prefix}_query_rows_total{{{labels}}} {nrows}")
+            counters["bytes"].append(f"{prefix}_query_bytes_total{{{labels}}} {nbytes}")
+            counters["errors"].append(f"{prefix}_query_errors_total{{{labels}}} {errors}")
+            counters["cache_hits"].append(f"{prefix}_query_cache_hits_total{{{labels}}} {hits}")
+        for name, lines in counters.items():
+            out.append(f"# TYPE {prefix}_query_{name}_total counter")
+            out.extend(lines)
+        return "\n".join(out) + "\n"
+
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def gauges(name: str, help_text: str, values: dict) -> str:
+    """Prometheus gauge block; ``values`` maps a label string such as ``engine="primary"`` to a value."""
+    out = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    for labels, value in values.items():
+        out.append(f"{name}{{{labels}}} {value}" if labels else f"{name} {value}")
+    return "\n".join(out) + "\n"
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int, render) -> bool:
+    """Serve ``render()`` as text/plain on ``/metrics``; at most one server per process."""
+    global _server
+    with _server_lock:
+        if _server is not None:
+            return False
+        _server = _make_server(port, render)
+    threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+    return True
+
+
+def _make_server(port: int, render):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            body = render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return ThreadingHTTPServer(("0.0.0.0", port), Handler)
@@ -1,6 +1,8 @@
 import streamlit as st
 import plotly.express as px
-from common import auth_guard, inject_dark_theme, sql_df
+from common import auth_guard, inject_dark_theme
+from dashboard_snapshot import get_dashboard_snapshot
+from season_store import get_season_store
 
 st.set_page_config(page_title="Dashboard · Sports Analytics", page_icon="📊", layout="wide")
 inject_dark_theme()
@@ -8,7 +10,13 @@ auth_guard()
 
 st.title("📊 Dashboard")
 
-df_team = sql_df("SELECT team_name, total_points, points_rank FROM v_team_totals")
+snap = get_dashboard_snapshot()
+df_team, df_top, df_inj = snap["team_totals"], snap["top_players"], snap["injuries"]
+if snap["refreshed_at"] is not None:
+    st.caption(f"Last refreshed {snap['refreshed_at']:%Y-%m-%d %H:%M:%S}")
+if snap["error"]:
+    st.warning(f"Could not refresh the dashboard, showing the last good data and retrying: {snap['error']}")
+
 c1, c2 = st.columns(2)
 
 with c1:
@@ -53,13 +61,6 @@ with c2:
 
 st.subheader("Top Players by Points")
 
-df_top = sql_df("""
-    SELECT name, team_name, total_points
-    FROM v_player_summary
-    ORDER BY total_points DESC, name
-    LIMIT 10
-""")
-
 if df_top.empty:
     st.info("No players yet.")
 else:
@@ -77,8 +78,6 @@ else:
 
 st.subheader("Injury Snapshot")
 
-df_inj = sql_df("SELECT status, COUNT(*) AS cnt FROM Injuries GROUP BY status")
-
 if df_inj.empty:
     st.info("No injuries recorded.")
 else:
@@ -92,3 +91,56 @@ else:
     )
     fig4.update_traces(textinfo="percent+label")
     st.plotly_chart(fig4, use_container_width=True)
+
+st.markdown("---")
+st.subheader("Season")
+
+store = get_season_store()
+seasons = store.seasons()
+
+if not seasons:
+    st.info("No played matches yet.")
+else:
+    season = st.selectbox("Season", seasons[::-1], key="dash_season")
+
+    st.markdown("**League Table**")
+    table = store.league_table(season)
+    st.dataframe(table.drop(columns="team_id"), use_container_width=True, hide_index=True)
+
+    c3, c4 = st.columns(2)
+
+    with c3:
+        buckets = store.minute_buckets(season, by="team_id")
+        if buckets.empty:
+            st.info("No scoring events this season.")
+        else:
+            buckets["team_name"] = buckets["team_id"].map(store.team_names)
+            fig5 = px.bar(
+                buckets,
+                x="bucket",
+                y="points",
+                color="team_name",
+                title="Points by Minute Bucket",
+                template="plotly_dark",
+            )
+            fig5.update_layout(xaxis_title="Minute", yaxis_title="Points", barmode="stack")
+            st.plotly_chart(fig5, use_container_width=True)
+
+    with c4:
+        st.markdown("**Head to Head**")
+        names = {tid: store.team_names.get(tid, f"Team {tid}") for tid in table["team_id"]}
+        if len(names) < 2:
+            st.info("Needs at least two teams with played matches.")
+        else:
+            ids = list(names)
+            h1, h2 = st.columns(2)
+            team_a = h1.selectbox("Team", ids, format_func=names.get, key="h2h_a")
+            team_b = h2.selectbox("Opponent", [t for t in ids if t != team_a], format_func=names.get, key="h2h_b")
+            summary, meetings = store.head_to_head(team_a, team_b, season)
+            m1, m2, m3 = st.columns(3)
+            m1.metric("Wins", summary["wins"])
+            m2.metric("Draws", summary["draws"])
+            m3.metric("Losses", summary["losses"])
+            st.caption(f"{summary['played']} meeting(s), goals {summary['goals_for']}–{summary['goals_against']}")
+            if not meetings.empty:
+                st.dataframe(meetings, use_container_width=True, hide_index=True)
@@ -2,7 +2,9 @@ import math
 from datetime import date
 import pandas as pd
 import streamlit as st
-from common import auth_guard, inject_dark_theme, sql_df, call_proc, null_or
+from common import auth_guard, inject_dark_theme, sql_many, call_proc, null_or, fragment, query_cache, LOOKUP_TTL
+from player_search import PAGE_SIZES, search_players
+from player_cards import player_cards_html
 
 st.set_page_config(page_title="Players · Sports Analytics", page_icon="👟", layout="wide")
 inject_dark_theme()
@@ -10,31 +12,14 @@ auth_guard()
 
 st.title("👟 Players")
 
-c1, c2, c3, c4, c5 = st.columns(5)
-teams = sql_df("SELECT team_id, team_name FROM Teams ORDER BY team_name")
-team_map = {r.team_name: r.team_id for _, r in teams.iterrows()}
-team_choice = c1.selectbox("Team", ["All"] + list(team_map.keys()))
-team_id = None if team_choice == "All" else team_map[team_choice]
-
-pos_list = sql_df("SELECT DISTINCT position FROM Players WHERE position IS NOT NULL ORDER BY position")
-pos_choice = c2.selectbox("Position", ["All"] + pos_list["position"].dropna().tolist())
-
-nat_list = sql_df("SELECT DISTINCT nationality FROM Players WHERE nationality IS NOT NULL ORDER BY nationality")
-nat_choice = c3.selectbox("Nationality", ["All"] + nat_list["nationality"].dropna().tolist())
-
-q = c4.text_input("Search (name/position/nationality)")
-min_points = c5.number_input("Min points", min_value=0, value=0, step=1)
+lookups = sql_many({
+    "teams": "SELECT team_id, team_name FROM Teams ORDER BY team_name",
+    "pos": "SELECT DISTINCT position FROM Players WHERE position IS NOT NULL ORDER BY position",
+    "nat": "SELECT DISTINCT nationality FROM Players WHERE nationality IS NOT NULL ORDER BY nationality",
+}, ttl=LOOKUP_TTL)
+teams, pos_list, nat_list = lookups["teams"], lookups["pos"], lookups["nat"]
 
-df = sql_df("CALL search_players(:q, :minpts, :team)", {
-    "q": q,
-    "minpts": int(min_points),
-    "team": team_id
-})
-
-if pos_choice != "All":
-    df = df[df["position"] == pos_choice]
-if nat_choice != "All":
-    df = df[df["nationality"] == nat_choice]
+team_map = {r.team_name: r.team_id for _, r in teams.iterrows()}
 
 if st.session_state.user.get("role") == "admin":
     with st.expander("➕ Add player (Admin only)"):
@@ -67,34 +52,74 @@ if st.session_state.user.get("role") == "admin":
 else:
     st.caption("Only admins can add new players. Go to **Admin > Players**.")
 
-if df.empty:
-    st.info("No players found.")
-else:
-    n_cols = 3
-    n_rows = math.ceil(len(df) / n_cols)
-
-    for r in range(n_rows):
-        cols = st.columns(n_cols)
-        for i, col in enumerate(cols):
-            idx = r * n_cols + i
-            if idx >= len(df):
-                break
-
-            row = df.iloc[idx]
-            status = "Injured" if row["injured"] else "Fit"
-            status_class = "bad" if row["injured"] else "ok"
-
-            with col:
-                st.markdown(
-                    f"""
-                    <div class="app-card">
-                        <div class="title-20">{row['name']}</div>
-                        <span class="app-badge">{row['team_name'] or 'No Team'}</span>
-                        <span class="app-badge">{row['position'] or '-'}</span>
-                        <span class="app-badge">{row['nationality'] or '-'}</span>
-                        <div class="muted" style="margin-top:8px;">Points: <b>{int(row['total_points'])}</b></div>
-                        <div class="{status_class}" style="margin-top:6px;">{status}</div>
-                    </div>
-                    """,
-                    unsafe_allow_html=True
-                )
+
+# Filter bar and results rerun together, without the page script: editing a filter
+# runs only the player search.
+@fragment("search")
+def player_search_panel(team_map, positions, nationalities):
+    c1, c2, c3, c4, c5 = st.columns(5)
+    team_choice = c1.selectbox("Team", ["All"] + list(team_map.keys()))
+    team_id = None if team_choice == "All" else team_map[team_choice]
+    pos_choice = c2.selectbox("Position", ["All"] + positions)
+    nat_choice = c3.selectbox("Nationality", ["All"] + nationalities)
+    q = " ".join(c4.text_input("Search (name/position/nationality)").split())
+    min_points = c5.number_input("Min points", min_value=0, value=0, step=1)
+
+    page_size = st.session_state.get("player_page_size", PAGE_SIZES[1])
+
+    # Changing any filter starts again from the first page.
+    search_key = (team_id, pos_choice, nat_choice, q.lower(), int(min_points), page_size)
+    if st.session_state.get("player_search_key") != search_key:
+        st.session_state.player_search_key = search_key
+        st.session_state.player_page = 0
+    page = st.session_state.player_page
+
+    # Reruns that leave the filters and page unchanged reuse the last result until a write
+    # invalidates the query cache. The total is counted once per search and reused while paging.
+    count_key = (search_key, query_cache.generation)
+    result_key = (search_key, page, query_cache.generation)
+    result = st.session_state.get("player_result")
+    if result is None or result[0] != result_key:
+        counted = st.session_state.get("player_total")
+        counted = counted[1] if counted and counted[0] == count_key else None
+        df, total, has_more = search_players(
+            q=q,
+            min_points=min_points,
+            team_id=team_id,
+            position=None if pos_choice == "All" else pos_choice,
+            nationality=None if nat_choice == "All" else nat_choice,
+            limit=page_size,
+            offset=page * page_size,
+            count=counted is None,
+        )
+        if total is None:
+            total = counted
+        else:
+            st.session_state.player_total = (count_key, total)
+        result = st.session_state.player_result = (result_key, df, total, has_more)
+    _, df, total, has_more = result
+    if df.empty and page > 0:
+        st.session_state.player_page = 0
+        st.rerun(scope="fragment")
+
+    if df.empty:
+        st.info("No players found.")
+        return
+    if isinstance(total, int):
+        st.caption(f"{total} players · page {page + 1} of {math.ceil(total / page_size)}")
+    else:
+        st.caption(f"{total} players · page {page + 1}")
+
+    st.markdown(player_cards_html(df), unsafe_allow_html=True)
+
+    p1, p2, p3 = st.columns([1, 4, 1])
+    if p1.button("← Prev", disabled=page == 0, key="player_prev"):
+        st.session_state.player_page = page - 1
+        st.rerun(scope="fragment")
+    p2.selectbox("Per page", PAGE_SIZES, index=1, key="player_page_size")
+    if p3.button("Next →", disabled=not has_more, key="player_next"):
+        st.session_state.player_page = page + 1
+        st.rerun(scope="fragment")
+
+
+player_search_panel(team_map, pos_list["position"].dropna().tolist(), nat_list["nationality"].dropna().tolist())
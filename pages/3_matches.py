@@ -1,10 +1,14 @@
 import math
+import uuid
 import pandas as pd
 import numpy as np
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
-from common import auth_guard, inject_dark_theme, sql_df
+from common import auth_guard, inject_dark_theme, sql_df, fragment, LOOKUP_TTL
+import match_analytics as ma
+import live_match
+from match_search import SORT_OPTIONS, PAGE_SIZES, search_matches, cursor_of
 
 st.set_page_config(page_title="Matches · Sports Analytics", page_icon="🏟️", layout="wide")
 inject_dark_theme()
@@ -17,24 +21,16 @@ if "current_match" not in st.session_state:
 
 st.title("🏟 Matches")
 
-if st.session_state.match_view == "search":
-    st.subheader("Search Matches")
-    st.write("Filter by team or opponent, then click **Search Matches**.")
-
-    teams = sql_df("SELECT team_name FROM Teams ORDER BY team_name")
-    team_list = ["All"] + teams["team_name"].tolist() if not teams.empty else ["All"]
+# Filters, results and paging rerun as one fragment; opening a match reruns the page.
+@fragment("search")
+def match_search_panel(team_map):
+    team_list = ["All"] + list(team_map.keys())
 
-    c1, c2, c3 = st.columns([2, 2, 1])
+    c1, c2, c3, c4 = st.columns([2, 2, 1, 1])
     team_filter = c1.selectbox("Team", team_list)
     opponent_filter = c2.selectbox("Opponent", team_list)
-    sort_by = c3.selectbox("Sort by", [
-        "No Sorting",
-        "Newest",
-        "Oldest",
-        "Most Goals",
-        "Fewest Goals",
-        "Largest Goal Difference"
-    ])
+    sort_by = c3.selectbox("Sort by", list(SORT_OPTIONS.keys()))
+    page_size = c4.selectbox("Per page", PAGE_SIZES, index=1)
 
     if st.button("Search Matches"):
         st.session_state.search_triggered = True
@@ -44,72 +40,37 @@ if st.session_state.match_view == "search":
 
     if not st.session_state.search_triggered:
         st.info("Use the filters above and click **Search Matches**.")
-        st.stop()
-
-    base = """
-        SELECT m.match_id, m.date, m.stadium,
-               ht.team_name AS home_team, at.team_name AS away_team,
-               COALESCE(h.pts,0) AS home_points, COALESCE(a.pts,0) AS away_points,
-               (COALESCE(h.pts,0) + COALESCE(a.pts,0)) AS total_goals,
-               ABS(COALESCE(h.pts,0) - COALESCE(a.pts,0)) AS goal_diff
-        FROM Matches m
-        JOIN Teams ht ON ht.team_id = m.home_team_id
-        JOIN Teams at ON at.team_id = m.away_team_id
-        LEFT JOIN (SELECT match_id, team_id, SUM(points) AS pts FROM Scores GROUP BY match_id, team_id) h
-          ON h.match_id=m.match_id AND h.team_id=m.home_team_id
-        LEFT JOIN (SELECT match_id, team_id, SUM(points) AS pts FROM Scores GROUP BY match_id, team_id) a
-          ON a.match_id=m.match_id AND a.team_id=m.away_team_id
-        WHERE 1=1
-    """
-    params = {}
-
-    if team_filter != "All":
-        base += " AND (ht.team_name=:t OR at.team_name=:t) "
-        params["t"] = team_filter
-    if opponent_filter != "All":
-        base += " AND (ht.team_name=:o OR at.team_name=:o) "
-        params["o"] = opponent_filter
-
-    dfm = sql_df(base, params)
-
-    if not dfm.empty:
-        if "date" in dfm.columns:
-            dfm["date"] = pd.to_datetime(dfm["date"], errors="coerce")
-
-        for col in ["home_points", "away_points", "total_goals", "goal_diff"]:
-            if col in dfm.columns:
-                dfm[col] = pd.to_numeric(dfm[col], errors="coerce").fillna(0).astype(int)
-
-    if not dfm.empty:
-        if sort_by == "Newest":
-            dfm = dfm.sort_values(by="date", ascending=False, na_position="last")
-        elif sort_by == "Oldest":
-            dfm = dfm.sort_values(by="date", ascending=True, na_position="last")
-        elif sort_by == "Most Goals":
-            dfm = dfm.sort_values(by="total_goals", ascending=False)
-        elif sort_by == "Fewest Goals":
-            dfm = dfm.sort_values(by="total_goals", ascending=True)
-        elif sort_by == "Largest Goal Difference":
-            dfm = dfm.sort_values(by="goal_diff", ascending=False)
+        return
+
+    # Changing any filter starts again from the first page.
+    search_key = (team_filter, opponent_filter, sort_by, page_size)
+    if st.session_state.get("match_search_key") != search_key:
+        st.session_state.match_search_key = search_key
+        st.session_state.match_cursor = {}
+
+    dfm, has_prev, has_next = search_matches(
+        team_id=team_map.get(team_filter),
+        opponent_id=team_map.get(opponent_filter),
+        sort_by=sort_by,
+        page_size=page_size,
+        **st.session_state.match_cursor,
+    )
 
     if dfm.empty:
         st.warning("No matches found.")
-        st.stop()
+        return
+
+    dfm["date"] = pd.to_datetime(dfm["date"], errors="coerce")
+    for col in ["home_points", "away_points", "total_goals", "goal_diff"]:
+        dfm[col] = pd.to_numeric(dfm[col], errors="coerce").fillna(0).astype(int)
 
     st.subheader("Results")
     for _, m in dfm.iterrows():
         home = m["home_team"]
         away = m["away_team"]
-        hs = int(m["home_points"] or 0)
-        as_ = int(m["away_points"] or 0)
-
-        if "date" in m and pd.notna(m["date"]):
-            try:
-                date_label = pd.to_datetime(m["date"]).strftime("%Y-%m-%d")
-            except:
-                date_label = str(m["date"])
-        else:
-            date_label = str(m.get("date", ""))
+        hs = int(m["home_points"])
+        as_ = int(m["away_points"])
+        date_label = m["date"].strftime("%Y-%m-%d") if pd.notna(m["date"]) else "-"
 
         btn_label = f"{home} {hs} - {as_} {away} ({date_label})"
         if st.button(btn_label, key=f"m_{m['match_id']}"):
@@ -117,118 +78,137 @@ if st.session_state.match_view == "search":
             st.session_state.match_view = "detail"
             st.rerun()
 
+    p1, _, p2 = st.columns([1, 4, 1])
+    if p1.button("← Prev", disabled=not has_prev, key="match_prev"):
+        st.session_state.match_cursor = {"before": cursor_of(dfm.iloc[0], sort_by)}
+        st.rerun(scope="fragment")
+    if p2.button("Next →", disabled=not has_next, key="match_next"):
+        st.session_state.match_cursor = {"after": cursor_of(dfm.iloc[-1], sort_by)}
+        st.rerun(scope="fragment")
+
+
+if st.session_state.match_view == "search":
+    st.subheader("Search Matches")
+    st.write("Filter by team or opponent, then click **Search Matches**.")
+
+    teams = sql_df("SELECT team_id, team_name FROM Teams ORDER BY team_name", ttl=LOOKUP_TTL)
+    match_search_panel({r.team_name: int(r.team_id) for _, r in teams.iterrows()})
+
 if st.session_state.match_view == "detail":
     mid = st.session_state.current_match
     if not mid:
         st.session_state.match_view = "search"
         st.rerun()
 
-    info_q = """
-        SELECT m.date, m.stadium, m.status,
-               ht.team_name AS home_team, at.team_name AS away_team,
-               m.home_team_id, m.away_team_id
-        FROM Matches m
-        JOIN Teams ht ON ht.team_id = m.home_team_id
-        JOIN Teams at ON at.team_id = m.away_team_id
-        WHERE m.match_id = :m
-    """
-    info_df = sql_df(info_q, {"m": mid})
-    if info_df.empty:
+    bundle = ma.load_match_bundle(mid)
+    if bundle is None:
         st.error("Match not found.")
         st.session_state.match_view = "search"
         st.rerun()
-    info = info_df.iloc[0]
-
-    score = sql_df("""
-        SELECT 
-          (SELECT COALESCE(SUM(points),0) FROM Scores WHERE match_id=:m AND team_id=m.home_team_id) AS home_score,
-          (SELECT COALESCE(SUM(points),0) FROM Scores WHERE match_id=:m AND team_id=m.away_team_id) AS away_score
-        FROM Matches m WHERE match_id=:m
-    """, {"m": mid}).iloc[0]
-
-    hs, as_ = int(score["home_score"] or 0), int(score["away_score"] or 0)
-
-    st.markdown(f"""
-    <div class="score-card">
-        <h3>{info['home_team']} vs {info['away_team']}</h3>
-        <h1>{hs} - {as_}</h1>
-        <div class="muted">{info['date']} • {info['stadium']} • {info['status']}</div>
-    </div>
-    """, unsafe_allow_html=True)
-
-    timeline = sql_df("""
-        SELECT minute_scored, player_name, team_name, points
-        FROM v_match_play_by_play
-        WHERE match_id=:m
-        ORDER BY minute_scored
-    """, {"m": mid})
-
-    st.subheader("Scoring Timeline")
-    if timeline.empty:
-        st.info("No scoring events recorded.")
-    else:
-        for _, ev in timeline.iterrows():
-            st.markdown(f"**{int(ev['minute_scored'])}'** — {ev['player_name']} ({ev['team_name']}) scored {int(ev['points'])}")
 
-    st.markdown("---")
-    st.subheader("Advanced Match Analytics")
-
-    sf = sql_df("""
-        SELECT match_id, minute_scored, home_cum, away_cum
-        FROM v_match_score_flow
-        WHERE match_id = :m
-        ORDER BY minute_scored
-    """, {"m": mid})
-
-    if sf.empty:
-        st.info("No score-flow data available for this match.")
-        minute_df = pd.DataFrame()
-    else:
-        max_min = int(max(90, int(sf["minute_scored"].max())))
-        minutes = pd.DataFrame({"minute": list(range(0, max_min + 1))})
-        evt = sf[["minute_scored", "home_cum", "away_cum"]].rename(columns={"minute_scored": "minute"})
-        evt = evt.groupby("minute").agg({"home_cum": "max", "away_cum": "max"}).reset_index()
-        minute_df = minutes.merge(evt, on="minute", how="left").sort_values("minute")
-        minute_df[["home_cum", "away_cum"]] = minute_df[["home_cum", "away_cum"]].ffill().fillna(0).astype(int)
-
-        fig_flow = go.Figure()
-        fig_flow.add_trace(go.Scatter(x=minute_df["minute"], y=minute_df["home_cum"], mode="lines+markers", name=info["home_team"]))
-        fig_flow.add_trace(go.Scatter(x=minute_df["minute"], y=minute_df["away_cum"], mode="lines+markers", name=info["away_team"]))
-        for _, r in sf.iterrows():
-            fig_flow.add_vline(x=int(r["minute_scored"]), line_width=1, line_dash="dot", line_color="rgba(200,200,200,0.12)")
-        fig_flow.update_layout(title="Score Flow (Cumulative Goals)", xaxis_title="Minute", yaxis_title="Cumulative Goals",
-                               template="plotly_dark", legend=dict(x=0.01, y=0.99))
-        st.plotly_chart(fig_flow, use_container_width=True)
-
-    st.markdown("**Turning point detection**")
-    if sf.empty or minute_df.empty:
-        st.info("Not enough data to compute turning point.")
+    # Matches still in progress read from the shared live poller instead of the database.
+    live = None
+    info, events = bundle["info"], bundle["events"]
+    if live_match.is_live(info["status"]):
+        viewer = st.session_state.setdefault("viewer_id", uuid.uuid4().hex)
+        live = live_match.watch(mid, viewer, bundle)
+        info, events, _ = live.snapshot()
+
+    def render_live_parts(info, events):
+        hs, as_ = ma.score_totals(events, info)
+
+        st.markdown(f"""
+        <div class="score-card">
+            <h3>{info['home_team']} vs {info['away_team']}</h3>
+            <h1>{hs} - {as_}</h1>
+            <div class="muted">{info['date']} • {info['stadium']} • {info['status']}</div>
+        </div>
+        """, unsafe_allow_html=True)
+
+        timeline = events[["minute_scored", "player_name", "team_name", "points"]]
+
+        st.subheader("Scoring Timeline")
+        if timeline.empty:
+            st.info("No scoring events recorded.")
+        else:
+            for _, ev in timeline.iterrows():
+                st.markdown(f"**{int(ev['minute_scored'])}'** — {ev['player_name']} ({ev['team_name']}) scored {int(ev['points'])}")
+
+        st.markdown("---")
+        st.subheader("Advanced Match Analytics")
+
+        if events.empty:
+            st.info("No score-flow data available for this match.")
+        else:
+            flow = ma.match_flow(events, info)
+            fig_flow = go.Figure()
+            fig_flow.add_trace(go.Scatter(x=flow["minute"], y=flow["home_cum"], mode="lines+markers", name=info["home_team"]))
+            fig_flow.add_trace(go.Scatter(x=flow["minute"], y=flow["away_cum"], mode="lines+markers", name=info["away_team"]))
+            fig_flow.update_layout(
+                title="Score Flow (Cumulative Goals)", xaxis_title="Minute", yaxis_title="Cumulative Goals",
+                template="plotly_dark", legend=dict(x=0.01, y=0.99),
+                shapes=[
+                    dict(type="line", x0=m, x1=m, yref="paper", y0=0, y1=1,
+                         line=dict(width=1, dash="dot", color="rgba(200,200,200,0.12)"))
+                    for m in np.unique(events["minute_scored"].to_numpy()).tolist()
+                ],
+            )
+            st.plotly_chart(fig_flow, use_container_width=True)
+
+        st.markdown("**Turning point detection**")
+        if events.empty:
+            st.info("Not enough data to compute turning point.")
+        else:
+            tp_minute = flow["turning_minute"]
+            tp_desc = "No clear turning point detected."
+            if tp_minute is not None:
+                evs = timeline[timeline["minute_scored"] <= tp_minute]
+                if not evs.empty:
+                    last_ev = evs.iloc[-1]
+                    tp_desc = f"Turning point at {tp_minute}' — {last_ev['player_name']} ({last_ev['team_name']}) scored {int(last_ev['points'])}."
+                else:
+                    tp_desc = f"Turning point detected at {tp_minute}' (momentum change: {flow['turning_swing']:.2f})."
+
+            st.info(tp_desc)
+
+        st.markdown("### Heatmap — Scoring Minutes (players vs minute bins)")
+        if timeline.empty:
+            st.info("No scoring minutes to display.")
+        else:
+            heat = ma.scoring_heatmap(events)
+
+            fig_heat = go.Figure(data=go.Heatmap(
+                z=heat.values,
+                x=heat.columns.astype(str),
+                y=heat.index.astype(str),
+                colorscale="YlOrRd",
+                hoverongaps=False,
+                colorbar=dict(title="Points")
+            ))
+            fig_heat.update_layout(title="Scoring Minutes Heatmap", template="plotly_dark",
+                                   xaxis_title="Minute bins", yaxis_title="Player")
+            st.plotly_chart(fig_heat, use_container_width=True)
+
+    if live is not None and not live.ended:
+        # Only this block reruns on the timer; it reads the poller's in-memory events.
+        @fragment("live", run_every=live_match.LIVE_POLL_S)
+        def live_parts():
+            lm = live_match.watch(mid, viewer, bundle)
+            if lm.ended:
+                st.rerun()
+            live_info, live_events, _ = lm.snapshot()
+            st.caption(f"🔴 Live — new scores appear within {live_match.LIVE_POLL_S:g}s.")
+            render_live_parts(live_info, live_events)
+
+        live_parts()
+        st.caption("Player and team analytics below are as of the last full page load.")
+        if st.button("↻ Update player analytics", key="live_refresh"):
+            st.rerun()
     else:
-        minute_df["lead"] = minute_df["home_cum"] - minute_df["away_cum"]
-        minute_df["lead_diff"] = minute_df["lead"].diff().fillna(0)
-        minute_df["lead_diff2"] = minute_df["lead_diff"].diff().fillna(0).abs()
-        tp_row = minute_df.loc[minute_df["lead_diff2"].idxmax()]
-        tp_minute = int(tp_row["minute"])
-        tp_change = float(tp_row["lead_diff2"])
-
-        tp_desc = "No clear turning point detected."
-        if tp_change > 0:
-            evs = timeline[timeline["minute_scored"] <= tp_minute]
-            if not evs.empty:
-                last_ev = evs.iloc[-1]
-                tp_desc = f"Turning point at {tp_minute}' — {last_ev['player_name']} ({last_ev['team_name']}) scored {int(last_ev['points'])}."
-            else:
-                tp_desc = f"Turning point detected at {tp_minute}' (momentum change: {tp_change:.2f})."
-
-        st.info(tp_desc)
+        render_live_parts(info, events)
 
     st.markdown("### Expected Goals (xG) per Player")
-    xg_df = sql_df("""
-        SELECT match_id, player_id, player_name, team_name, shots, goals, xg
-        FROM v_match_player_xg
-        WHERE match_id = :m
-        ORDER BY xg DESC
-    """, {"m": mid})
+    xg_df = ma.player_xg(events)
 
     if xg_df.empty:
         st.info("No xG/player data available for this match.")
@@ -249,41 +229,8 @@ if st.session_state.match_view == "detail":
         )
         st.plotly_chart(fig_xg, use_container_width=True)
 
-    st.markdown("### Heatmap — Scoring Minutes (players vs minute bins)")
-    if timeline.empty:
-        st.info("No scoring minutes to display.")
-    else:
-        bins = list(range(0, 91, 10))
-        labels = [f"{i}-{i+9}" for i in bins[:-1]]
-        labels[-1] = "80-89"
-        timeline["minute_bin"] = pd.cut(
-            timeline["minute_scored"].astype(int),
-            bins=bins + [1000],
-            right=False,
-            labels=labels + ["90+"]
-        )
-        heat = timeline.groupby(["player_name", "minute_bin"])["points"].sum().unstack(fill_value=0)
-        cols_order = labels + ["90+"]
-        heat = heat.reindex(columns=cols_order, fill_value=0)
-
-        fig_heat = go.Figure(data=go.Heatmap(
-            z=heat.values,
-            x=heat.columns.astype(str),
-            y=heat.index.astype(str),
-            colorscale="YlOrRd",
-            hoverongaps=False,
-            colorbar=dict(title="Points")
-        ))
-        fig_heat.update_layout(title="Scoring Minutes Heatmap", template="plotly_dark",
-                               xaxis_title="Minute bins", yaxis_title="Player")
-        st.plotly_chart(fig_heat, use_container_width=True)
-
     st.markdown("### Team Comparison Radar")
-    stats = sql_df("""
-        SELECT match_id, team_id, team_name, shots, goals, shots_on_target, possession, passes, pass_accuracy
-        FROM v_match_team_stats
-        WHERE match_id = :m
-    """, {"m": mid})
+    stats = ma.team_stats(events)
 
     if stats.empty or stats.shape[0] < 2:
         st.info("Not enough team stats to build radar chart.")
@@ -322,13 +269,7 @@ if st.session_state.match_view == "detail":
         st.plotly_chart(fig_radar, use_container_width=True)
 
     st.markdown("### MVP Prediction")
-    mvp = sql_df("""
-        SELECT match_id, player_id, player_name, team_name, goals, xg, key_moments, mvp_score
-        FROM v_match_mvp
-        WHERE match_id = :m
-        ORDER BY mvp_score DESC
-        LIMIT 3
-    """, {"m": mid})
+    mvp = ma.mvp_ranking(events, top=3)
 
     if mvp.empty:
         st.info("No MVP data available.")
@@ -352,12 +293,7 @@ if st.session_state.match_view == "detail":
             )
 
     st.markdown("### Key Moments & Events")
-    km = sql_df("""
-        SELECT match_id, minute_scored, player_name, team_name, points, moment_type
-        FROM v_match_key_moments
-        WHERE match_id = :m
-        ORDER BY minute_scored
-    """, {"m": mid})
+    km = ma.key_moments(events)
 
     if km.empty:
         st.info("No key moments recorded.")
@@ -369,6 +305,8 @@ if st.session_state.match_view == "detail":
 
     st.markdown("---")
     if st.button("← Back to search"):
+        if live is not None:
+            live_match.unwatch(mid, st.session_state.viewer_id)
         st.session_state.match_view = "search"
         st.session_state.current_match = None
         st.rerun()
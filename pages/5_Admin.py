@@ -1,6 +1,17 @@
 from datetime import date
+import os
 import streamlit as st
-from common import auth_guard, inject_dark_theme, sql_df, call_proc, null_or
+import audit
+import audit_search
+import bulk_import
+import export
+import live_match
+from pickers import entity_picker
+from common import (
+    auth_guard, inject_dark_theme, sql_df, call_proc, null_or, fragment, LOOKUP_TTL,
+    query_metrics, query_cache, pool_metrics, prometheus_metrics, SLOW_QUERY_MS,
+    engine, invalidate_tables, audit_feed,
+)
 
 st.set_page_config(page_title="Admin · Sports Analytics", page_icon="🛠️", layout="wide")
 inject_dark_theme()
@@ -11,11 +22,28 @@ if st.session_state.user.get("role") != "admin":
     st.stop()
 
 st.title("🛠️ Admin Panel")
-tabs = st.tabs(["Players", "Teams", "Matches", "Scores", "Injuries", "Audit Log"])
+
+
+def existing_row(table: str, id_col: str, rid):
+    """The ``table`` row with ``id_col = rid``, or None if ``rid`` is None or the row is gone."""
+    if rid is None:
+        return None
+    df = sql_df(f"SELECT * FROM {table} WHERE {id_col}=:id", {"id": rid})
+    return None if df.empty else df.iloc[0]
+
+
+def row_gone(what: str):
+    st.warning(f"That {what} no longer exists; it may have been deleted in another session.")
+
+
+# Each tab is a fragment: a picker search, filter or page change reruns only its own
+# tab. Writes still rerun the whole page so the other tabs show fresh data.
+tabs = st.tabs(["Players", "Teams", "Matches", "Scores", "Injuries", "Audit Log", "Performance", "Import", "Export"])
 
 
 # ----------------------------- PLAYERS TAB -----------------------------
-with tabs[0]:
+@fragment("players")
+def players_tab():
     st.subheader("Players (Add / Update / Delete)")
 
     with st.expander("➕ Add Player"):
@@ -28,8 +56,8 @@ with tabs[0]:
             c4, c5 = st.columns(2)
             nationality = c4.text_input("Nationality", key="add_p_nat")
 
-            teams = sql_df("SELECT team_id, team_name FROM Teams ORDER BY team_name")
-            team_map = {r.team_name: r.team_id for _, r in teams.iterrows()}
+            teams = sql_df("SELECT team_id, team_name FROM Teams ORDER BY team_name", ttl=LOOKUP_TTL)
+            team_map = dict(zip(teams["team_name"], teams["team_id"]))
             team_sel = c5.selectbox("Team", list(team_map.keys()), key="add_p_team")
 
             if st.form_submit_button("Add Player"):
@@ -46,18 +74,15 @@ with tabs[0]:
                     st.rerun()
 
     with st.expander("✏️ Update / 🗑 Delete Player", expanded=True):
-        players = sql_df("SELECT player_id, name FROM Players ORDER BY name")
+        selected_pid = entity_picker("player", "Select Player", key="upd_player_select")
 
-        if not players.empty:
-            player_map = {str(r.name): int(r.player_id) for _, r in players.iterrows()}
-            selected_name = st.selectbox("Select Player", list(player_map.keys()), key="upd_player_select")
-            selected_pid = player_map[selected_name]
+        full = existing_row("Players", "player_id", selected_pid)
+        if full is not None:
+            selected_name = full["name"]
 
             mode = st.radio("Action", ["Update", "Delete"], horizontal=True, key="upd_player_mode")
 
             if mode == "Update":
-                full = sql_df("SELECT * FROM Players WHERE player_id=:pid", {"pid": selected_pid}).iloc[0]
-
                 with st.form("form_update_player"):
                     c1, c2, c3 = st.columns(3)
                     new_name = c1.text_input("Name", full["name"])
@@ -67,15 +92,12 @@ with tabs[0]:
                     c4, c5 = st.columns(2)
                     new_nat = c4.text_input("Nationality", full["nationality"] or "")
 
-                    teams = sql_df("SELECT team_id, team_name FROM Teams ORDER BY team_name")
-                    tmap = {r.team_name: r.team_id for _, r in teams.iterrows()}
+                    teams = sql_df("SELECT team_id, team_name FROM Teams ORDER BY team_name", ttl=LOOKUP_TTL)
+                    tmap = dict(zip(teams["team_name"], teams["team_id"]))
                     tnames = list(tmap.keys())
 
-                    if full["team_id"] in tmap.values():
-                        curr_team = sql_df("SELECT team_name FROM Teams WHERE team_id=:t", {"t": full["team_id"]}).iloc[0][0]
-                        t_index = tnames.index(curr_team)
-                    else:
-                        t_index = 0
+                    tids = list(tmap.values())
+                    t_index = tids.index(full["team_id"]) if full["team_id"] in tids else 0
 
                     new_team = c5.selectbox("Team", tnames, index=t_index)
 
@@ -97,12 +119,30 @@ with tabs[0]:
                     call_proc("delete_player", p_player_id=selected_pid)
                     st.success("Player deleted ✔️")
                     st.rerun()
+        elif selected_pid is not None:
+            row_gone("player")
         else:
-            st.info("No players in database.")
+            st.info("No players found.")
+
+    with st.expander("🔧 Rebuild Summary Tables"):
+        st.caption("Player_Summary and Match_Results are kept current on every write. "
+                   "Rebuild them from the base tables if they ever drift.")
+        r1, r2 = st.columns(2)
+        if r1.button("Rebuild player summary", key="rebuild_summary_btn"):
+            if call_proc("rebuild_player_summary"):
+                st.success("Player summary rebuilt ✔️")
+        if r2.button("Rebuild match results", key="rebuild_results_btn"):
+            if call_proc("rebuild_match_results"):
+                st.success("Match results rebuilt ✔️")
+
+
+with tabs[0]:
+    players_tab()
 
 
 # ----------------------------- TEAMS TAB -----------------------------
-with tabs[1]:
+@fragment("teams")
+def teams_tab():
     st.subheader("Teams (Add / Update / Delete)")
 
     with st.expander("➕ Add Team"):
@@ -126,15 +166,17 @@ with tabs[1]:
                     st.rerun()
 
     with st.expander("✏️ Update / 🗑 Delete Team", expanded=True):
-        teams = sql_df("SELECT team_id, team_name FROM Teams ORDER BY team_name")
-        tmap = {r.team_name: r.team_id for _, r in teams.iterrows()}
+        teams = sql_df("SELECT team_id, team_name FROM Teams ORDER BY team_name", ttl=LOOKUP_TTL)
+        tmap = dict(zip(teams["team_name"], teams["team_id"]))
         selected_team = st.selectbox("Select Team", list(tmap.keys()), key="team_sel")
         tid = tmap[selected_team]
 
         mode = st.radio("Action", ["Update", "Delete"], horizontal=True, key="team_mode")
 
-        if mode == "Update":
-            t = sql_df("SELECT * FROM Teams WHERE team_id=:tid", {"tid": tid}).iloc[0]
+        t = existing_row("Teams", "team_id", tid)
+        if t is None:
+            row_gone("team")
+        elif mode == "Update":
 
             with st.form("form_upd_team"):
                 c1, c2, c3, c4 = st.columns(4)
@@ -161,12 +203,17 @@ with tabs[1]:
                 st.rerun()
 
 
+with tabs[1]:
+    teams_tab()
+
+
 # ----------------------------- MATCHES TAB -----------------------------
-with tabs[2]:
+@fragment("matches")
+def matches_tab():
     st.subheader("Matches (Add / Update / Delete)")
 
-    teams = sql_df("SELECT team_id, team_name FROM Teams ORDER BY team_name")
-    tmap = {r.team_name: r.team_id for _, r in teams.iterrows()}
+    teams = sql_df("SELECT team_id, team_name FROM Teams ORDER BY team_name", ttl=LOOKUP_TTL)
+    tmap = dict(zip(teams["team_name"], teams["team_id"]))
 
     with st.expander("➕ Add Match"):
         with st.form("form_add_match"):
@@ -192,23 +239,15 @@ with tabs[2]:
                 st.rerun()
 
     with st.expander("✏️ Update / 🗑 Delete Match", expanded=True):
-        matches = sql_df("""
-            SELECT m.match_id,
-                   CONCAT(ht.team_name,' vs ',at.team_name,' — ',m.date) AS label
-            FROM Matches m
-            JOIN Teams ht ON ht.team_id = m.home_team_id
-            JOIN Teams at ON at.team_id = m.away_team_id
-            ORDER BY m.match_id DESC
-        """)
-
-        match_map = {r.label: r.match_id for _, r in matches.iterrows()}
-        selected_label = st.selectbox("Select Match", list(match_map.keys()), key="match_sel")
-        mid = match_map[selected_label]
-
+        mid = entity_picker("match", "Select Match", key="match_sel")
         mode = st.radio("Action", ["Update", "Delete"], horizontal=True, key="match_mode")
 
-        if mode == "Update":
-            m = sql_df("SELECT * FROM Matches WHERE match_id=:mid", {"mid": mid}).iloc[0]
+        m = existing_row("Matches", "match_id", mid)
+        if mid is None:
+            st.info("No matches found.")
+        elif m is None:
+            row_gone("match")
+        elif mode == "Update":
 
             with st.form("form_upd_match"):
                 c1, c2, c3 = st.columns(3)
@@ -239,77 +278,81 @@ with tabs[2]:
                 st.rerun()
 
 
+with tabs[2]:
+    matches_tab()
+
+
 # ----------------------------- SCORES TAB -----------------------------
-with tabs[3]:
+@fragment("scores")
+def scores_tab():
     st.subheader("Scores (Add / Update / Delete)")
 
-    matches = sql_df("SELECT match_id FROM Matches ORDER BY match_id DESC")
-    teams = sql_df("SELECT * FROM Teams ORDER BY team_name")
-    players = sql_df("SELECT * FROM Players ORDER BY name")
-
-    tmap = {r.team_name: r.team_id for _, r in teams.iterrows()}
-    pmap = {r.name: r.player_id for _, r in players.iterrows()}
+    teams = sql_df("SELECT team_id, team_name FROM Teams ORDER BY team_name", ttl=LOOKUP_TTL)
+    tmap = dict(zip(teams["team_name"], teams["team_id"]))
 
     with st.expander("➕ Add Score"):
+        a1, a2 = st.columns(2)
+        mid = entity_picker("match", "Match", key="add_score_match", container=a1)
+        pid = entity_picker("player", "Player", key="add_score_player", container=a2)
         with st.form("form_add_score"):
-            c1, c2, c3, c4, c5 = st.columns(5)
-            mid = c1.selectbox("Match", matches["match_id"].tolist())
-            team = c2.selectbox("Team", list(tmap.keys()))
-            player = c3.selectbox("Player", list(pmap.keys()))
-            pts = c4.number_input("Points", min_value=0)
-            minute = c5.number_input("Minute", min_value=0)
+            c1, c2, c3 = st.columns(3)
+            team = c1.selectbox("Team", list(tmap.keys()))
+            pts = c2.number_input("Points", min_value=0)
+            minute = c3.number_input("Minute", min_value=0)
 
             if st.form_submit_button("Add"):
-                call_proc(
-                    "add_score",
-                    p_match_id=mid,
-                    p_team_id=tmap[team],
-                    p_player_id=pmap[player],
-                    p_points=int(pts),
-                    p_minute_scored=int(minute)
-                )
-                st.success("Score added ✔️")
-                st.rerun()
-
-    with st.expander("✏️ Update / 🗑 Delete Score", expanded=True):
-        scores = sql_df("""
-            SELECT s.score_id,
-                   CONCAT(p.name,' scored for ',t.team_name,' in match #',s.match_id,' (',s.points,' pts)')
-                   AS label
-            FROM Scores s
-            JOIN Players p ON p.player_id=s.player_id
-            JOIN Teams t ON t.team_id=s.team_id
-            ORDER BY s.score_id DESC
-        """)
-
-        sc_map = {r.label: r.score_id for _, r in scores.iterrows()}
-        selected_score = st.selectbox("Select Score", list(sc_map.keys()), key="score_sel")
-        sid = sc_map[selected_score]
-
-        mode = st.radio("Action", ["Update", "Delete"], horizontal=True, key="score_mode")
-
-        if mode == "Update":
-            with st.form("form_upd_score"):
-                c1, c2, c3, c4, c5 = st.columns(5)
-                mid = c1.selectbox("Match", matches["match_id"].tolist())
-                team = c2.selectbox("Team", list(tmap.keys()))
-                player = c3.selectbox("Player", list(pmap.keys()))
-                pts = c4.number_input("Points", min_value=0)
-                minute = c5.number_input("Minute", min_value=0)
-
-                if st.form_submit_button("Save"):
+                if mid is None or pid is None:
+                    st.error("Pick a match and a player first.")
+                else:
                     call_proc(
-                        "update_score",
-                        p_score_id=sid,
+                        "add_score",
                         p_match_id=mid,
                         p_team_id=tmap[team],
-                        p_player_id=pmap[player],
+                        p_player_id=pid,
                         p_points=int(pts),
                         p_minute_scored=int(minute)
                     )
-                    st.success("Score updated ✔️")
+                    st.success("Score added ✔️")
                     st.rerun()
 
+    with st.expander("✏️ Update / 🗑 Delete Score", expanded=True):
+        sid = entity_picker("score", "Select Score", key="score_sel")
+        mode = st.radio("Action", ["Update", "Delete"], horizontal=True, key="score_mode")
+
+        sc = existing_row("Scores", "score_id", sid)
+        if sid is None:
+            st.info("No scores found.")
+        elif sc is None:
+            row_gone("score")
+        elif mode == "Update":
+            u1, u2 = st.columns(2)
+            mid = entity_picker("match", "Match", key="upd_score_match", default=int(sc["match_id"]), container=u1)
+            pid = entity_picker("player", "Player", key="upd_score_player", default=int(sc["player_id"]), container=u2)
+            tids = list(tmap.values())
+
+            with st.form("form_upd_score"):
+                c1, c2, c3 = st.columns(3)
+                team = c1.selectbox("Team", list(tmap.keys()),
+                                    index=tids.index(sc["team_id"]) if sc["team_id"] in tids else 0)
+                pts = c2.number_input("Points", min_value=0, value=int(sc["points"] or 0))
+                minute = c3.number_input("Minute", min_value=0, value=int(sc["minute_scored"] or 0))
+
+                if st.form_submit_button("Save"):
+                    if mid is None or pid is None:
+                        st.error("Pick a match and a player first.")
+                    else:
+                        call_proc(
+                            "update_score",
+                            p_score_id=sid,
+                            p_match_id=mid,
+                            p_team_id=tmap[team],
+                            p_player_id=pid,
+                            p_points=int(pts),
+                            p_minute_scored=int(minute)
+                        )
+                        st.success("Score updated ✔️")
+                        st.rerun()
+
         else:
             if st.button("Confirm Delete Score"):
                 call_proc("delete_score", p_score_id=sid)
@@ -317,26 +360,28 @@ with tabs[3]:
                 st.rerun()
 
 
+with tabs[3]:
+    scores_tab()
+
+
 # ----------------------------- INJURIES TAB -----------------------------
-with tabs[4]:
+@fragment("injuries")
+def injuries_tab():
     st.subheader("Injuries (Add / Update / Delete)")
 
-    players = sql_df("SELECT player_id, name FROM Players ORDER BY name")
-    pmap = {r.name: r.player_id for _, r in players.iterrows()}
-
     with st.expander("➕ Add Injury"):
+        pid = entity_picker("player", "Player", key="add_inj_player")
         with st.form("form_add_injury"):
-            c1, c2, c3, c4 = st.columns(4)
-            player = c1.selectbox("Player", list(pmap.keys()))
+            c2, c3, c4 = st.columns(3)
             itype = c2.text_input("Injury Type*")
             idate = c3.date_input("Injury Date", value=date.today())
             ereturn = c4.date_input("Expected Return", value=None)
             status = st.selectbox("Status", ["Injured", "Recovering", "Fit"])
 
-            if st.form_submit_button("Add"):
+            if st.form_submit_button("Add") and pid is not None:
                 call_proc(
                     "add_injury",
-                    p_player_id=pmap[player],
+                    p_player_id=pid,
                     p_injury_type=itype,
                     p_injury_date=str(idate),
                     p_expected_return=str(ereturn) if ereturn else None,
@@ -346,25 +391,17 @@ with tabs[4]:
                 st.rerun()
 
     with st.expander("✏️ Update / 🗑 Delete Injury", expanded=True):
-        injuries = sql_df("""
-            SELECT i.injury_id,
-                   CONCAT(p.name,' — ',i.injury_type,' (',i.status,')') AS label
-            FROM Injuries i
-            JOIN Players p ON p.player_id=i.player_id
-            ORDER BY i.injury_id DESC
-        """)
-
-        if not injuries.empty:
-            inj_map = {r.label: r.injury_id for _, r in injuries.iterrows()}
-            selected_injury = st.selectbox("Select Injury", list(inj_map.keys()), key="inj_sel")
-            iid = inj_map[selected_injury]
+        iid = entity_picker("injury", "Select Injury", key="inj_sel")
 
+        if iid is not None:
             mode = st.radio("Action", ["Update", "Delete"], horizontal=True, key="inj_mode")
 
             if mode == "Update":
+                inj = sql_df("SELECT player_id FROM Injuries WHERE injury_id=:iid", {"iid": iid})
+                pid = entity_picker("player", "Player", key="upd_inj_player",
+                                    default=int(inj["player_id"].iloc[0]) if not inj.empty else None)
                 with st.form("form_upd_injury"):
-                    c1, c2, c3, c4 = st.columns(4)
-                    player = c1.selectbox("Player", list(pmap.keys()))
+                    c2, c3, c4 = st.columns(3)
                     new_type = c2.text_input("Type")
                     new_date = c3.date_input("Date", value=date.today())
                     new_ereturn = c4.date_input("Expected Return", value=None)
@@ -374,7 +411,7 @@ with tabs[4]:
                         call_proc(
                             "update_injury",
                             p_injury_id=iid,
-                            p_player_id=pmap[player],
+                            p_player_id=pid,
                             p_injury_type=null_or(new_type),
                             p_injury_date=str(new_date),
                             p_expected_return=str(new_ereturn) if new_ereturn else None,
@@ -388,28 +425,207 @@ with tabs[4]:
                     st.success("Injury deleted ✔️")
                     st.rerun()
         else:
-            st.info("No injury records.")
+            st.info("No injuries found.")
+
+
+with tabs[4]:
+    injuries_tab()
 
 
 # ----------------------------- AUDIT LOG TAB -----------------------------
-with tabs[5]:
+@fragment("audit_log")
+def audit_log_tab():
     st.subheader("Audit Log")
 
     f1, f2, f3 = st.columns(3)
-    table_filter = f1.selectbox("Table", ["All", "Players", "Teams", "Matches", "Scores", "Injuries"])
-    action_filter = f2.selectbox("Action", ["All", "INSERT", "UPDATE", "DELETE"])
-    limit = f3.number_input("Limit", min_value=10, max_value=5000, value=200, step=10)
-
-    logs = sql_df("""
-        SELECT id, table_name, record_id, action, actor, created_at
-        FROM Audit_Log
-        ORDER BY id DESC
-        LIMIT :l
-    """, {"l": int(limit)})
-
-    if table_filter != "All":
-        logs = logs[logs["table_name"] == table_filter]
-    if action_filter != "All":
-        logs = logs[logs["action"] == action_filter]
-
-    st.dataframe(logs, use_container_width=True, height=420)
+    table_filter = f1.selectbox("Table", ["All"] + audit_search.TABLES, key="audit_table")
+    action_filter = f2.selectbox("Action", ["All"] + audit_search.ACTIONS, key="audit_action")
+    record_filter = f3.text_input("Record ID", key="audit_record").strip()
+    f4, f5, f6 = st.columns(3)
+    date_from = f4.date_input("From", value=None, key="audit_from")
+    date_to = f5.date_input("To", value=None, key="audit_to")
+    audit_page_size = f6.selectbox("Per page", audit_search.PAGE_SIZES, index=1, key="audit_page_size")
+
+    if record_filter and not record_filter.isdigit():
+        st.warning("Record ID must be a number.")
+        record_filter = ""
+
+    audit_key = (table_filter, action_filter, record_filter, date_from, date_to, audit_page_size)
+    if st.session_state.get("audit_search_key") != audit_key:
+        st.session_state.audit_search_key = audit_key
+        st.session_state.audit_cursor = {}
+
+    logs, has_prev, has_next = audit_search.search_audit(
+        table=None if table_filter == "All" else table_filter,
+        action=None if action_filter == "All" else action_filter,
+        record_id=int(record_filter) if record_filter else None,
+        date_from=date_from,
+        date_to=date_to,
+        page_size=audit_page_size,
+        **st.session_state.audit_cursor,
+    )
+
+    if logs.empty:
+        st.info("No audit entries match these filters.")
+        # The page under the cursor can empty out (e.g. retention purged it).
+        if st.session_state.audit_cursor and st.button("Back to newest", key="audit_reset"):
+            st.session_state.audit_cursor = {}
+            st.rerun(scope="fragment")
+    else:
+        st.dataframe(logs, use_container_width=True, height=420)
+
+    a1, a2, _ = st.columns([1, 1, 6])
+    if a1.button("← Newer", disabled=logs.empty or not has_prev, key="audit_prev"):
+        st.session_state.audit_cursor = {"before": int(logs["id"].iloc[0])}
+        st.rerun(scope="fragment")
+    if a2.button("Older →", disabled=logs.empty or not has_next, key="audit_next"):
+        st.session_state.audit_cursor = {"after": int(logs["id"].iloc[-1])}
+        st.rerun(scope="fragment")
+
+    with st.expander("🗄 Retention"):
+        st.caption("Audit_Log is partitioned by month. This adds partitions for the coming months, "
+                   "drops months older than the retention window and purges any remaining older rows.")
+        keep_days = st.number_input("Keep days", min_value=30, max_value=3650,
+                                    value=audit.AUDIT_RETENTION_DAYS, step=30, key="audit_keep_days")
+        if st.button("Run retention", key="audit_retention_btn"):
+            try:
+                result = audit.run_retention(engine, int(keep_days))
+            except Exception as e:
+                st.error(f"Retention failed: {e}")
+            else:
+                invalidate_tables("Audit_Log")
+                st.success(f"Added {len(result['added'])} partition(s), dropped {len(result['dropped'])}, "
+                           f"purged {result['purged']:,} row(s).")
+
+
+with tabs[5]:
+    audit_log_tab()
+
+
+# ----------------------------- PERFORMANCE TAB -----------------------------
+@fragment("performance")
+def performance_tab():
+    st.subheader("Query Performance")
+    st.caption(f"Latency percentiles over the most recent calls per query signature. "
+               f"Queries slower than {SLOW_QUERY_MS:.0f} ms are logged as warnings.")
+
+    summary = query_metrics.summary()
+    pages = ["All"] + sorted(summary["page"].unique().tolist())
+    page_filter = st.selectbox("Page", pages, key="perf_page")
+    if page_filter != "All":
+        summary = summary[summary["page"] == page_filter]
+    st.dataframe(summary, use_container_width=True, height=420)
+
+    c1, c2 = st.columns(2)
+    with c1:
+        st.markdown("**Connection pools**")
+        st.dataframe(pool_metrics(), use_container_width=True)
+    with c2:
+        st.markdown("**Query cache**")
+        st.json(query_cache.stats())
+        st.markdown("**Change feed**")
+        st.json(audit_feed.stats())
+        st.markdown("**Live match pollers**")
+        st.json(live_match.live_stats())
+
+    d1, d2 = st.columns(2)
+    d1.download_button("⬇ Prometheus metrics", prometheus_metrics(), file_name="metrics.prom", mime="text/plain")
+    if d2.button("Reset query metrics", key="perf_reset"):
+        query_metrics.reset()
+        st.rerun(scope="fragment")
+
+
+with tabs[6]:
+    performance_tab()
+
+
+# ----------------------------- IMPORT TAB -----------------------------
+@fragment("import")
+def import_tab():
+    st.subheader("Bulk Import")
+    st.caption("Load players, matches or scores from CSV or Parquet. Teams and players may be given "
+               "by name (team, home_team, away_team, player) or by id.")
+
+    i1, i2 = st.columns(2)
+    import_kind = i1.selectbox("Import", list(bulk_import.KINDS), key="import_kind")
+    dry_run = i2.checkbox("Validate only (dry run)", key="import_dry_run")
+    upload = st.file_uploader("File", type=["csv", "parquet"], key="import_file")
+
+    if upload is not None and st.button("Run import", key="import_btn"):
+        fmt = "parquet" if upload.name.lower().endswith(".parquet") else "csv"
+        with st.spinner("Importing..."):
+            try:
+                report = bulk_import.import_file(import_kind, upload, fmt=fmt, dry_run=dry_run)
+            except Exception as e:
+                st.error(f"Import failed: {e}")
+                report = None
+        if report is not None:
+            rejects = report.pop("rejects")
+            if dry_run:
+                st.success(f"{report['valid']:,} of {report['rows_read']:,} rows valid, "
+                           f"{report['rejected']:,} rejected (dry run, nothing inserted).")
+            else:
+                st.success(f"{report['inserted']:,} of {report['rows_read']:,} rows inserted in "
+                           f"{report['seconds']:.1f}s ({report['rows_per_s']:,.0f} rows/s), "
+                           f"{report['rejected']:,} rejected.")
+            if not rejects.empty:
+                st.dataframe(rejects.head(500), use_container_width=True, height=300)
+                st.download_button("⬇ Rejected rows", rejects.to_csv(index=False),
+                                   file_name=f"{import_kind}_rejects.csv", mime="text/csv")
+
+
+with tabs[7]:
+    import_tab()
+
+
+# ----------------------------- EXPORT TAB -----------------------------
+@fragment("export")
+def export_tab():
+    st.subheader("Export")
+    st.caption("Exports stream from the database to a temporary file on the server in chunks. "
+               "The file is read into memory only while its download button is shown, after "
+               f"“Get file”, so larger files are left to `manage.py export`; unused exports are deleted "
+               f"after {export.EXPORT_TTL_S / 60:.0f} minutes.")
+
+    e1, e2 = st.columns(2)
+    export_name = e1.selectbox("Data", list(export.EXPORTS), key="export_name")
+    export_fmt = e2.selectbox("Format", list(export.FORMATS), key="export_fmt")
+
+    if st.button("Prepare export", key="export_btn"):
+        prev = st.session_state.pop("export_file", None)
+        if prev and os.path.exists(prev["path"]):
+            os.remove(prev["path"])
+        path = export.new_export_path(export_fmt)
+        with st.spinner("Exporting..."):
+            try:
+                report = export.write_export(export_name, export_fmt, path)
+            except Exception as e:
+                os.remove(path)
+                st.error(f"Export failed: {e}")
+            else:
+                st.session_state["export_file"] = dict(report, path=path)
+
+    done = st.session_state.get("export_file")
+    if done and os.path.exists(done["path"]):
+        size = os.path.getsize(done["path"])
+        st.success(f"{done['rows']:,} rows, {size / 1024 / 1024:,.1f} MB in {done['seconds']:.1f}s "
+                   f"({done['rows_per_s']:,.0f} rows/s).")
+        if size > export.EXPORT_MAX_INAPP_BYTES:
+            st.warning(f"Too large to download here (over {export.EXPORT_MAX_INAPP_BYTES / 1024 / 1024:,.0f} MB). "
+                       f"It is at `{done['path']}` on the server until it expires, or run "
+                       f"`python manage.py export {done['export']} --format {done['format']}`.")
+        # download_button copies its data into the media store on every run it is
+        # drawn, so only draw it for the one run after "Get file".
+        elif st.button("Get file", key="export_get"):
+            with open(done["path"], "rb") as fh:
+                data = fh.read()
+            st.download_button(f"⬇ {done['export']}.{done['format']}", data,
+                               file_name=f"{done['export']}.{done['format']}",
+                               mime=export.FORMATS[done["format"]], key="export_download")
+    elif done:
+        st.session_state.pop("export_file", None)
+        st.info("That export has expired; prepare it again.")
+
+
+with tabs[8]:
+    export_tab()
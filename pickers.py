@@ -0,0 +1,135 @@
+"""Searchable entity pickers that load at most ``TOP_K`` options per rerun.
+
+Each picker is a search box plus a selectbox of the best matches. Digits match an
+id; text matches a name prefix through an index. Lookups go through ``sql_df`` and
+so share the query cache and its write invalidation.
+"""
+import streamlit as st
+from common import sql_df
+from player_search import get_player_index
+
+TOP_K = 25
+
+# kind -> (id column, label SQL with {where}/{order}, predicates for a numeric query, predicate for text)
+PICKERS = {
+    "player": (
+        "player_id",
+        """
+        SELECT ps.player_id AS id,
+               CONCAT(ps.name, COALESCE(CONCAT(' (', ps.team_name, ')'), '')) AS label
+        FROM Player_Summary ps
+        WHERE {where}
+        ORDER BY {order}
+        LIMIT :k
+        """,
+        "ps.player_id = :n",
+        None,  # text queries use the in-process player search index
+    ),
+    "match": (
+        "match_id",
+        """
+        SELECT m.match_id AS id,
+               CONCAT('#', m.match_id, ' ', COALESCE(ht.team_name, '?'), ' vs ', COALESCE(at.team_name, '?'),
+                      ' — ', COALESCE(m.date, '?')) AS label
+        FROM Matches m
+        LEFT JOIN Teams ht ON ht.team_id = m.home_team_id
+        LEFT JOIN Teams at ON at.team_id = m.away_team_id
+        WHERE {where}
+        ORDER BY {order}
+        LIMIT :k
+        """,
+        "m.match_id = :n",
+        "(m.home_team_id IN (SELECT team_id FROM Teams WHERE team_name LIKE :p)"
+        " OR m.away_team_id IN (SELECT team_id FROM Teams WHERE team_name LIKE :p))",
+    ),
+    "score": (
+        "score_id",
+        """
+        SELECT s.score_id AS id,
+               CONCAT(COALESCE(p.name, '?'), ' scored for ', COALESCE(t.team_name, '?'),
+                      ' in match #', COALESCE(s.match_id, '?'), ' (', COALESCE(s.points, '?'), ' pts)') AS label
+        FROM Scores s
+        LEFT JOIN Players p ON p.player_id = s.player_id
+        LEFT JOIN Teams t ON t.team_id = s.team_id
+        WHERE {where}
+        ORDER BY {order}
+        LIMIT :k
+        """,
+        "(s.score_id = :n OR s.match_id = :n)",
+        "s.player_id IN (SELECT player_id FROM Players WHERE name LIKE :p)",
+    ),
+    "injury": (
+        "injury_id",
+        """
+        SELECT i.injury_id AS id,
+               CONCAT(COALESCE(p.name, '?'), ' — ', COALESCE(i.injury_type, '?'),
+                      ' (', COALESCE(i.status, '?'), ')') AS label
+        FROM Injuries i
+        LEFT JOIN Players p ON p.player_id = i.player_id
+        WHERE {where}
+        ORDER BY {order}
+        LIMIT :k
+        """,
+        "i.injury_id = :n",
+        "i.player_id IN (SELECT player_id FROM Players WHERE name LIKE :p)",
+    ),
+}
+
+_ALIAS = {"player": "ps", "match": "m", "score": "s", "injury": "i"}
+
+
+def _like_prefix(q: str) -> str:
+    return q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def _query(kind: str, where: str, params: dict) -> list:
+    id_col, sql, _, _ = PICKERS[kind]
+    df = sql_df(sql.format(where=where, order=f"{_ALIAS[kind]}.{id_col} DESC"), dict(params, k=TOP_K))
+    return list(zip(df["id"].astype(int), df["label"])) if not df.empty else []
+
+
+def search(kind: str, q: str = "") -> list:
+    """Top ``TOP_K`` ``(id, label)`` pairs for ``q``; the newest rows when ``q`` is empty."""
+    _, _, num_pred, text_pred = PICKERS[kind]
+    q = (q or "").strip()
+    if not q:
+        return _query(kind, "1=1", {})
+    if q.lstrip("#").isdigit():
+        return _query(kind, num_pred, {"n": int(q.lstrip("#"))})
+    if text_pred is not None:
+        return _query(kind, text_pred, {"p": _like_prefix(q)})
+
+    ranked = get_player_index().search(q, limit=TOP_K)
+    if not ranked:
+        return []
+    binds = {f"id{i}": pid for i, pid in enumerate(ranked)}
+    rows = dict(_query(kind, f"ps.player_id IN ({', '.join(':' + b for b in binds)})", binds))
+    return [(pid, rows[pid]) for pid in ranked if pid in rows]
+
+
+def label_for(kind: str, record_id: int):
+    id_col, _, _, _ = PICKERS[kind]
+    rows = _query(kind, f"{_ALIAS[kind]}.{id_col} = :n", {"n": int(record_id)})
+    return rows[0] if rows else None
+
+
+def entity_picker(kind: str, label: str, key: str, default=None, container=None):
+    """Search box plus selectbox for one ``kind``; returns the chosen id, or None when nothing matches.
+
+    Text inputs inside ``st.form`` do not rerun, so place pickers outside forms.
+    """
+    container = container or st
+    q = container.text_input(f"Search {label.lower()}", key=f"{key}_q",
+                             placeholder="name or #id — blank shows the newest")
+    options = search(kind, q)
+    if default is not None and all(i != default for i, _ in options):
+        current = label_for(kind, default)
+        if current is not None:
+            options.insert(0, current)
+    if not options:
+        container.caption(f"No {label.lower()} matches.")
+        return None
+    labels = dict(options)
+    ids = list(labels)
+    index = ids.index(default) if default in labels else 0
+    return container.selectbox(label, ids, index=index, format_func=labels.get, key=key)
@@ -0,0 +1,33 @@
+"""The Players page card grid, built as one HTML string in a single vectorized pass.
+
+One ``st.markdown`` element replaces a ``st.columns`` row plus a markdown element
+per card, and the CSS grid lays the cards out. Every value is HTML-escaped.
+"""
+import html
+import pandas as pd
+
+STATUS_HTML = {
+    True: '<div class="bad" style="margin-top:6px;">Injured</div>',
+    False: '<div class="ok" style="margin-top:6px;">Fit</div>',
+}
+
+
+def _text(col: pd.Series, default: str) -> pd.Series:
+    return col.astype(object).where(col.notna() & (col.astype(str) != ""), default).astype(str).map(html.escape)
+
+
+def player_cards_html(df: pd.DataFrame) -> str:
+    """One ``card-grid`` div holding an ``app-card`` per row of a search_players page."""
+    if df.empty:
+        return ""
+    points = pd.to_numeric(df["total_points"], errors="coerce").fillna(0).astype(int).astype(str)
+    injured = df["injured"].fillna(0).astype(bool)
+    cards = (
+        '<div class="app-card"><div class="title-20">' + _text(df["name"], "")
+        + '</div><span class="app-badge">' + _text(df["team_name"], "No Team")
+        + '</span><span class="app-badge">' + _text(df["position"], "-")
+        + '</span><span class="app-badge">' + _text(df["nationality"], "-")
+        + '</span><div class="muted" style="margin-top:8px;">Points: <b>' + points
+        + "</b></div>" + injured.map(STATUS_HTML) + "</div>"
+    )
+    return '<div class="card-grid">' + "".join(cards.tolist()) + "</div>"
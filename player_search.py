@@ -0,0 +1,235 @@
+"""Player search with filtering and pagination done in the database.
+
+Free-text queries are answered by an in-process prefix index over player
+name/position/nationality; the database filters and pages the matching ids in
+relevance order. Only the best ``MAX_CANDIDATES`` index matches are considered.
+"""
+import os
+import re
+import threading
+import time
+import pandas as pd
+from change_feed import GapTracker, bind_ids
+from common import sql_df, subscribe_changes
+
+PAGE_SIZES = [12, 24, 48, 96]
+
+# Field weights for ranking; a whole-token match counts double a prefix match.
+FIELD_WEIGHTS = {"name": 3, "position": 1, "nationality": 1}
+MAX_PREFIX = 24
+MAX_CANDIDATES = 1000
+# Full rebuild after this many seconds, for player writes made outside this process
+# (CLI import, other workers, manual SQL) when the Audit_Log change feed is off.
+PLAYER_INDEX_MAX_AGE = float(os.getenv("PLAYER_INDEX_MAX_AGE", "300"))
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(value) -> list:
+    if not value:
+        return []
+    return _TOKEN.findall(str(value).lower())
+
+
+class PlayerSearchIndex:
+    """Prefix index: every prefix of every token maps to ``{player_id: field weight}``."""
+
+    def __init__(self):
+        self._prefix = {}
+        self._exact = {}
+        self._docs = {}  # player_id -> (name, tokens)
+        self._lock = threading.RLock()
+        self.max_id = 0
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, player_id: int, name, position=None, nationality=None):
+        player_id = int(player_id)
+        with self._lock:
+            self.remove(player_id)
+            weights = {}
+            for field, value in (("name", name), ("position", position), ("nationality", nationality)):
+                for tok in tokenize(value):
+                    weights[tok] = max(weights.get(tok, 0), FIELD_WEIGHTS[field])
+            for tok, w in weights.items():
+                self._exact.setdefault(tok, {})[player_id] = w
+                for i in range(1, min(len(tok), MAX_PREFIX) + 1):
+                    postings = self._prefix.setdefault(tok[:i], {})
+                    postings[player_id] = max(postings.get(player_id, 0), w)
+            self._docs[player_id] = (str(name or "").lower(), list(weights))
+            self.max_id = max(self.max_id, player_id)
+
+    def remove(self, player_id: int):
+        with self._lock:
+            doc = self._docs.pop(int(player_id), None)
+            if doc is None:
+                return
+            for tok in doc[1]:
+                self._discard(self._exact, tok, player_id)
+                for i in range(1, min(len(tok), MAX_PREFIX) + 1):
+                    self._discard(self._prefix, tok[:i], player_id)
+
+    @staticmethod
+    def _discard(table: dict, key: str, player_id: int):
+        postings = table.get(key)
+        if postings is not None:
+            postings.pop(player_id, None)
+            if not postings:
+                del table[key]
+
+    def search(self, q: str, limit: int = MAX_CANDIDATES) -> list:
+        """Player ids matching every query token as a prefix, best match first."""
+        tokens = tokenize(q)
+        if not tokens:
+            return []
+        with self._lock:
+            scores = None
+            for tok in tokens:
+                postings = self._prefix.get(tok[:MAX_PREFIX], {})
+                exact = self._exact.get(tok, {})
+                tok_scores = {pid: w * (2 if pid in exact else 1) for pid, w in postings.items()}
+                if scores is None:
+                    scores = tok_scores
+                else:
+                    scores = {pid: s + tok_scores[pid] for pid, s in scores.items() if pid in tok_scores}
+                if not scores:
+                    return []
+            phrase = " ".join(tokens)
+            for pid in scores:
+                if self._docs[pid][0].startswith(phrase):
+                    scores[pid] += 1
+            ranked = sorted(scores, key=lambda pid: (-scores[pid], self._docs[pid][0], pid))
+            return ranked[:limit]
+
+
+_index = None
+_index_lock = threading.Lock()
+_pending = {"reload": set(), "new": False, "rebuild": False}
+_built_at = 0.0
+# Player ids skipped by a `player_id > max_id` read: a lower id may commit after a higher one.
+_gaps = GapTracker(what="player ids")
+
+
+def _load_rows(where: str = "", params=None):
+    return sql_df(f"SELECT player_id, name, position, nationality FROM Players {where}", params, ttl=0)
+
+
+def get_player_index() -> PlayerSearchIndex:
+    """The process-wide index, built on first use and patched with pending player changes.
+
+    It is rebuilt from scratch every ``PLAYER_INDEX_MAX_AGE`` seconds.
+    """
+    global _index, _built_at, _gaps
+    with _index_lock:
+        if _index is None or _pending["rebuild"] or time.monotonic() - _built_at > PLAYER_INDEX_MAX_AGE:
+            idx = PlayerSearchIndex()
+            for r in _load_rows().itertuples(index=False):
+                idx.add(r.player_id, r.name, r.position, r.nationality)
+            _index, _built_at = idx, time.monotonic()
+            _gaps = GapTracker(what="player ids")
+            _pending.update(reload=set(), new=False, rebuild=False)
+            return _index
+
+        gaps = _gaps.pending()
+        if _pending["new"] or gaps:
+            where, params = "WHERE player_id > :m", {"m": _index.max_id}
+            if gaps:
+                placeholders, binds = bind_ids(gaps, "gap")
+                where += f" OR player_id IN ({placeholders})"
+                params.update(binds)
+            rows = _load_rows(where, params)
+            ids = sorted(int(i) for i in rows["player_id"]) if not rows.empty else []
+            _gaps.fill(i for i in ids if i <= _index.max_id)
+            _gaps.track(_index.max_id, [i for i in ids if i > _index.max_id])
+            for r in rows.itertuples(index=False):
+                _index.add(r.player_id, r.name, r.position, r.nationality)
+            _pending["new"] = False
+        if _pending["reload"]:
+            ids = sorted(_pending["reload"])
+            binds = {f"id{i}": pid for i, pid in enumerate(ids)}
+            rows = _load_rows(f"WHERE player_id IN ({', '.join(':' + k for k in binds)})", binds)
+            for pid in ids:
+                _index.remove(pid)
+            for r in rows.itertuples(index=False):
+                _index.add(r.player_id, r.name, r.position, r.nationality)
+            _pending["reload"] = set()
+        return _index
+
+
+@subscribe_changes
+def _on_change(table, record_id, action):
+    if table != "Players":
+        return
+    with _index_lock:
+        if action == "INSERT":
+            _pending["new"] = True
+        elif record_id is None:
+            _pending["rebuild"] = True
+        else:
+            _pending["reload"].add(int(record_id))
+
+
+SUMMARY_COLS = ["player_id", "name", "dob", "age", "position", "nationality",
+                "team_id", "team_name", "total_points", "last_match_date", "injured"]
+
+# Rows come back in the index's relevance order ({ids} is ranked best first).
+# One row past the page tells whether there is a next one.
+HYDRATE_SQL = """
+    SELECT player_id, name, dob, age_from_dob(dob) AS age, position, nationality,
+           team_id, team_name, total_points, last_match_date, injured
+    FROM Player_Summary
+    WHERE player_id IN ({ids}) AND {where}
+    ORDER BY FIELD(player_id, {ids})
+    LIMIT :lim OFFSET :off
+"""
+COUNT_SQL = "SELECT COUNT(*) AS n FROM Player_Summary WHERE player_id IN ({ids}) AND {where}"
+
+
+def _search_indexed(q, min_points, team_id, position, nationality, limit, offset, count):
+    ranked = get_player_index().search(q, MAX_CANDIDATES + 1)
+    if not ranked:
+        return pd.DataFrame(columns=SUMMARY_COLS), 0 if count else None, False
+    capped = len(ranked) > MAX_CANDIDATES
+    ranked = ranked[:MAX_CANDIDATES]
+    binds = {f"id{i}": pid for i, pid in enumerate(ranked)}
+    ids = ", ".join(":" + b for b in binds)
+    where = ["total_points >= :minpts"]
+    binds["minpts"] = int(min_points)
+    for col, value in (("team_id", team_id), ("position", position), ("nationality", nationality)):
+        if value is not None:
+            where.append(f"{col} = :{col}")
+            binds[col] = value
+    where = " AND ".join(where)
+    df = sql_df(HYDRATE_SQL.format(ids=ids, where=where), dict(binds, lim=limit + 1, off=offset))
+    total = None
+    if count:
+        n = sql_df(COUNT_SQL.format(ids=ids, where=where), binds)
+        total = int(n["n"].iloc[0]) if not n.empty else 0
+        if capped:
+            total = f"{total}+"
+    return df.iloc[:limit].reset_index(drop=True), total, len(df) > limit
+
+
+def search_players(q="", min_points=0, team_id=None, position=None, nationality=None, limit=24, offset=0,
+                   count=True):
+    """Return ``(page_df, total, has_more)`` for one page of player search results.
+
+    A text search ranks by relevance; otherwise players are ordered by points.
+
+    ``total`` is the number of matches, a lower bound such as ``"1000+"`` when a
+    text search hit ``MAX_CANDIDATES``, or ``None`` unless ``count`` is set; pass
+    ``count`` only when the caller has no total for these filters yet.
+    """
+    limit, offset = int(limit), int(offset)
+    if q and q.strip():
+        return _search_indexed(q, min_points, team_id, position, nationality, limit, offset, count)
+    filters = {"q": "", "minpts": int(min_points), "team": team_id, "pos": position, "nat": nationality}
+    # One row past the page says whether there is a next one without counting every match.
+    df = sql_df("CALL search_players(:q, :minpts, :team, :pos, :nat, :lim, :off)",
+                dict(filters, lim=limit + 1, off=offset))
+    total = None
+    if count:
+        n = sql_df("CALL count_players(:q, :minpts, :team, :pos, :nat)", filters)
+        total = int(n["total_count"].iloc[0]) if not n.empty else 0
+    return df.iloc[:limit].reset_index(drop=True), total, len(df) > limit
@@ -0,0 +1,330 @@
+"""Columnar in-memory store of Scores joined with Matches for season-level analytics.
+
+Scores and Matches are streamed into NumPy arrays once, then patched from change
+notifications (new score ids are appended, edited or deleted scores are reloaded
+by id) and reloaded in full every ``SEASON_STORE_MAX_AGE`` seconds. Queries are vectorized group-bys over those arrays, so league tables and
+season-wide aggregates stay in the millisecond range at a million score events.
+
+A season is the calendar year of the match date. Matches count as played once
+their date has passed.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import date
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from change_feed import GapTracker, bind_ids
+from common import read_engine_for, subscribe_changes
+
+log = logging.getLogger("sports_analytics.season")
+
+LOAD_CHUNK = 50000
+# Full reload in the background after this many seconds, for writes made outside
+# this process (CLI import, other workers, manual SQL) when the change feed is off.
+SEASON_STORE_MAX_AGE = float(os.getenv("SEASON_STORE_MAX_AGE", "300"))
+WIN_POINTS, DRAW_POINTS = 3, 1
+
+MATCH_COLS = ["match_id", "date", "home_team_id", "away_team_id"]
+SCORE_COLS = ["score_id", "match_id", "team_id", "player_id", "points", "minute_scored"]
+
+MATCHES_SQL = "SELECT match_id, date, home_team_id, away_team_id FROM Matches ORDER BY match_id"
+SCORES_SQL = """
+    SELECT score_id, match_id, team_id, player_id, points, minute_scored
+    FROM Scores {where}
+    ORDER BY score_id
+"""
+
+
+def _stream(sql: str, cols: list, params=None) -> dict:
+    """Column name -> NumPy array, read through a server-side cursor. NULL ids become -1."""
+    parts = {c: [] for c in cols}
+    with read_engine_for(sql).connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=LOAD_CHUNK).execute(text(sql), params or {})
+        for rows in result.partitions():
+            df = pd.DataFrame(rows, columns=cols)
+            for c in cols:
+                if c == "date":
+                    parts[c].append(pd.to_datetime(df[c], errors="coerce").to_numpy("datetime64[D]"))
+                else:
+                    parts[c].append(pd.to_numeric(df[c], errors="coerce").fillna(-1).to_numpy(np.int64))
+    empty = {"date": np.array([], dtype="datetime64[D]")}
+    return {c: np.concatenate(v) if v else empty.get(c, np.array([], dtype=np.int64)) for c, v in parts.items()}
+
+
+class SeasonStore:
+    """Immutable snapshot; patches return a new store so readers never see a half-applied update."""
+
+    def __init__(self, matches: dict, scores: dict, team_names: dict):
+        self.matches = matches
+        self.scores = scores
+        self.team_names = team_names
+        m_ids = matches["match_id"]  # sorted: MATCHES_SQL orders by match_id
+        n = len(m_ids)
+        self.max_score_id = int(scores["score_id"].max()) if len(scores["score_id"]) else 0
+
+        years = matches["date"].astype("datetime64[Y]").astype(np.int64) + 1970
+        self.m_season = np.where(np.isnat(matches["date"]), -1, years)
+        self.m_home_pts = np.zeros(n, dtype=np.int64)
+        self.m_away_pts = np.zeros(n, dtype=np.int64)
+        if n == 0:
+            self.s_match = np.full(len(scores["score_id"]), -1)
+            self.s_season = self.s_match.copy()
+            return
+
+        # Score -> match row; scores of unknown matches get -1.
+        pos = np.minimum(np.searchsorted(m_ids, scores["match_id"]), n - 1)
+        self.s_match = np.where(m_ids[pos] == scores["match_id"], pos, -1)
+        self.s_season = np.where(self.s_match >= 0, self.m_season[pos], -1)
+
+        # Match goals from the scores themselves, so a score patch needs no Match_Results reload.
+        valid = self.s_match >= 0
+        home_side = valid & (scores["team_id"] == matches["home_team_id"][pos])
+        away_side = valid & (scores["team_id"] == matches["away_team_id"][pos])
+        pts = np.maximum(scores["points"], 0)
+        self.m_home_pts = np.bincount(pos[home_side], weights=pts[home_side], minlength=n).astype(np.int64)
+        self.m_away_pts = np.bincount(pos[away_side], weights=pts[away_side], minlength=n).astype(np.int64)
+
+    def __len__(self):
+        return len(self.scores["score_id"])
+
+    @classmethod
+    def load(cls):
+        return cls(_stream(MATCHES_SQL, MATCH_COLS), _stream(SCORES_SQL.format(where=""), SCORE_COLS),
+                   _load_team_names())
+
+    def with_matches(self, matches: dict, team_names: dict = None):
+        return SeasonStore(matches, self.scores, team_names if team_names is not None else self.team_names)
+
+    def with_scores(self, remove_ids=(), add: dict = None):
+        keep = ~np.isin(self.scores["score_id"], np.asarray(list(remove_ids), dtype=np.int64))
+        scores = {c: a[keep] for c, a in self.scores.items()}
+        if add is not None and len(add["score_id"]):
+            scores = {c: np.concatenate([scores[c], add[c]]) for c in SCORE_COLS}
+        return SeasonStore(self.matches, scores, self.team_names)
+
+    # ------------------------------------------------------------------ queries
+
+    def seasons(self) -> list:
+        return sorted(int(s) for s in np.unique(self.m_season[self._played()]))
+
+    def _played(self, season=None) -> np.ndarray:
+        m = self.matches
+        mask = ~np.isnat(m["date"]) & (m["date"] <= np.datetime64(date.today(), "D"))
+        mask &= (m["home_team_id"] >= 0) & (m["away_team_id"] >= 0)
+        if season is not None:
+            mask &= self.m_season == int(season)
+        return mask
+
+    def _team_results(self, season=None):
+        """One row per (match, side): team, opponent, date, goals for/against, result sign."""
+        mask = self._played(season)
+        m = self.matches
+        home, away = m["home_team_id"][mask], m["away_team_id"][mask]
+        hp, ap = self.m_home_pts[mask], self.m_away_pts[mask]
+        return {
+            "match_id": np.concatenate([m["match_id"][mask]] * 2),
+            "date": np.concatenate([m["date"][mask]] * 2),
+            "team": np.concatenate([home, away]),
+            "opponent": np.concatenate([away, home]),
+            "gf": np.concatenate([hp, ap]),
+            "ga": np.concatenate([ap, hp]),
+        }
+
+    def group_sum(self, by=("team_id",), season=None, value="points") -> pd.DataFrame:
+        """Sum of a score column and event count grouped by score columns and/or ``season``."""
+        mask = self.s_season >= 0 if season is None else self.s_season == int(season)
+        cols = {k: (self.s_season if k == "season" else self.scores[k])[mask] for k in by}
+        if not mask.any():
+            return pd.DataFrame(columns=list(by) + [value, "events"])
+        stacked = np.stack([cols[k] for k in by], axis=1)
+        uniq, inv = np.unique(stacked, axis=0, return_inverse=True)
+        inv = inv.reshape(-1)
+        vals = np.maximum(self.scores[value][mask], 0)
+        out = pd.DataFrame(uniq, columns=list(by))
+        out[value] = np.bincount(inv, weights=vals).astype(np.int64)
+        out["events"] = np.bincount(inv)
+        return out.sort_values(value, ascending=False, kind="stable").reset_index(drop=True)
+
+    def league_table(self, season=None, form_n: int = 5) -> pd.DataFrame:
+        """P/W/D/L, goals and points per team (3 for a win, 1 for a draw) plus recent form."""
+        cols = ["team_id", "team_name", "P", "W", "D", "L", "GF", "GA", "GD", "Pts", "form"]
+        r = self._team_results(season)
+        if not len(r["team"]):
+            return pd.DataFrame(columns=cols)
+        teams, inv = np.unique(r["team"], return_inverse=True)
+        res = np.sign(r["gf"] - r["ga"])
+        out = pd.DataFrame({
+            "team_id": teams,
+            "P": np.bincount(inv),
+            "W": np.bincount(inv, weights=res > 0).astype(np.int64),
+            "D": np.bincount(inv, weights=res == 0).astype(np.int64),
+            "L": np.bincount(inv, weights=res < 0).astype(np.int64),
+            "GF": np.bincount(inv, weights=r["gf"]).astype(np.int64),
+            "GA": np.bincount(inv, weights=r["ga"]).astype(np.int64),
+        })
+        out["GD"] = out["GF"] - out["GA"]
+        out["Pts"] = out["W"] * WIN_POINTS + out["D"] * DRAW_POINTS
+        out["team_name"] = out["team_id"].map(self.team_names)
+        out = out.merge(self.rolling_form(season, form_n)[["team_id", "form"]], on="team_id", how="left")
+        out = out.sort_values(["Pts", "GD", "GF", "team_name"], ascending=[False, False, False, True], kind="stable")
+        return out.reset_index(drop=True)[cols]
+
+    def rolling_form(self, season=None, last_n: int = 5) -> pd.DataFrame:
+        """Each team's last ``last_n`` results, oldest first (e.g. ``WWDLW``), and the points they earned."""
+        cols = ["team_id", "form", "form_points"]
+        r = self._team_results(season)
+        if not len(r["team"]):
+            return pd.DataFrame(columns=cols)
+        order = np.lexsort((r["match_id"], r["date"], r["team"]))
+        team, res = r["team"][order], np.sign(r["gf"] - r["ga"])[order]
+        starts = np.r_[0, np.flatnonzero(np.diff(team)) + 1]
+        counts = np.diff(np.r_[starts, len(team)])
+        rank_from_end = np.repeat(counts, counts) - (np.arange(len(team)) - np.repeat(starts, counts))
+        recent = rank_from_end <= last_n
+        letters = np.array(["L", "D", "W"])[res[recent] + 1]
+        pts = np.select([res[recent] > 0, res[recent] == 0], [WIN_POINTS, DRAW_POINTS], 0)
+        df = pd.DataFrame({"team_id": team[recent], "r": letters, "p": pts})
+        return df.groupby("team_id", sort=False).agg(form=("r", "".join), form_points=("p", "sum")).reset_index()[cols]
+
+    def head_to_head(self, team_a: int, team_b: int, season=None):
+        """``(summary, matches)`` for every played meeting, from ``team_a``'s side."""
+        r = self._team_results(season)
+        mask = (r["team"] == int(team_a)) & (r["opponent"] == int(team_b))
+        gf, ga = r["gf"][mask], r["ga"][mask]
+        summary = {
+            "played": int(mask.sum()),
+            "wins": int((gf > ga).sum()),
+            "draws": int((gf == ga).sum()),
+            "losses": int((gf < ga).sum()),
+            "goals_for": int(gf.sum()),
+            "goals_against": int(ga.sum()),
+        }
+        matches = pd.DataFrame({"match_id": r["match_id"][mask], "date": r["date"][mask],
+                                "goals_for": gf, "goals_against": ga})
+        return summary, matches.sort_values("date", ascending=False).reset_index(drop=True)
+
+    def minute_buckets(self, season=None, bucket: int = 15, by: str = "team_id") -> pd.DataFrame:
+        """Points per ``by`` (team_id or player_id) per minute bucket; the last bucket holds 90+.
+
+        ``per_match`` divides by the number of matches in which that team or player scored.
+        """
+        cols = [by, "bucket", "points", "events", "per_match"]
+        mask = self.s_season >= 0 if season is None else self.s_season == int(season)
+        keys = self.scores[by][mask]
+        if not len(keys):
+            return pd.DataFrame(columns=cols)
+        last = 90 // bucket
+        b = np.minimum(np.maximum(self.scores["minute_scored"][mask], 0) // bucket, last)
+        pts = np.maximum(self.scores["points"][mask], 0)
+
+        uniq, inv = np.unique(np.stack([keys, b], axis=1), axis=0, return_inverse=True)
+        inv = inv.reshape(-1)
+        pair = np.unique(np.stack([keys, self.scores["match_id"][mask]], axis=1), axis=0)
+        k_ids, k_matches = np.unique(pair[:, 0], return_counts=True)
+        matches = dict(zip(k_ids.tolist(), k_matches.tolist()))
+
+        labels = [f"{i * bucket}-{i * bucket + bucket - 1}" for i in range(last)] + [f"{last * bucket}+"]
+        out = pd.DataFrame({by: uniq[:, 0], "bucket": np.array(labels)[uniq[:, 1]]})
+        out["points"] = np.bincount(inv, weights=pts).astype(np.int64)
+        out["events"] = np.bincount(inv)
+        out["per_match"] = (out["points"] / out[by].map(matches)).round(3)
+        out["bucket"] = pd.Categorical(out["bucket"], categories=labels, ordered=True)
+        return out.sort_values([by, "bucket"]).reset_index(drop=True)[cols]
+
+
+TEAM_NAMES_SQL = "SELECT team_id, team_name FROM Teams"
+
+
+def _load_team_names() -> dict:
+    with read_engine_for(TEAM_NAMES_SQL).connect() as conn:
+        return {int(i): n for i, n in conn.execute(text(TEAM_NAMES_SQL))}
+
+
+_store = None
+_store_lock = threading.Lock()
+_pending = {"new": False, "reload": set(), "matches": False, "teams": False, "rebuild": False}
+_loaded_at = 0.0
+# Score ids skipped by a `score_id > max_score_id` read: a lower id may commit after a higher one.
+_gaps = GapTracker(what="season score ids")
+# Patches applied while a background reload runs; they are re-applied on top of it.
+_during_reload = None
+
+
+def _reload_in_background():
+    global _store, _loaded_at, _during_reload
+    try:
+        store = SeasonStore.load()
+    except Exception:
+        log.exception("season store reload failed")
+        store = None
+    with _store_lock:
+        if store is not None and not _pending["rebuild"]:
+            _store = store
+            _pending.update(new=True, matches=_pending["matches"] or _during_reload["matches"],
+                            teams=_pending["teams"] or _during_reload["teams"])
+            _pending["reload"] |= _during_reload["reload"]
+        _loaded_at = time.monotonic()
+        _during_reload = None
+
+
+def get_season_store() -> SeasonStore:
+    """The process-wide store, loaded on first use and patched with pending changes.
+
+    Once older than ``SEASON_STORE_MAX_AGE`` it keeps serving while a fresh copy loads.
+    """
+    global _store, _loaded_at, _gaps, _during_reload
+    with _store_lock:
+        if _store is None or _pending["rebuild"]:
+            _store, _loaded_at = SeasonStore.load(), time.monotonic()
+            _gaps = GapTracker(what="season score ids")
+            _pending.update(new=False, reload=set(), matches=False, teams=False, rebuild=False)
+            return _store
+        if _during_reload is None and time.monotonic() - _loaded_at > SEASON_STORE_MAX_AGE:
+            _during_reload = {"reload": set(), "matches": False, "teams": False}
+            threading.Thread(target=_reload_in_background, name="season-store-reload", daemon=True).start()
+
+        if _pending["matches"] or _pending["teams"]:
+            matches = _stream(MATCHES_SQL, MATCH_COLS) if _pending["matches"] else _store.matches
+            names = _load_team_names() if _pending["teams"] else None
+            _store = _store.with_matches(matches, names)
+            if _during_reload is not None:
+                _during_reload["matches"] |= _pending["matches"]
+                _during_reload["teams"] |= _pending["teams"]
+            _pending.update(matches=False, teams=False)
+        gaps = _gaps.pending()
+        if _pending["new"] or _pending["reload"] or gaps:
+            ids = sorted(_pending["reload"] | set(gaps))
+            high_water = _store.max_score_id
+            where, params = "WHERE score_id > :m", {"m": high_water}
+            if ids:
+                placeholders, binds = bind_ids(ids)
+                where += f" OR score_id IN ({placeholders})"
+                params.update(binds)
+            add = _stream(SCORES_SQL.format(where=where), SCORE_COLS, params)
+            _store = _store.with_scores(remove_ids=ids, add=add)
+            found = add["score_id"]  # ascending: SCORES_SQL orders by score_id
+            _gaps.fill(found[found <= high_water].tolist())
+            _gaps.track(high_water, found[found > high_water].tolist())
+            if _during_reload is not None:
+                _during_reload["reload"] |= _pending["reload"]
+            _pending.update(new=False, reload=set())
+        return _store
+
+
+@subscribe_changes
+def _on_change(table, record_id, action):
+    with _store_lock:
+        if table == "Scores":
+            if action == "INSERT":
+                _pending["new"] = True
+            elif record_id is None:
+                _pending["rebuild"] = True
+            else:
+                _pending["reload"].add(int(record_id))
+        elif table == "Matches":
+            _pending["matches"] = True
+        elif table == "Teams":
+            _pending["teams"] = True
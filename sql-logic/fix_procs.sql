@@ -12,8 +12,7 @@ BEGIN
     INSERT INTO Teams(team_name, coach_name, founded_year, home_city)
     VALUES(p_team_name, p_coach_name, p_founded_year, p_home_city);
 
-    INSERT INTO Audit_Log(table_name, record_id, action)
-    VALUES('Teams', LAST_INSERT_ID(), 'INSERT');
+    CALL log_audit('Teams', LAST_INSERT_ID(), 'INSERT');
 END$$
 DELIMITER ;
 
@@ -34,8 +33,11 @@ BEGIN
         home_city = p_home_city
     WHERE team_id = p_team_id;
 
-    INSERT INTO Audit_Log(table_name, record_id, action)
-    VALUES('Teams', p_team_id, 'UPDATE');
+    UPDATE Player_Summary
+    SET team_name = p_team_name
+    WHERE team_id = p_team_id;
+
+    CALL log_audit('Teams', p_team_id, 'UPDATE');
 END$$
 DELIMITER ;
 
@@ -45,8 +47,7 @@ CREATE PROCEDURE delete_team(IN p_team_id INT)
 BEGIN
     DELETE FROM Teams WHERE team_id = p_team_id;
 
-    INSERT INTO Audit_Log(table_name, record_id, action)
-    VALUES('Teams', p_team_id, 'DELETE');
+    CALL log_audit('Teams', p_team_id, 'DELETE');
 END$$
 DELIMITER ;
 
@@ -61,6 +62,9 @@ CREATE PROCEDURE update_score(
     IN p_minute_scored INT
 )
 BEGIN
+    DECLARE old_player_id INT;
+    SELECT player_id INTO old_player_id FROM Scores WHERE score_id = p_score_id;
+
     UPDATE Scores
     SET match_id = p_match_id,
         team_id = p_team_id,
@@ -69,8 +73,12 @@ BEGIN
         minute_scored = p_minute_scored
     WHERE score_id = p_score_id;
 
-    INSERT INTO Audit_Log(table_name, record_id, action)
-    VALUES('Scores', p_score_id, 'UPDATE');
+    CALL log_audit('Scores', p_score_id, 'UPDATE');
+
+    CALL refresh_player_summary(old_player_id);
+    IF NOT (p_player_id <=> old_player_id) THEN
+        CALL refresh_player_summary(p_player_id);
+    END IF;
 END$$
 DELIMITER ;
 
@@ -78,10 +86,14 @@ DROP PROCEDURE IF EXISTS delete_score;
 DELIMITER $$
 CREATE PROCEDURE delete_score(IN p_score_id INT)
 BEGIN
+    DECLARE old_player_id INT;
+    SELECT player_id INTO old_player_id FROM Scores WHERE score_id = p_score_id;
+
     DELETE FROM Scores WHERE score_id = p_score_id;
 
-    INSERT INTO Audit_Log(table_name, record_id, action)
-    VALUES('Scores', p_score_id, 'DELETE');
+    CALL log_audit('Scores', p_score_id, 'DELETE');
+
+    CALL refresh_player_summary(old_player_id);
 END$$
 DELIMITER ;
 
@@ -96,6 +108,9 @@ CREATE PROCEDURE update_injury(
     IN p_status VARCHAR(20)
 )
 BEGIN
+    DECLARE old_player_id INT;
+    SELECT player_id INTO old_player_id FROM Injuries WHERE injury_id = p_injury_id;
+
     UPDATE Injuries
     SET player_id = p_player_id,
         injury_type = p_injury_type,
@@ -104,8 +119,12 @@ BEGIN
         status = p_status
     WHERE injury_id = p_injury_id;
 
-    INSERT INTO Audit_Log(table_name, record_id, action)
-    VALUES('Injuries', p_injury_id, 'UPDATE');
+    CALL log_audit('Injuries', p_injury_id, 'UPDATE');
+
+    CALL refresh_player_summary(old_player_id);
+    IF NOT (p_player_id <=> old_player_id) THEN
+        CALL refresh_player_summary(p_player_id);
+    END IF;
 END$$
 DELIMITER ;
 
@@ -113,10 +132,14 @@ DROP PROCEDURE IF EXISTS delete_injury;
 DELIMITER $$
 CREATE PROCEDURE delete_injury(IN p_injury_id INT)
 BEGIN
+    DECLARE old_player_id INT;
+    SELECT player_id INTO old_player_id FROM Injuries WHERE injury_id = p_injury_id;
+
     DELETE FROM Injuries WHERE injury_id = p_injury_id;
 
-    INSERT INTO Audit_Log(table_name, record_id, action)
-    VALUES('Injuries', p_injury_id, 'DELETE');
+    CALL log_audit('Injuries', p_injury_id, 'DELETE');
+
+    CALL refresh_player_summary(old_player_id);
 END$$
 DELIMITER ;
 
@@ -125,14 +148,6 @@ SELECT *
 FROM v_injury_summary
 WHERE is_active = 1;
 
-CREATE TRIGGER trg_injuries_au
-AFTER UPDATE ON Injuries
-FOR EACH ROW
-INSERT INTO Audit_Log(table_name, record_id, action)
-VALUES('Injuries', NEW.injury_id, 'UPDATE');
-
-CREATE TRIGGER trg_injuries_ad
-AFTER DELETE ON Injuries
-FOR EACH ROW
-INSERT INTO Audit_Log(table_name, record_id, action)
-VALUES('Injuries', OLD.injury_id, 'DELETE');
+-- Injuries changes are audited once, by their procedures (log_audit).
+DROP TRIGGER IF EXISTS trg_injuries_au;
+DROP TRIGGER IF EXISTS trg_injuries_ad;
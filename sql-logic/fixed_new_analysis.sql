@@ -105,16 +105,20 @@ SELECT
     END AS moment_type
 FROM base;
 
+-- Every scoring event is a key moment, so the per-player count is a plain
+-- aggregate; no need to re-derive the LAG() window of v_match_key_moments.
 CREATE OR REPLACE VIEW v_match_mvp AS
 WITH x AS (
     SELECT * FROM v_match_player_xg
 ),
 km AS (
     SELECT 
-        match_id, player_name,
+        s.match_id, p.name AS player_name,
         COUNT(*) AS key_moments
-    FROM v_match_key_moments
-    GROUP BY match_id, player_name
+    FROM Scores s
+    JOIN Players p ON p.player_id = s.player_id
+    JOIN Teams t ON t.team_id = s.team_id
+    GROUP BY s.match_id, p.name
 )
 SELECT 
     x.match_id,
@@ -134,3 +138,10 @@ LEFT JOIN km
   ON x.match_id = km.match_id
  AND x.player_name = km.player_name
 ORDER BY match_id, mvp_score DESC;
+
+-- Per-match procedures for these views are not used: the match page builds the
+-- same analytics from its one-query bundle. Drop them from older deployments.
+DROP PROCEDURE IF EXISTS match_score_flow;
+DROP PROCEDURE IF EXISTS match_player_xg;
+DROP PROCEDURE IF EXISTS match_key_moments;
+DROP PROCEDURE IF EXISTS match_mvp;
@@ -72,19 +72,67 @@ CREATE TABLE Team_Match (
     FOREIGN KEY (match_id) REFERENCES Matches(match_id)
 );
 
+-- Monthly partitions by created_at; audit.maintain_partitions adds upcoming
+-- months and drops the ones past retention.
 CREATE TABLE Audit_Log (
-    id INT AUTO_INCREMENT PRIMARY KEY,
+    id INT AUTO_INCREMENT,
     table_name VARCHAR(64),
     record_id INT,
     action VARCHAR(32),
     actor VARCHAR(64) DEFAULT 'app-user',
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, created_at)
+)
+PARTITION BY RANGE (UNIX_TIMESTAMP(created_at)) (
+    PARTITION p_start VALUES LESS THAN (UNIX_TIMESTAMP('2026-01-01 00:00:00')),
+    PARTITION pmax VALUES LESS THAN MAXVALUE
+);
+
+CREATE TABLE Player_Summary (
+    player_id INT PRIMARY KEY,
+    name VARCHAR(50) NOT NULL,
+    dob DATE,
+    position VARCHAR(30),
+    nationality VARCHAR(40),
+    team_id INT,
+    team_name VARCHAR(50),
+    total_points INT NOT NULL DEFAULT 0,
+    last_match_date DATE,
+    injured TINYINT NOT NULL DEFAULT 0,
+    FOREIGN KEY (player_id) REFERENCES Players(player_id) ON DELETE CASCADE
+);
+
+CREATE TABLE Match_Results (
+    match_id INT PRIMARY KEY,
+    date DATE,
+    home_team_id INT,
+    away_team_id INT,
+    home_points INT NOT NULL DEFAULT 0,
+    away_points INT NOT NULL DEFAULT 0,
+    total_goals INT AS (home_points + away_points) STORED,
+    goal_diff INT AS (ABS(home_points - away_points)) STORED,
+    FOREIGN KEY (match_id) REFERENCES Matches(match_id) ON DELETE CASCADE
 );
 
 CREATE INDEX idx_players_team ON Players(team_id);
 CREATE INDEX idx_scores_match ON Scores(match_id);
 CREATE INDEX idx_scores_player ON Scores(player_id);
 CREATE INDEX idx_injuries_player ON Injuries(player_id);
+CREATE INDEX idx_player_summary_points ON Player_Summary(total_points, name);
+CREATE INDEX idx_player_summary_team ON Player_Summary(team_id, total_points);
+CREATE INDEX idx_player_summary_position ON Player_Summary(position, total_points);
+CREATE INDEX idx_player_summary_nationality ON Player_Summary(nationality, total_points);
+CREATE INDEX idx_players_position ON Players(position);
+CREATE INDEX idx_players_nationality ON Players(nationality);
+CREATE INDEX idx_players_name ON Players(name);
+CREATE INDEX idx_match_results_date ON Match_Results(date);
+CREATE INDEX idx_match_results_goals ON Match_Results(total_goals);
+CREATE INDEX idx_match_results_diff ON Match_Results(goal_diff);
+CREATE INDEX idx_match_results_home ON Match_Results(home_team_id, date);
+CREATE INDEX idx_match_results_away ON Match_Results(away_team_id, date);
+CREATE INDEX idx_audit_table_action ON Audit_Log(table_name, action, id);
+CREATE INDEX idx_audit_record ON Audit_Log(table_name, record_id, id);
+CREATE INDEX idx_audit_created ON Audit_Log(created_at);
 
 ALTER TABLE Players ADD FULLTEXT ft_players (name, position, nationality);
 
@@ -110,23 +158,46 @@ END$$
 
 DELIMITER ;
 
-CREATE OR REPLACE VIEW v_player_summary AS
-SELECT 
+-- Live aggregation, used to (re)build the materialized Player_Summary table.
+CREATE OR REPLACE VIEW v_player_summary_live AS
+SELECT
   p.player_id,
   p.name,
   p.dob,
-  age_from_dob(p.dob) AS age,
   p.position,
   p.nationality,
+  p.team_id,
   t.team_name,
-  COALESCE(SUM(s.points),0) AS total_points,
-  MAX(m.date) AS last_match_date,
-  is_injured(p.player_id) AS injured
+  COALESCE(sc.total_points,0) AS total_points,
+  sc.last_match_date,
+  (inj.player_id IS NOT NULL) AS injured
 FROM Players p
-LEFT JOIN Scores s ON s.player_id=p.player_id
-LEFT JOIN Matches m ON m.match_id=s.match_id
 LEFT JOIN Teams t ON t.team_id=p.team_id
-GROUP BY p.player_id;
+LEFT JOIN (
+  SELECT s.player_id, SUM(s.points) AS total_points, MAX(m.date) AS last_match_date
+  FROM Scores s
+  LEFT JOIN Matches m ON m.match_id=s.match_id
+  GROUP BY s.player_id
+) sc ON sc.player_id=p.player_id
+LEFT JOIN (
+  SELECT DISTINCT player_id FROM Injuries
+  WHERE status IS NULL OR status <> 'Fit'
+) inj ON inj.player_id=p.player_id;
+
+CREATE OR REPLACE VIEW v_player_summary AS
+SELECT
+  player_id,
+  name,
+  dob,
+  age_from_dob(dob) AS age,
+  position,
+  nationality,
+  team_id,
+  team_name,
+  total_points,
+  last_match_date,
+  injured
+FROM Player_Summary;
 
 CREATE OR REPLACE VIEW v_team_totals AS
 WITH tpts AS (
@@ -183,14 +254,99 @@ BEGIN
     WHERE email = p_email;
 END$$
 
+-- One Audit_Log row per mutation, written by the procedure that made it.
+-- call_proc sets @app_actor on every call; with @app_audit_defer = 1 the row is
+-- handed back in @audit_* and written later in a batch by the app.
+DROP PROCEDURE IF EXISTS log_audit;
+CREATE PROCEDURE log_audit(IN p_table VARCHAR(64), IN p_record_id INT, IN p_action VARCHAR(32))
+BEGIN
+  IF @app_audit_defer = 1 THEN
+    SET @audit_table = p_table, @audit_record_id = p_record_id, @audit_action = p_action;
+  ELSE
+    INSERT INTO Audit_Log(table_name,record_id,action,actor)
+    VALUES(p_table, p_record_id, p_action, COALESCE(@app_actor,'app-user'));
+  END IF;
+END$$
+
+DROP PROCEDURE IF EXISTS refresh_player_summary;
+CREATE PROCEDURE refresh_player_summary(IN pid INT)
+BEGIN
+  IF pid IS NOT NULL THEN
+    DELETE FROM Player_Summary WHERE player_id=pid;
+    INSERT INTO Player_Summary(player_id,name,dob,position,nationality,team_id,team_name,
+                               total_points,last_match_date,injured)
+    SELECT p.player_id, p.name, p.dob, p.position, p.nationality, p.team_id, t.team_name,
+           (SELECT COALESCE(SUM(s.points),0) FROM Scores s WHERE s.player_id=pid),
+           (SELECT MAX(m.date) FROM Scores s JOIN Matches m ON m.match_id=s.match_id WHERE s.player_id=pid),
+           EXISTS(SELECT 1 FROM Injuries i WHERE i.player_id=pid AND (i.status IS NULL OR i.status <> 'Fit'))
+    FROM Players p
+    LEFT JOIN Teams t ON t.team_id=p.team_id
+    WHERE p.player_id=pid;
+  END IF;
+END$$
+
+DROP PROCEDURE IF EXISTS refresh_match_player_summary;
+CREATE PROCEDURE refresh_match_player_summary(IN mid INT)
+BEGIN
+  UPDATE Player_Summary ps
+  JOIN (
+    SELECT s.player_id, MAX(m.date) AS last_match_date
+    FROM Scores s
+    JOIN Matches m ON m.match_id=s.match_id
+    WHERE s.player_id IN (SELECT player_id FROM Scores WHERE match_id=mid)
+    GROUP BY s.player_id
+  ) x ON x.player_id=ps.player_id
+  SET ps.last_match_date=x.last_match_date;
+END$$
+
+DROP PROCEDURE IF EXISTS rebuild_player_summary;
+CREATE PROCEDURE rebuild_player_summary()
+BEGIN
+  DELETE FROM Player_Summary;
+  INSERT INTO Player_Summary(player_id,name,dob,position,nationality,team_id,team_name,
+                             total_points,last_match_date,injured)
+  SELECT player_id,name,dob,position,nationality,team_id,team_name,
+         total_points,last_match_date,injured
+  FROM v_player_summary_live;
+END$$
+
+DROP PROCEDURE IF EXISTS refresh_match_result;
+CREATE PROCEDURE refresh_match_result(IN mid INT)
+BEGIN
+  DELETE FROM Match_Results WHERE match_id=mid;
+  INSERT INTO Match_Results(match_id,date,home_team_id,away_team_id,home_points,away_points)
+  SELECT m.match_id, m.date, m.home_team_id, m.away_team_id,
+         COALESCE(SUM(CASE WHEN s.team_id=m.home_team_id THEN s.points END),0),
+         COALESCE(SUM(CASE WHEN s.team_id=m.away_team_id THEN s.points END),0)
+  FROM Matches m
+  LEFT JOIN Scores s ON s.match_id=m.match_id
+  WHERE m.match_id=mid
+  GROUP BY m.match_id;
+END$$
+
+DROP PROCEDURE IF EXISTS rebuild_match_results;
+CREATE PROCEDURE rebuild_match_results()
+BEGIN
+  DELETE FROM Match_Results;
+  INSERT INTO Match_Results(match_id,date,home_team_id,away_team_id,home_points,away_points)
+  SELECT m.match_id, m.date, m.home_team_id, m.away_team_id,
+         COALESCE(SUM(CASE WHEN s.team_id=m.home_team_id THEN s.points END),0),
+         COALESCE(SUM(CASE WHEN s.team_id=m.away_team_id THEN s.points END),0)
+  FROM Matches m
+  LEFT JOIN Scores s ON s.match_id=m.match_id
+  GROUP BY m.match_id;
+END$$
+
 DROP PROCEDURE IF EXISTS add_player;
 CREATE PROCEDURE add_player(IN p_name VARCHAR(50), IN p_dob DATE, IN p_position VARCHAR(30),
                             IN p_nationality VARCHAR(40), IN p_team_id INT)
 BEGIN
+  DECLARE new_id INT;
   INSERT INTO Players(name,dob,position,nationality,team_id)
   VALUES(p_name,p_dob,p_position,p_nationality,p_team_id);
-  INSERT INTO Audit_Log(table_name,record_id,action)
-  VALUES('Players', LAST_INSERT_ID(), 'INSERT');
+  SET new_id = LAST_INSERT_ID();
+  CALL log_audit('Players', new_id, 'INSERT');
+  CALL refresh_player_summary(new_id);
 END$$
 
 DROP PROCEDURE IF EXISTS update_player;
@@ -200,36 +356,71 @@ BEGIN
   UPDATE Players
   SET name=p_name,dob=p_dob,position=p_position,nationality=p_nationality,team_id=p_team_id
   WHERE player_id=pid;
-  INSERT INTO Audit_Log(table_name,record_id,action)
-  VALUES('Players', pid, 'UPDATE');
+  CALL log_audit('Players', pid, 'UPDATE');
+  CALL refresh_player_summary(pid);
 END$$
 
 DROP PROCEDURE IF EXISTS delete_player;
 CREATE PROCEDURE delete_player(IN pid INT)
 BEGIN
   DELETE FROM Players WHERE player_id=pid;
-  INSERT INTO Audit_Log(table_name,record_id,action)
-  VALUES('Players', pid, 'DELETE');
+  CALL log_audit('Players', pid, 'DELETE');
 END$$
 
 DROP PROCEDURE IF EXISTS search_players;
 CREATE PROCEDURE search_players(
     IN q VARCHAR(255),
     IN minpts INT,
-    IN team INT
+    IN team INT,
+    IN pos VARCHAR(30),
+    IN nat VARCHAR(40),
+    IN lim INT,
+    IN off INT
 )
 BEGIN
-  SELECT v.*
-  FROM v_player_summary v
-  JOIN Players p ON p.player_id = v.player_id
-  WHERE v.total_points >= COALESCE(minpts,0)
-    AND (team IS NULL OR v.team_name = (SELECT team_name FROM Teams WHERE team_id=team))
+  DECLARE n_lim INT DEFAULT COALESCE(lim, 50);
+  DECLARE n_off INT DEFAULT COALESCE(off, 0);
+
+  SELECT ps.player_id, ps.name, ps.dob, age_from_dob(ps.dob) AS age,
+         ps.position, ps.nationality, ps.team_id, ps.team_name,
+         ps.total_points, ps.last_match_date, ps.injured
+  FROM Player_Summary ps
+  JOIN Players p ON p.player_id = ps.player_id
+  WHERE ps.total_points >= COALESCE(minpts,0)
+    AND (team IS NULL OR ps.team_id = team)
+    AND (pos IS NULL OR ps.position = pos)
+    AND (nat IS NULL OR ps.nationality = nat)
     AND (
         q IS NULL OR q='' OR 
         MATCH(p.name, p.position, p.nationality) AGAINST(q IN NATURAL LANGUAGE MODE)
         OR p.name LIKE CONCAT('%', q, '%')
     )
-  ORDER BY v.total_points DESC, v.name;
+  ORDER BY ps.total_points DESC, ps.name
+  LIMIT n_lim OFFSET n_off;
+END$$
+
+-- Matches for search_players' filters; callers run it once per search, not per page.
+DROP PROCEDURE IF EXISTS count_players;
+CREATE PROCEDURE count_players(
+    IN q VARCHAR(255),
+    IN minpts INT,
+    IN team INT,
+    IN pos VARCHAR(30),
+    IN nat VARCHAR(40)
+)
+BEGIN
+  SELECT COUNT(*) AS total_count
+  FROM Player_Summary ps
+  JOIN Players p ON p.player_id = ps.player_id
+  WHERE ps.total_points >= COALESCE(minpts,0)
+    AND (team IS NULL OR ps.team_id = team)
+    AND (pos IS NULL OR ps.position = pos)
+    AND (nat IS NULL OR ps.nationality = nat)
+    AND (
+        q IS NULL OR q='' OR
+        MATCH(p.name, p.position, p.nationality) AGAINST(q IN NATURAL LANGUAGE MODE)
+        OR p.name LIKE CONCAT('%', q, '%')
+    );
 END$$
 
 DROP PROCEDURE IF EXISTS add_match;
@@ -237,8 +428,7 @@ CREATE PROCEDURE add_match(IN p_date DATE, IN p_home INT, IN p_away INT, IN p_st
 BEGIN
   INSERT INTO Matches(date,home_team_id,away_team_id,stadium,status)
   VALUES(p_date,p_home,p_away,p_stadium,p_status);
-  INSERT INTO Audit_Log(table_name,record_id,action)
-  VALUES('Matches', LAST_INSERT_ID(), 'INSERT');
+  CALL log_audit('Matches', LAST_INSERT_ID(), 'INSERT');
 END$$
 
 DROP PROCEDURE IF EXISTS update_match;
@@ -247,16 +437,15 @@ BEGIN
   UPDATE Matches
   SET date=p_date, home_team_id=p_home, away_team_id=p_away, stadium=p_stadium, status=p_status
   WHERE match_id=mid;
-  INSERT INTO Audit_Log(table_name,record_id,action)
-  VALUES('Matches', mid, 'UPDATE');
+  CALL log_audit('Matches', mid, 'UPDATE');
+  CALL refresh_match_player_summary(mid);
 END$$
 
 DROP PROCEDURE IF EXISTS delete_match;
 CREATE PROCEDURE delete_match(IN mid INT)
 BEGIN
   DELETE FROM Matches WHERE match_id=mid;
-  INSERT INTO Audit_Log(table_name,record_id,action)
-  VALUES('Matches', mid, 'DELETE');
+  CALL log_audit('Matches', mid, 'DELETE');
 END$$
 
 DROP PROCEDURE IF EXISTS add_score;
@@ -264,8 +453,8 @@ CREATE PROCEDURE add_score(IN mid INT, IN tid INT, IN pid INT, IN pts INT, IN mi
 BEGIN
   INSERT INTO Scores(match_id,team_id,player_id,points,minute_scored)
   VALUES(mid,tid,pid,pts,minsc);
-  INSERT INTO Audit_Log(table_name,record_id,action)
-  VALUES('Scores', LAST_INSERT_ID(),'INSERT');
+  CALL log_audit('Scores', LAST_INSERT_ID(), 'INSERT');
+  CALL refresh_player_summary(pid);
 END$$
 
 DROP PROCEDURE IF EXISTS add_injury;
@@ -273,8 +462,8 @@ CREATE PROCEDURE add_injury(IN pid INT, IN itype VARCHAR(50), IN idate DATE, IN
 BEGIN
   INSERT INTO Injuries(player_id,injury_type,injury_date,expected_return,status)
   VALUES(pid,itype,idate,er,stat);
-  INSERT INTO Audit_Log(table_name,record_id,action)
-  VALUES('Injuries', LAST_INSERT_ID(),'INSERT');
+  CALL log_audit('Injuries', LAST_INSERT_ID(), 'INSERT');
+  CALL refresh_player_summary(pid);
 END$$
 
 DELIMITER ;
@@ -291,31 +480,69 @@ BEGIN
 END$$
 DELIMITER ;
 
-DROP TRIGGER IF EXISTS trg_players_ai;
+-- Match_Results upkeep: Scores triggers apply point deltas, Matches triggers
+-- keep the row, its date and its teams in step with the match.
+DROP TRIGGER IF EXISTS trg_scores_ai;
 DELIMITER $$
-CREATE TRIGGER trg_players_ai AFTER INSERT ON Players
+CREATE TRIGGER trg_scores_ai AFTER INSERT ON Scores
 FOR EACH ROW BEGIN
-  INSERT INTO Audit_Log(table_name,record_id,action)
-  VALUES('Players', NEW.player_id,'INSERT');
+  UPDATE Match_Results
+  SET home_points = home_points + IF(NEW.team_id = home_team_id, COALESCE(NEW.points,0), 0),
+      away_points = away_points + IF(NEW.team_id = away_team_id, COALESCE(NEW.points,0), 0)
+  WHERE match_id = NEW.match_id;
 END$$
 DELIMITER ;
 
-DROP TRIGGER IF EXISTS trg_players_au;
+DROP TRIGGER IF EXISTS trg_scores_au;
 DELIMITER $$
-CREATE TRIGGER trg_players_au AFTER UPDATE ON Players
+CREATE TRIGGER trg_scores_au AFTER UPDATE ON Scores
 FOR EACH ROW BEGIN
-  INSERT INTO Audit_Log(table_name,record_id,action)
-  VALUES('Players', NEW.player_id,'UPDATE');
+  UPDATE Match_Results
+  SET home_points = home_points - IF(OLD.team_id = home_team_id, COALESCE(OLD.points,0), 0),
+      away_points = away_points - IF(OLD.team_id = away_team_id, COALESCE(OLD.points,0), 0)
+  WHERE match_id = OLD.match_id;
+  UPDATE Match_Results
+  SET home_points = home_points + IF(NEW.team_id = home_team_id, COALESCE(NEW.points,0), 0),
+      away_points = away_points + IF(NEW.team_id = away_team_id, COALESCE(NEW.points,0), 0)
+  WHERE match_id = NEW.match_id;
 END$$
 DELIMITER ;
 
-DROP TRIGGER IF EXISTS trg_players_ad;
+DROP TRIGGER IF EXISTS trg_scores_ad;
+DELIMITER $$
+CREATE TRIGGER trg_scores_ad AFTER DELETE ON Scores
+FOR EACH ROW BEGIN
+  UPDATE Match_Results
+  SET home_points = home_points - IF(OLD.team_id = home_team_id, COALESCE(OLD.points,0), 0),
+      away_points = away_points - IF(OLD.team_id = away_team_id, COALESCE(OLD.points,0), 0)
+  WHERE match_id = OLD.match_id;
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_matches_ai;
+DELIMITER $$
+CREATE TRIGGER trg_matches_ai AFTER INSERT ON Matches
+FOR EACH ROW BEGIN
+  INSERT INTO Match_Results(match_id,date,home_team_id,away_team_id)
+  VALUES(NEW.match_id, NEW.date, NEW.home_team_id, NEW.away_team_id);
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_matches_au;
 DELIMITER $$
-CREATE TRIGGER trg_players_ad AFTER DELETE ON Players
+CREATE TRIGGER trg_matches_au AFTER UPDATE ON Matches
 FOR EACH ROW BEGIN
-  INSERT INTO Audit_Log(table_name,record_id,action)
-  VALUES('Players', OLD.player_id,'DELETE');
+  IF NEW.home_team_id <=> OLD.home_team_id AND NEW.away_team_id <=> OLD.away_team_id THEN
+    UPDATE Match_Results SET date = NEW.date WHERE match_id = NEW.match_id;
+  ELSE
+    CALL refresh_match_result(NEW.match_id);
+  END IF;
 END$$
 DELIMITER ;
 
+-- Players changes are audited once, by their procedures (log_audit).
+DROP TRIGGER IF EXISTS trg_players_ai;
+DROP TRIGGER IF EXISTS trg_players_au;
+DROP TRIGGER IF EXISTS trg_players_ad;
+
 SET SQL_MODE=@OLD_SQL_MODE;